@@ -0,0 +1,317 @@
+"""
+학교종 Discord 봇 — 사전 인코딩된 Ogg/Opus 오디오 자산
+
+종소리와 TTS 클립은 한 번만 48 kHz 스테레오 Ogg/Opus(20 ms 프레임)로
+인코딩해 두고, 재생할 때는 Ogg 페이지에서 Opus 패킷을 그대로 꺼내 보낸다.
+재생마다 ffmpeg 프로세스를 띄우지 않는다.
+
+파싱한 프레임은 읽기 전용 튜플로 메모리에 올려 두고(``AUDIO_FRAME_CACHE_MAX_BYTES``
+까지, LRU), 재생마다 위치만 따로 가진 ``SharedOpusSource`` 가 같은 버퍼를
+읽는다. 여러 길드가 같은 안내를 동시에 재생해도 파일 읽기 · 파싱은 프로세스당
+한 번이다. 상한보다 큰 클립은 ``OggOpusFile`` 로 파일에서 바로 읽는다.
+
+안내 한 번(종소리 + 문장)은 두 클립의 Opus 패킷을 짧은 무음 프레임을 사이에
+두고 이어 붙인 하나의 클립(``compose_frames``)으로 재생한다. 재인코딩 없이
+패킷만 잇고, 결과는 구성 클립 키로 프레임 캐시에 함께 둔다. 인코딩할 때 앞뒤
+무음 제거 · 음량 정규화를 해 두므로 이어 붙여도 음량이 고르고 틈이 짧다.
+안내 문장 자체도 조각(이름 + "공부 시작." 등)으로 따로 캐시되어 있으면 같은
+방식으로 조각 사이 무음(``gaps_ms``)만 달리해 이어 붙인다.
+
+- TTS 클립: 합성 직후 ``encode_opus`` 로 변환해 TTS 캐시에 ``.ogg`` 로 저장
+- 종소리: 시작 시 ``prepare_bell`` 이 ``OPUS_CACHE`` 에 변환 (원본이 더 새로우면 다시 변환)
+- ``.ogg`` 가 아닌 파일만 예전처럼 ``FFmpegOpusAudio`` 로 트랜스코딩
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import discord
+from discord.oggparse import OggError, OggStream
+from discord.opus import OPUS_SILENCE
+
+from app.config import (
+    ANNOUNCE_GAP_MS,
+    AUDIO_FRAME_CACHE_MAX_BYTES,
+    AUDIO_LOUDNORM,
+    AUDIO_TRIM_SILENCE,
+    OPUS_BITRATE_KBPS,
+    OPUS_CACHE,
+    _BASE_DIR,
+    _FFMPEG,
+    log,
+)
+from app.utils import metrics
+
+_OPUS_HEADERS = (b"OpusHead", b"OpusTags")
+
+Frames = tuple[bytes, ...]     # 20 ms Opus 패킷들 (읽기 전용, 여러 재생이 공유)
+_FrameKey = tuple              # 파일: (경로, mtime_ns, 크기), 이어 붙인 클립: 구성 파일 키들
+
+
+# 앞뒤 무음 제거 (뒤쪽은 뒤집어서 앞쪽처럼 제거)
+_TRIM = (
+    "silenceremove=start_periods=1:start_threshold=-50dB,areverse,"
+    "silenceremove=start_periods=1:start_threshold=-50dB,areverse"
+)
+_LOUDNORM = "loudnorm=I=-16:TP=-1.5:LRA=11"
+
+_m_encodes   = metrics.counter("audio_encodes_total")
+_m_encode_ms = metrics.histogram("audio_encode_ms")
+_m_ffmpeg    = metrics.counter("audio_ffmpeg_playbacks_total")
+_m_preenc    = metrics.counter("audio_preencoded_playbacks_total")
+_m_fc_hits   = metrics.counter("audio_frame_cache_hits_total")
+_m_fc_misses = metrics.counter("audio_frame_cache_misses_total")
+_m_fc_evict  = metrics.counter("audio_frame_cache_evictions_total")
+_m_fc_bytes  = metrics.gauge("audio_frame_cache_bytes")
+_m_composed  = metrics.counter("audio_composed_playbacks_total")
+
+_bell: Path | None = None
+
+_frames:       OrderedDict[_FrameKey, Frames]     = OrderedDict()   # 순서 = LRU
+_frame_bytes:  int                                = 0
+_frame_loads:  dict[_FrameKey, asyncio.Task]      = {}
+
+
+# ── 인코딩 ─────────────────────────────────────────────────────────────────────
+
+def _filters() -> list[str]:
+    chain = [f for f, on in ((_TRIM, AUDIO_TRIM_SILENCE), (_LOUDNORM, AUDIO_LOUDNORM)) if on]
+    return ["-af", ",".join(chain)] if chain else []
+
+
+async def encode_opus(src: Path, dst: Path) -> bool:
+    """src → dst (Ogg/Opus 48 kHz 스테레오, 무음 제거·음량 정규화). 실패하면 dst를 지우고 False."""
+    t0 = time.perf_counter()
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            _FFMPEG, "-y", "-i", str(src),
+            "-map_metadata", "-1", "-vn", *_filters(),
+            "-c:a", "libopus", "-ar", "48000", "-ac", "2",
+            "-b:a", f"{OPUS_BITRATE_KBPS}k", "-frame_duration", "20",
+            "-f", "ogg", "-loglevel", "error", str(dst),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, err = await proc.communicate()
+        except asyncio.CancelledError:      # 헤징에서 진 합성 — 프로세스도 정리
+            proc.kill()
+            dst.unlink(missing_ok=True)
+            raise
+    except OSError as e:
+        log.warning("ffmpeg 실행 실패 (%s): %s", src.name, e)
+        dst.unlink(missing_ok=True)
+        return False
+    finally:
+        _m_encode_ms.observe((time.perf_counter() - t0) * 1000)
+    if proc.returncode != 0 or not dst.exists() or dst.stat().st_size == 0:
+        log.warning("Opus 인코딩 실패 (%s): %s", src.name, err.decode(errors="replace").strip())
+        dst.unlink(missing_ok=True)
+        return False
+    _m_encodes.inc()
+    return True
+
+
+async def prepare_bell() -> Path | None:
+    """bell.mp3 / bell.wav 를 Ogg/Opus로 한 번 변환. 인코딩 실패 시 원본 경로."""
+    global _bell
+    src = next((p for p in (_BASE_DIR / "bell.mp3", _BASE_DIR / "bell.wav") if p.exists()), None)
+    if src is None:
+        log.debug("bell.mp3 / bell.wav 없음, 벨 스킵")
+        _bell = None
+        return None
+    OPUS_CACHE.mkdir(parents=True, exist_ok=True)
+    dst = OPUS_CACHE / (src.name + ".ogg")
+    fresh = dst.exists() and dst.stat().st_size > 0 and dst.stat().st_mtime >= src.stat().st_mtime
+    if not fresh:
+        tmp = dst.with_name(dst.name + ".part")
+        if not await encode_opus(src, tmp):
+            _bell = src
+            return _bell
+        os.replace(tmp, dst)
+        log.info("종소리 Opus 인코딩 → %s", dst.name)
+    _bell = dst
+    await load_frames(dst)      # 모든 재생이 공유할 프레임을 미리 메모리에
+    return _bell
+
+
+def bell_path() -> Path | None:
+    """재생할 종소리 (``prepare_bell`` 전이면 None)."""
+    return _bell
+
+
+# ── 재생 소스 ──────────────────────────────────────────────────────────────────
+
+class OggOpusFile(discord.AudioSource):
+    """Ogg/Opus 파일의 패킷을 그대로 내보내는 소스 (트랜스코딩 없음).
+
+    ``read`` 는 discord.py의 재생 스레드에서 불린다.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._file = open(path, "rb")
+        self._packets = OggStream(self._file).iter_packets()
+
+    def read(self) -> bytes:
+        try:
+            for packet in self._packets:
+                if not packet.startswith(_OPUS_HEADERS):
+                    return packet
+        except OggError:
+            log.warning("Ogg 파일 손상: %s", self._file.name)
+        return b""
+
+    def is_opus(self) -> bool:
+        return True
+
+    def cleanup(self) -> None:
+        f = getattr(self, "_file", None)
+        if f is not None and not f.closed:
+            f.close()
+
+
+class SharedOpusSource(discord.AudioSource):
+    """메모리의 공유 프레임 버퍼를 읽는 소스. 재생마다 하나, 위치만 따로 가진다."""
+
+    def __init__(self, frames: Frames) -> None:
+        self._frames = frames
+        self._pos = 0
+
+    def read(self) -> bytes:
+        if self._pos >= len(self._frames):
+            return b""
+        frame = self._frames[self._pos]
+        self._pos += 1
+        return frame
+
+    def is_opus(self) -> bool:
+        return True
+
+
+# ── 프레임 캐시 ────────────────────────────────────────────────────────────────
+
+def _read_frames(path: Path) -> Frames:
+    with open(path, "rb") as f:
+        return tuple(
+            p for p in OggStream(f).iter_packets() if not p.startswith(_OPUS_HEADERS)
+        )
+
+
+def _store_frames(key: _FrameKey, frames: Frames) -> None:
+    global _frame_bytes
+    _frames[key] = frames
+    _frame_bytes += sum(map(len, frames))
+    while _frame_bytes > AUDIO_FRAME_CACHE_MAX_BYTES and len(_frames) > 1:
+        _, old = _frames.popitem(last=False)   # 재생 중인 소스는 자기 참조로 계속 읽는다
+        _frame_bytes -= sum(map(len, old))
+        _m_fc_evict.inc()
+    _m_fc_bytes.set(_frame_bytes)
+
+
+async def _load_frames(key: _FrameKey, path: Path) -> Frames:
+    frames = await asyncio.to_thread(_read_frames, path)
+    _store_frames(key, frames)
+    return frames
+
+
+def _frame_key(path: Path) -> _FrameKey:
+    st = path.stat()
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+async def load_frames(path: Path) -> Frames | None:
+    """Ogg/Opus 파일의 프레임 (메모리 캐시). 상한보다 큰 파일은 None."""
+    key = _frame_key(path)
+    if key[2] > AUDIO_FRAME_CACHE_MAX_BYTES:
+        return None
+    frames = _frames.get(key)
+    if frames is not None:
+        _frames.move_to_end(key)
+        _m_fc_hits.inc()
+        return frames
+    task = _frame_loads.get(key)
+    if task is None:        # 동시에 요청한 길드들은 한 번의 읽기를 함께 기다림
+        _m_fc_misses.inc()
+        task = asyncio.create_task(_load_frames(key, path))
+        _frame_loads[key] = task
+        task.add_done_callback(lambda _t: _frame_loads.pop(key, None))
+    else:
+        _m_fc_hits.inc()
+    return await asyncio.shield(task)
+
+
+def _gaps(paths: list[Path], gaps_ms: list[int] | None) -> tuple[int, ...]:
+    """클립 사이 무음 프레임 수 (기본: 모두 ``ANNOUNCE_GAP_MS``)."""
+    if gaps_ms is None:
+        gaps_ms = [ANNOUNCE_GAP_MS] * (len(paths) - 1)
+    return tuple(ms // 20 for ms in gaps_ms)
+
+
+async def compose_frames(paths: list[Path], gaps_ms: list[int] | None = None) -> Frames | None:
+    """Ogg/Opus 클립들을 무음 프레임을 사이에 두고 이어 붙인 프레임 (구성 클립 키로 캐시).
+
+    gaps_ms[i] 는 paths[i] 와 paths[i + 1] 사이 무음 길이.
+    """
+    if len(paths) == 1:
+        return await load_frames(paths[0])
+    gaps = _gaps(paths, gaps_ms)
+    key = (*(_frame_key(p) for p in paths), gaps)
+    frames = _frames.get(key)
+    if frames is not None:
+        _frames.move_to_end(key)
+        _m_fc_hits.inc()
+        return frames
+    parts = [await load_frames(p) for p in paths]
+    if any(part is None for part in parts):
+        return None
+    frames = parts[0]
+    for gap, part in zip(gaps, parts[1:]):
+        frames = frames + (OPUS_SILENCE,) * gap + part
+    _store_frames(key, frames)
+    return frames
+
+
+async def announcement_source(
+    paths: list[Path], gaps_ms: list[int] | None = None,
+) -> discord.AudioSource | None:
+    """클립들을 한 번의 재생으로. 사전 인코딩 안 된 클립이 섞였거나 너무 크면 None."""
+    if not paths or any(p.suffix != ".ogg" for p in paths):
+        return None
+    try:
+        frames = await compose_frames(paths, gaps_ms)
+    except OggError:
+        log.warning("Ogg 파일 손상: %s", ", ".join(p.name for p in paths))
+        return None
+    if frames is None:
+        return None
+    _m_composed.inc()
+    return SharedOpusSource(frames)
+
+
+async def prebuffer(paths: list[Path], gaps_ms: list[int] | None = None) -> None:
+    """곧 재생할 클립들을 미리 읽어 이어 붙여 둔다 (재생 시 프레임 캐시 적중)."""
+    if not paths or any(p.suffix != ".ogg" for p in paths):
+        return
+    try:
+        await compose_frames(paths, gaps_ms)
+    except OggError:
+        log.warning("Ogg 파일 손상: %s", ", ".join(p.name for p in paths))
+
+
+async def audio_source(path: Path) -> discord.AudioSource:
+    """``.ogg`` 는 공유 프레임 버퍼(또는 파일)에서 패킷 그대로, 그 외는 ffmpeg 트랜스코딩."""
+    if path.suffix == ".ogg":
+        _m_preenc.inc()
+        try:
+            frames = await load_frames(path)
+        except OggError:
+            log.warning("Ogg 파일 손상: %s", path.name)
+            frames = ()
+        return OggOpusFile(path) if frames is None else SharedOpusSource(frames)
+    _m_ffmpeg.inc()
+    return discord.FFmpegOpusAudio(str(path), executable=_FFMPEG)
@@ -0,0 +1,136 @@
+"""
+학교종 Discord 봇 — 채널 조회 캐시 (TTL + 네거티브 캐시)
+
+``resolve_channel(cid)`` 는 다음 순서로 채널 객체를 찾는다.
+
+1. ``bot.get_channel`` — gateway 캐시 (HTTP 없음)
+2. ``fetch_channel`` 로 가져온 채널 캐시 (``CHANNEL_CACHE_TTL_SEC``)
+3. 네거티브 캐시 — 삭제된 채널은 영구히, 권한이 없던 채널은 ``CHANNEL_NEGATIVE_TTL_SEC``
+   동안 바로 None
+4. ``bot.fetch_channel`` (같은 채널 동시 요청은 한 번으로)
+
+삭제된(NotFound) 채널은 영구 네거티브 캐시에 넣고, 그 채널을 가리키는 길드 상태(마지막
+명령 채널, 음성 채널, 상태 패널)를 정리한다. 그 채널을 알림 채널로 쓰던 타이머는 마지막
+명령 채널로 옮긴다 (없으면 그대로 두고, 영구 네거티브 캐시 덕분에 이벤트마다 실패하는 HTTP
+호출은 없다). 채널 ID는 재사용되지 않으므로 삭제는 영구 캐시해도 안전하다.
+
+접근할 수 없는(Forbidden) 채널은 권한이 되돌아올 수 있으므로 TTL 네거티브 캐시만 두고
+저장된 채널 ID는 건드리지 않는다. 일시적인 오류(5xx 등)는 캐시하지 않는다.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import discord
+
+from app.config import CHANNEL_CACHE_TTL_SEC, CHANNEL_NEGATIVE_TTL_SEC, log
+from app.utils import metrics
+
+Channel = discord.abc.GuildChannel | discord.Thread | discord.abc.PrivateChannel
+
+# ── Registries ─────────────────────────────────────────────────────────────────
+_fetched:  dict[int, tuple[Channel, float]] = {}   # 채널 ID → (채널, 만료 monotonic)
+_missing:  dict[int, float]                 = {}   # 채널 ID → 만료 monotonic
+_inflight: dict[int, asyncio.Task]          = {}
+
+_m_hits     = metrics.counter("channel_cache_hits_total")
+_m_negative = metrics.counter("channel_cache_negative_hits_total")
+_m_fetches  = metrics.counter("channel_fetches_total")
+_m_errors   = metrics.counter("channel_fetch_errors_total")
+_m_dead     = metrics.counter("channel_dead_total")
+_m_denied   = metrics.counter("channel_forbidden_total")
+_m_moved    = metrics.counter("channel_timers_repointed_total")
+
+
+async def resolve_channel(cid: int) -> Channel | None:
+    """채널 ID → 채널 객체. 없거나 접근할 수 없으면 None."""
+    from app.bot.client import bot   # 순환 임포트 방지
+
+    ch = bot.get_channel(cid)
+    if ch is not None:
+        _m_hits.inc()
+        return ch
+    now = time.monotonic()
+    cached = _fetched.get(cid)
+    if cached is not None:
+        if cached[1] > now:
+            _m_hits.inc()
+            return cached[0]
+        del _fetched[cid]
+    until = _missing.get(cid)
+    if until is not None:
+        if until > now:
+            _m_negative.inc()
+            return None
+        del _missing[cid]
+    task = _inflight.get(cid)
+    if task is None:
+        task = _inflight[cid] = asyncio.create_task(_fetch(cid))
+        task.add_done_callback(lambda _t: _inflight.pop(cid, None))
+    return await asyncio.shield(task)
+
+
+async def _fetch(cid: int) -> Channel | None:
+    from app.bot.client import bot
+
+    _m_fetches.inc()
+    try:
+        ch = await bot.fetch_channel(cid)
+    except discord.NotFound:
+        log.info("채널 삭제됨 cid=%d → 네거티브 캐시, 길드 상태 정리", cid)
+        mark_dead(cid)
+        return None
+    except discord.Forbidden:
+        log.info("채널 권한 없음 cid=%d → %.0f초 네거티브 캐시", cid, CHANNEL_NEGATIVE_TTL_SEC)
+        _fetched.pop(cid, None)
+        _missing[cid] = time.monotonic() + CHANNEL_NEGATIVE_TTL_SEC
+        _m_denied.inc()
+        return None
+    except Exception as e:
+        log.warning("채널 조회 실패 cid=%d: %s", cid, e)
+        _m_errors.inc()
+        return None
+    _fetched[cid] = (ch, time.monotonic() + CHANNEL_CACHE_TTL_SEC)
+    return ch
+
+
+def mark_dead(cid: int) -> None:
+    """채널이 삭제됨 — 영구 네거티브 캐시에 넣고 이 채널을 가리키는 길드 상태 정리.
+
+    타이머 알림 채널은 마지막 명령 채널로 옮긴다.
+    """
+    from app.bot.panel_updater import _clear_panel
+    from app.services.guild_state_service import guild_states
+    from app.services.persistence_service import record_meta, record_timer
+
+    _fetched.pop(cid, None)
+    _missing[cid] = float("inf")
+    _m_dead.inc()
+    for gid, gs in list(guild_states.items()):
+        changed = False
+        if gs.last_channel_id == cid:
+            gs.last_channel_id = None
+            changed = True
+        if gs.last_voice_channel_id == cid:
+            gs.last_voice_channel_id = None
+            changed = True
+        if gs.pinned_voice_channel_id == cid:
+            gs.pinned_voice_channel_id = None
+            changed = True
+        if changed:
+            record_meta(gs)
+        if gs.status_panel_channel_id == cid:
+            _clear_panel(gid)
+        stale = [name for name, t in gs.timers.items() if t.channel_id == cid]
+        if stale and gs.last_channel_id:
+            for name in stale:
+                gs.timers[name].channel_id = gs.last_channel_id
+                record_timer(gs, name)
+            _m_moved.inc(len(stale))
+            log.info(
+                "사라진 채널의 타이머 %d개 → 알림 채널 cid=%d guild=%d",
+                len(stale), gs.last_channel_id, gid,
+            )
+        elif changed or stale:
+            log.info("사라진 채널 정리 guild=%d cid=%d", gid, cid)
@@ -4,37 +4,70 @@
 from __future__ import annotations
 
 import asyncio
-import re
-from datetime import datetime
+import time as _time
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import discord
 
-from app.config import KST, PREFIX, TTS_CACHE, _BASE_DIR, _FFMPEG, log
+from app.bot.audio import (
+    announcement_source,
+    audio_source,
+    bell_path,
+    prebuffer,
+    prepare_bell,
+)
+from app.bot.channel_resolver import mark_dead
+from app.bot.outbound import Priority, submit
+from app.bot.outbox import Outbox, dispatch
+from app.bot.panel_updater import (
+    attach_panel,
+    cancel_panel_task,
+    ensure_panel_task,
+    refresh_panel_now,
+)
+from app.bot.tts_engines import engines, synthesize
+from app.bot.voice_manager import connect_voice, on_voice_state, voice_link_state, want_voice
+from app.config import (
+    ANNOUNCE_GAP_MS,
+    ATTENDANCE_MIN_STUDY_SEC,
+    KST,
+    PHRASE_GAP_MS,
+    PREFIX,
+    STATS_DAILY_RETENTION_DAYS,
+    TTS_PREWARM_CONCURRENCY,
+    TTS_SPLICE_PHRASES,
+    VOICE_ANNOUNCE_TTL_SEC,
+    VOICE_COALESCE_SEC,
+    VOICE_QUEUE_MAX,
+    log,
+)
 from app.domain.commands import (
     AddBreakCommand, AttendanceCommand, BreakDeleteCommand,
     BreakEndCommand, BreakListCommand, ClosePanelCommand,
-    HelpCommand, OpenPanelCommand, PersonalPauseCommand,
+    DiagnosticsCommand, HelpCommand, OpenPanelCommand, PersonalPauseCommand,
     PersonalResumeCommand, PresetDeleteCommand, PresetListCommand,
     PresetRunCommand, PresetSaveCommand, RecurringBreakAddCommand,
     RecurringBreakDeleteCommand, RecurringBreakListCommand,
     RefreshPanelCommand, SetRemainingCommand, SetTimerCommand,
-    ShutdownAllCommand, StatusCommand, StatsCommand, StopTimerCommand,
+    ShutdownAllCommand, StatusCommand, StatsCommand, StatsRankCommand, StopTimerCommand,
     VoicePinCommand, VoiceUnpinCommand,
 )
 from app.domain.models import BreakEntry, GuildState, Timer
+from app.domain.stats import day_key
 from app.parsers.command_parser import parse_command
-from app.repositories.state_repository import load_state, save_state
-from app.services import break_service, timer_service
+from app.repositories.tts_cache import get_tts_cache, tts_key
+from app.services import break_service, stats_service, timer_service
 from app.services.guild_state_service import (
     get_guild_state,
     guild_locks,
     guild_states,
-    panel_tasks,
     voice_queues,
     voice_workers,
 )
+from app.services.persistence_service import record_meta, record_preset, record_timer, restore_state
 from app.services.scheduler_service import cancel_scheduler, ensure_scheduler
+from app.utils import metrics
 from app.utils.time_utils import (
     fmt_dur,
     fmt_mm_ss,
@@ -42,142 +75,186 @@ from app.utils.time_utils import (
     now_ts,
 )
 
-def _save() -> None:
-    """guild_states를 JSON에 저장하는 단축 호출."""
-    save_state(guild_states)
+# ── TTS ───────────────────────────────────────────────────────────────────────
 
+_tts_inflight: dict[str, asyncio.Task] = {}   # 문장 → 진행 중인 합성 (single-flight)
 
-# ── TTS ───────────────────────────────────────────────────────────────────────
+_m_tts_requests = metrics.counter("tts_requests_total")
+_m_tts_joined   = metrics.counter("tts_singleflight_joined_total")
 
-async def _make_tts(sentence: str, path: Path) -> bool:
-    try:
-        import edge_tts
-        comm = edge_tts.Communicate(sentence, voice="ko-KR-SunHiNeural")
-        await comm.save(str(path))
-        if path.exists() and path.stat().st_size > 0:
-            log.info("TTS 생성(edge-tts) → %s", path.name)
-            return True
-        log.warning("edge-tts 파일 크기 0, gTTS 시도")
-    except Exception as e:
-        log.warning("edge-tts 실패, gTTS 시도: %s", e)
 
-    try:
-        from gtts import gTTS
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: gTTS(text=sentence, lang="ko").save(str(path)),
-        )
-        if path.exists() and path.stat().st_size > 0:
-            log.info("TTS 생성(gTTS) → %s", path.name)
-            return True
-        log.warning("gTTS 파일 크기 0")
-    except Exception as e:
-        log.warning("gTTS 실패: %s", e)
+async def _get_tts_path(sentence: str) -> Path | None:
+    """문장의 TTS 클립 경로. 길드 공용 캐시에 있으면 재사용, 없으면 합성 후 등록.
 
-    return False
+    같은 문장을 동시에 요청한 길드들은 하나의 합성을 함께 기다린다.
+    """
+    _m_tts_requests.inc()
+    cache = get_tts_cache()
+    for engine in engines():
+        path = cache.get(tts_key(sentence, engine.voice, engine.name))
+        if path is not None:
+            return path
 
+    task = _tts_inflight.get(sentence)
+    if task is None:
+        task = asyncio.create_task(synthesize(sentence))
+        _tts_inflight[sentence] = task
+        task.add_done_callback(lambda _t: _tts_inflight.pop(sentence, None))
+    else:
+        _m_tts_joined.inc()
+    # 기다리던 워커가 취소돼도 다른 길드를 위한 합성은 계속
+    return await asyncio.shield(task)
 
-async def _get_tts_path_keyed(sentence: str, cache_key: str) -> Path | None:
-    TTS_CACHE.mkdir(exist_ok=True)
-    path = TTS_CACHE / cache_key
-    if path.exists() and path.stat().st_size > 0:
-        return path
-    ok = await _make_tts(sentence, path)
-    return path if ok else None
 
+# ── TTS phrases / pre-warm ────────────────────────────────────────────────────
+#
+# 안내 문장은 조각(가변 이름/라벨 + 고정 어구)으로 표현한다. ``TTS_SPLICE_PHRASES``
+# 이면 조각마다 따로 합성·캐시해 재생 시 이어 붙이므로, 고정 어구("공부 시작." 등)는
+# 모든 길드가 한 클립을 공유하고 이름마다 합성은 한 번이다.
 
-# ── Voice ─────────────────────────────────────────────────────────────────────
+Phrase = tuple[str, ...]
 
-import time as _time
+RESUME_PHRASE: Phrase = ("쉬는시간 종료.",)
 
-_voice_fail_until: dict[int, float] = {}   # gid → monotonic 재시도 허용 시각
-_voice_connect_locks: dict[int, asyncio.Lock] = {}  # gid → 동시 연결 방지 락
 
-async def ensure_voice_connected(gid: int, gs: GuildState) -> discord.VoiceClient | None:
-    vc_id = gs.last_voice_channel_id
-    if not vc_id:
-        return None
+def transition_phrase(name: str, mode: str) -> Phrase:
+    return (name, f"{'공부' if mode == 'study' else '휴식'} 시작.")
 
-    # 쿨다운 체크
-    if _time.monotonic() < _voice_fail_until.get(gid, 0):
-        log.debug("음성 연결 쿨다운 중 guild=%d", gid)
-        return None
 
-    vc_channel = bot.get_channel(vc_id)
-    if not isinstance(vc_channel, discord.VoiceChannel):
-        log.warning("음성채널 채널 객체 없음 gid=%d cid=%d", gid, vc_id)
-        return None
+def auto_stop_phrase(name: str) -> Phrase:
+    return (name, "자동 종료.")
 
-    # 이미 연결된 클라이언트 재활용
-    existing = discord.utils.get(bot.voice_clients, guild=vc_channel.guild)
-    if existing and existing.is_connected():
-        if existing.channel.id != vc_id:
-            try:
-                await existing.move_to(vc_channel)
-                log.info("음성채널 이동 guild=%d → ch=%d", gid, vc_id)
-            except Exception:
-                log.exception("음성채널 이동 실패 guild=%d", gid)
-        return existing  # type: ignore[return-value]
 
-    # 동시 연결 시도 방지
-    lock = _voice_connect_locks.setdefault(gid, asyncio.Lock())
-    if lock.locked():
-        log.debug("음성 연결 진행 중, 스킵 guild=%d", gid)
-        return None
+def break_phrase(label: str) -> Phrase:
+    return (label, "시작.")
 
-    async with lock:
-        # 락 획득 후 다시 쿨다운 확인
-        if _time.monotonic() < _voice_fail_until.get(gid, 0):
-            return None
-
-        # 이미 연결되었는지 다시 확인 (락 대기 중 다른 곳에서 연결했을 수 있음)
-        existing = discord.utils.get(bot.voice_clients, guild=vc_channel.guild)
-        if existing and existing.is_connected():
-            return existing  # type: ignore[return-value]
-
-        # 끊어진 voice client 정리
-        if existing:
-            log.info("끊어진 voice client 정리 guild=%d", gid)
-            try:
-                await existing.disconnect(force=True)
-            except Exception:
-                pass
-            await asyncio.sleep(1.0)
 
-        try:
-            vc = await vc_channel.connect(timeout=15.0, reconnect=False)
-            log.info("음성채널 연결 guild=%d ch=%d", gid, vc_id)
-            _voice_fail_until.pop(gid, None)
-            return vc
-        except discord.ClientException:
-            return discord.utils.get(bot.voice_clients, guild=vc_channel.guild)  # type: ignore[return-value]
-        except Exception:
-            log.warning("음성채널 연결 실패 guild=%d (30초 후 재시도)", gid)
-            _voice_fail_until[gid] = _time.monotonic() + 30
-            return None
+def phrase_text(phrase: Phrase) -> str:
+    return " ".join(phrase)
 
 
-async def ensure_voice_disconnected(gid: int) -> None:
-    guild = bot.get_guild(gid)
-    if guild is None:
-        return
-    existing = discord.utils.get(bot.voice_clients, guild=guild)
-    if existing:
+def phrase_segments(phrase: Phrase) -> Phrase:
+    """따로 합성할 조각들 (이어 붙이기를 끄면 문장 하나)."""
+    return phrase if TTS_SPLICE_PHRASES else (phrase_text(phrase),)
+
+
+async def _get_phrase_paths(phrase: Phrase) -> list[Path]:
+    """안내 문장의 클립들. 조각 하나라도 실패하면 문장 전체를 한 번에 합성."""
+    segments = phrase_segments(phrase)
+    paths = await asyncio.gather(*(_get_tts_path(s) for s in segments))
+    if all(paths):
+        return list(paths)
+    if len(segments) > 1:
+        path = await _get_tts_path(phrase_text(phrase))
+        if path is not None:
+            return [path]
+    return []
+
+
+def command_phrases(cmd: object) -> list[Phrase]:
+    """명령이 등록하는 타이머·쉬는시간이 앞으로 말하게 될 문장들."""
+    if isinstance(cmd, SetTimerCommand):
+        phrases = [transition_phrase(cmd.name, "study"), transition_phrase(cmd.name, "rest")]
+        if cmd.auto_stop_cycles is not None or cmd.auto_stop_hhmm is not None:
+            phrases.append(auto_stop_phrase(cmd.name))
+        return phrases
+    if isinstance(cmd, (AddBreakCommand, RecurringBreakAddCommand)):
+        return [break_phrase(cmd.label), RESUME_PHRASE]
+    if isinstance(cmd, PresetSaveCommand):
+        return [p for sub in parse_command(cmd.content) for p in command_phrases(sub)]
+    return []
+
+
+def state_phrases(gs: GuildState) -> list[Phrase]:
+    """복구된 길드 상태가 앞으로 말하게 될 문장들."""
+    phrases: list[Phrase] = []
+    for name, t in gs.timers.items():
+        phrases += [transition_phrase(name, "study"), transition_phrase(name, "rest")]
+        if t.auto_stop_cycles is not None or t.auto_stop_ts is not None:
+            phrases.append(auto_stop_phrase(name))
+    for b in gs.breaks + gs.recurring_breaks:
+        phrases += [break_phrase(b.label), RESUME_PHRASE]
+    return phrases
+
+
+_prewarm_sem:   asyncio.Semaphore | None = None
+_prewarm_tasks: set[asyncio.Task]        = set()
+
+_m_prewarm = metrics.counter("tts_prewarm_total")
+
+
+async def _prewarm_one(sentence: str) -> None:
+    global _prewarm_sem
+    if _prewarm_sem is None:
+        _prewarm_sem = asyncio.Semaphore(TTS_PREWARM_CONCURRENCY)
+    async with _prewarm_sem:
         try:
-            await existing.disconnect(force=True)
-            log.info("음성채널 해제 guild=%d", gid)
+            await _get_tts_path(sentence)
         except Exception:
-            log.exception("음성채널 해제 실패 guild=%d", gid)
+            log.exception("TTS 미리 합성 실패: %s", sentence)
+
+
+def prewarm_tts(phrases: list[Phrase]) -> None:
+    """문장들의 조각을 백그라운드에서 미리 합성 (동시 ``TTS_PREWARM_CONCURRENCY`` 개).
+
+    이벤트가 발생할 때는 캐시만 조회하도록 등록 시점에 호출한다.
+    고정 어구 조각은 중복 제거되어 한 번만 합성된다.
+    """
+    segments = (s for p in phrases for s in phrase_segments(p))
+    for sentence in dict.fromkeys(segments):
+        _m_prewarm.inc()
+        task = asyncio.create_task(_prewarm_one(sentence))
+        _prewarm_tasks.add(task)
+        task.add_done_callback(_prewarm_tasks.discard)
+
 
+# ── Voice ─────────────────────────────────────────────────────────────────────
+
+def _clip_plan(bell: Path | None, phrases: list[list[Path]]) -> tuple[list[Path], list[int]]:
+    """(이어 붙일 클립들, 클립 사이 무음 ms). 없거나 크기 0인 파일은 뺀다."""
+    # (클립, 앞 클립과의 무음 ms) — 문장 사이는 ANNOUNCE_GAP_MS, 조각 사이는 PHRASE_GAP_MS
+    clips = [(bell, 0)] if bell is not None else []
+    for parts in phrases:
+        clips += [(p, PHRASE_GAP_MS if i else ANNOUNCE_GAP_MS) for i, p in enumerate(parts)]
+    ok: list[tuple[Path, int]] = []
+    for p, gap in clips:
+        if p.exists() and p.stat().st_size > 0:
+            ok.append((p, gap))
+        else:
+            log.warning("재생 파일 없거나 크기 0: %s", p)
+    return [p for p, _ in ok], [gap for _, gap in ok[1:]]
 
-async def _play_voice_audio(vc: discord.VoiceClient, path: Path) -> None:
-    if not path.exists() or path.stat().st_size == 0:
-        log.warning("재생 파일 없거나 크기 0: %s", path)
+
+async def _play_voice_audio(
+    vc: discord.VoiceClient, bell: Path | None, phrases: list[list[Path]],
+    due: float | None = None,
+) -> None:
+    """종소리 + 안내 문장들(각각 조각 클립들)을 이어 붙여 한 번에 재생. 이어 붙일 수 없으면 하나씩.
+
+    due는 안내가 예정된 시각 — 재생 시작까지의 지연을 ``voice_announce_jitter_ms`` 로 기록.
+    """
+    paths, gaps = _clip_plan(bell, phrases)
+    if not paths:
+        return
+    source = await announcement_source(paths, gaps)
+    if source is not None:
+        await _play_source(vc, source, "+".join(p.name for p in paths), due)
         return
+    for p in paths:
+        try:
+            source = await audio_source(p)
+        except Exception as exc:
+            log.warning("오디오 소스 오류 [%s]: %s  (%s)", p.name, exc, type(exc).__name__)
+            continue
+        await _play_source(vc, source, p.name, due)
+        due = None
+
 
+async def _play_source(
+    vc: discord.VoiceClient, source: discord.AudioSource, label: str, due: float | None = None,
+) -> None:
     if vc.is_playing():
-        log.warning("이미 재생 중 — stop 후 재생: %s", path.name)
+        log.warning("이미 재생 중 — stop 후 재생: %s", label)
         vc.stop()
         await asyncio.sleep(0.1)
 
@@ -192,23 +269,57 @@ async def _play_voice_audio(vc: discord.VoiceClient, path: Path) -> None:
                 loop.call_soon_threadsafe(done.set_result, None)
 
     try:
-        vc.play(discord.FFmpegOpusAudio(str(path), executable=_FFMPEG), after=after)
-        log.debug("재생 시작: %s", path.name)
+        vc.play(source, after=after)
+        log.debug("재생 시작: %s", label)
+        if due is not None:
+            _m_voice_jitter.observe(max(0.0, now_ts() - due) * 1000)
     except Exception as exc:
-        log.warning("FFmpegOpusAudio 오류 [%s]: %s  (%s)", path.name, exc, type(exc).__name__)
+        log.warning("재생 시작 오류 [%s]: %s  (%s)", label, exc, type(exc).__name__)
+        source.cleanup()
         return
 
     try:
         await asyncio.wait_for(asyncio.shield(done), timeout=300.0)
-        log.debug("재생 완료: %s", path.name)
+        log.debug("재생 완료: %s", label)
     except asyncio.TimeoutError:
-        log.warning("재생 타임아웃 [%s]", path.name)
+        log.warning("재생 타임아웃 [%s]", label)
         try:
             vc.stop()
         except Exception:
             pass
     except Exception as exc:
-        log.warning("재생 오류 [%s]: %s", path.name, exc)
+        log.warning("재생 오류 [%s]: %s", label, exc)
+
+
+# 큐 아이템: (안내 문장, 재생 기한 monotonic, 예정 시각 now_ts — 스케줄러 이벤트만)
+_Announcement = tuple[Phrase, float, float | None]
+
+_m_voice_enqueued = metrics.counter("voice_announcements_total")
+_m_voice_merged   = metrics.counter("voice_announcements_coalesced_total")
+_m_voice_stale    = metrics.counter("voice_announcements_stale_total")
+_m_voice_overflow = metrics.counter("voice_queue_overflow_total")
+_m_voice_dropped  = metrics.counter("voice_announcements_dropped_total")
+_m_voice_depth    = metrics.gauge("voice_queue_depth")
+_m_voice_batch    = metrics.histogram("voice_batch_size", (1, 2, 3, 5, 8, 13))
+_m_voice_wait     = metrics.histogram("voice_queue_wait_ms")
+_m_voice_jitter   = metrics.histogram("voice_announce_jitter_ms")
+_m_voice_prepared = metrics.counter("voice_lookahead_prepared_total")
+
+
+def _update_voice_depth() -> None:
+    _m_voice_depth.set(sum(q.qsize() for q in voice_queues.values()))
+
+
+def _fresh(batch: list[_Announcement]) -> list[_Announcement]:
+    """기한이 지나지 않은 안내들 (같은 문장은 하나로, 들어온 순서)."""
+    now = _time.monotonic()
+    fresh: dict[Phrase, _Announcement] = {}
+    for item in batch:
+        if item[1] < now:
+            _m_voice_stale.inc()
+        else:
+            fresh.setdefault(item[0], item)
+    return list(fresh.values())
 
 
 async def _voice_worker(gid: int) -> None:
@@ -216,43 +327,73 @@ async def _voice_worker(gid: int) -> None:
     q = voice_queues[gid]
     try:
         while True:
-            sentence, cache_key = await q.get()
+            batch: list[_Announcement] = [await q.get()]
             try:
+                # 같은 tick에서 전환된 타이머들의 안내를 종소리 한 번으로 합침 —
+                # 안내를 넣은 tick(길드 락)이 끝나길 최대 VOICE_COALESCE_SEC 기다림
+                lock = guild_locks.get(gid)
+                if lock is not None and lock.locked():
+                    try:
+                        await asyncio.wait_for(_wait_unlocked(lock), VOICE_COALESCE_SEC)
+                    except asyncio.TimeoutError:
+                        pass
+                while not q.empty():
+                    batch.append(q.get_nowait())
+                _update_voice_depth()
+                now = _time.monotonic()
+                for _, deadline, _ in batch:
+                    _m_voice_wait.observe((now - deadline + VOICE_ANNOUNCE_TTL_SEC) * 1000)
+                _m_voice_batch.observe(len(batch))
+                _m_voice_merged.inc(len(batch) - 1)
+
                 gs = guild_states.get(gid)
                 if gs is None or not gs.state_exists():
                     log.debug("상태 없음, 오디오 스킵 guild=%d", gid)
                     continue
 
-                tts_path = await _get_tts_path_keyed(sentence, cache_key)
+                fresh = _fresh(batch)
+                if not fresh:
+                    log.debug("기한 지난 안내만 남음, 스킵 guild=%d", gid)
+                    continue
+                clips = await asyncio.gather(*(_get_phrase_paths(p) for p, _, _ in fresh))
 
-                vc = await ensure_voice_connected(gid, gs)
+                vc = await connect_voice(gid, gs.last_voice_channel_id)
                 if vc is None:
-                    log.debug("음성 연결 불가, 오디오 스킵 guild=%d", gid)
-                    # 연결 실패 시 큐에 남은 아이템도 버림 (재시도 폭풍 방지)
+                    # 연결 실패·백오프 시 큐에 남은 아이템도 버림 (재시도 폭풍 방지)
+                    dropped = len(fresh)
                     while not q.empty():
                         try:
                             q.get_nowait()
                             q.task_done()
+                            dropped += 1
                         except asyncio.QueueEmpty:
                             break
+                    _update_voice_depth()
+                    if gs.last_voice_channel_id:
+                        _m_voice_dropped.inc(dropped)
+                        log.info(
+                            "음성 연결 불가 (%s), 안내 %d개 버림 guild=%d",
+                            voice_link_state(gid).value, dropped, gid,
+                        )
                     continue
 
-                for bell in (_BASE_DIR / "bell.mp3", _BASE_DIR / "bell.wav"):
-                    if bell.exists():
-                        await _play_voice_audio(vc, bell)
-                        break
-                else:
-                    log.debug("bell.mp3 / bell.wav 없음, 벨 스킵")
-
-                if tts_path:
-                    await _play_voice_audio(vc, tts_path)
-                else:
+                # 합성·연결을 기다리는 동안 기한이 지난 안내는 뺌
+                live = _fresh(fresh)
+                if not live:
+                    continue
+                alive = {p for p, _, _ in live}
+                clips = [c for (p, _, _), c in zip(fresh, clips) if p in alive and c]
+                if not clips:
                     log.debug("TTS 생성 실패, TTS 스킵 guild=%d", gid)
+                due = min((d for _, _, d in live if d is not None), default=None)
+                # 종소리 + 안내 문장들을 하나의 클립으로
+                await _play_voice_audio(vc, bell_path(), clips, due)
 
             except Exception:
                 log.exception("오디오 재생 오류 guild=%d", gid)
             finally:
-                q.task_done()
+                for _ in batch:
+                    q.task_done()
 
     except asyncio.CancelledError:
         log.info("음성 워커 종료 guild=%d", gid)
@@ -262,7 +403,7 @@ def _ensure_voice_worker(gid: int) -> None:
     w = voice_workers.get(gid)
     if w is None or w.done():
         if gid not in voice_queues:
-            voice_queues[gid] = asyncio.Queue()
+            voice_queues[gid] = asyncio.Queue(VOICE_QUEUE_MAX)
         voice_workers[gid] = asyncio.create_task(_voice_worker(gid))
 
 
@@ -272,58 +413,69 @@ def _cancel_voice_worker(gid: int) -> None:
         w.cancel()
 
 
-def play_event_audio(gid: int, sentence: str, cache_key: str) -> None:
+async def _wait_unlocked(lock: asyncio.Lock) -> None:
+    async with lock:
+        pass
+
+
+async def prepare_announcement(gid: int, gs: GuildState, phrases: list[Phrase]) -> None:
+    """예정된 안내 ``VOICE_LOOKAHEAD_SEC`` 전 — 음성 연결, TTS 합성, 종소리 + 문장 클립 조립을 미리.
+
+    안내 시각에는 연결·합성·디코딩 없이 캐시된 프레임만 재생하게 된다.
+    """
+    try:
+        clips = await asyncio.gather(*(_get_phrase_paths(p) for p in phrases))
+        await connect_voice(gid, gs.last_voice_channel_id)
+        await prebuffer(*_clip_plan(bell_path(), [c for c in clips if c]))
+        _m_voice_prepared.inc()
+    except Exception:
+        log.exception("안내 미리 준비 실패 guild=%d", gid)
+
+
+def play_event_audio(gid: int, phrase: Phrase, due: float | None = None) -> None:
+    """안내를 길드 음성 큐에 추가. ``VOICE_ANNOUNCE_TTL_SEC`` 안에 재생되지 않으면 버려진다.
+
+    due는 스케줄러 이벤트의 예정 시각 (재생 지연 측정용).
+    """
+
     q = voice_queues.get(gid)
     if q is None:
         return
-    q.put_nowait((sentence, cache_key))
+    if q.full():        # 가장 오래된 안내부터 버림
+        q.get_nowait()
+        q.task_done()
+        _m_voice_overflow.inc()
+    q.put_nowait((phrase, _time.monotonic() + VOICE_ANNOUNCE_TTL_SEC, due))
+    _m_voice_enqueued.inc()
+    _update_voice_depth()
     _ensure_voice_worker(gid)
-    log.debug("오디오 큐 추가 guild=%d [%s]", gid, cache_key)
+    log.debug("오디오 큐 추가 guild=%d [%s]", gid, phrase_text(phrase))
 
 
 # ── Notifications ─────────────────────────────────────────────────────────────
 
-async def _get_channel(cid: int) -> discord.TextChannel | None:
-    ch = bot.get_channel(cid)
-    if ch is None:
-        try:
-            ch = await bot.fetch_channel(cid)
-        except Exception:
-            pass
-    return ch  # type: ignore[return-value]
-
-
-async def _break_channels(gs: GuildState) -> list[discord.TextChannel]:
-    seen: set[int] = set()
-    result: list[discord.TextChannel] = []
+def _break_channel_ids(gs: GuildState) -> set[int]:
+    """쉬는시간 알림을 보낼 채널들 (타이머 채널 + 마지막 명령 채널)."""
     ids = {t.channel_id for t in gs.timers.values()}
     if gs.last_channel_id:
         ids.add(gs.last_channel_id)
-    for cid in ids:
-        if cid not in seen:
-            ch = await _get_channel(cid)
-            if ch:
-                result.append(ch)
-                seen.add(cid)
-    return result
-
-
-async def notify_transition(gid: int, cid: int, name: str, mode: str) -> None:
-    ch = await _get_channel(cid)
-    if ch:
-        label = "휴식" if mode == "rest" else "공부"
-        await ch.send(f"🔔 학교종! **{name}** {label}")
-
-    label_kr  = "공부" if mode == "study" else "휴식"
-    sentence  = f"{name} {label_kr} 시작."
-    safe_name = re.sub(r"[^\w가-힣]", "_", name)[:20]
-    cache_key = f"{gid}_tr_{safe_name}_{mode}.mp3"
-    play_event_audio(gid, sentence, cache_key)
-
-
-async def notify_break_event(
-    gid: int, gs: GuildState, brk: BreakEntry, end_ts: float, extending: bool
+    return ids
+
+
+def notify_transition(
+    box: Outbox, cid: int, name: str, mode: str, due: float | None = None,
+) -> None:
+    box.play(transition_phrase(name, mode), due)
+    label = "휴식" if mode == "rest" else "공부"
+    box.notice(cid, f"🔔 학교종! **{name}** {label}")
+
+
+def notify_break_event(
+    box: Outbox, gs: GuildState, brk: BreakEntry, end_ts: float, extending: bool,
+    due: float | None = None,
 ) -> None:
+    if not extending:
+        box.play(break_phrase(brk.label), due)
     end_dt = datetime.fromtimestamp(end_ts, tz=KST)
     if extending:
         msg = (
@@ -336,19 +488,12 @@ async def notify_break_event(
             f"{fmt_dur(brk.duration_sec)} 일시정지 "
             f"(→ {end_dt.strftime('%H:%M:%S')} 재개)"
         )
-    for ch in await _break_channels(gs):
-        await ch.send(msg)
-    if not extending:
-        sentence   = f"{brk.label} 시작."
-        safe_label = re.sub(r"[^\w가-힣]", "_", brk.label)[:20]
-        cache_key  = f"{gid}_brk_{safe_label}.mp3"
-        play_event_audio(gid, sentence, cache_key)
+    box.notice_many(_break_channel_ids(gs), msg)
 
 
-async def notify_resume(gid: int, gs: GuildState) -> None:
-    for ch in await _break_channels(gs):
-        await ch.send("▶️ 쉬는시간 종료! 모든 타이머 재개")
-    play_event_audio(gid, "쉬는시간 종료.", f"{gid}_resume.mp3")
+def notify_resume(box: Outbox, gs: GuildState, due: float | None = None) -> None:
+    box.play(RESUME_PHRASE, due)
+    box.notice_many(_break_channel_ids(gs), "▶️ 쉬는시간 종료! 모든 타이머 재개")
 
 
 # ── Status builder ────────────────────────────────────────────────────────────
@@ -424,56 +569,85 @@ def build_status(gs: GuildState) -> str:
 
 # ── Stats / Attendance builders ───────────────────────────────────────────────
 
-def build_stats(gs: GuildState, name: str | None = None) -> str:
+def _range_span(rng: stats_service.StatsRange) -> str:
+    if rng.days == 1:
+        return day_key(rng.start)
+    return f"{rng.start.strftime('%m/%d')}~{rng.end.strftime('%m/%d')}"
+
+
+def _range_label(rng: stats_service.StatsRange) -> str:
+    return f"{rng.label} ({_range_span(rng)})"
+
+
+def build_stats(gs: GuildState, name: str | None = None, period: str | None = None) -> str:
     stats = gs.stats
+    today = datetime.now(KST).date()
     if name:
-        lines = [f"📊 **{name} 통계**"]
-        today = datetime.now(KST).date()
-        total_study = 0.0
-        found = False
-        from datetime import timedelta
-        for d in range(7):
-            dt = today - timedelta(days=d)
-            dk = dt.strftime("%Y-%m-%d")
-            day = stats.get(dk, {})
-            entry = day.get(name)
-            if entry:
-                found = True
-                s = entry.get("study", 0)
-                r = entry.get("rest", 0)
-                total_study += s
-                label = "오늘" if d == 0 else dt.strftime("%m/%d")
-                lines.append(f"  • {label} — 공부 {fmt_dur(int(s))} / 휴식 {fmt_dur(int(r))}")
-        if not found:
+        rng = stats_service.resolve_period(period, today, default="7일")
+        lines = [f"📊 **{name} 통계** — {_range_label(rng)}"]
+        live = stats_service.open_intervals(gs)
+        total_study, total_rest = stats_service.user_totals(gs, name, rng, live)
+        if total_study <= 0 and total_rest <= 0:
             lines.append("  기록 없음")
-        else:
-            lines.append(f"  **총 공부: {fmt_dur(int(total_study))}**")
+            return "\n".join(lines)
+        if rng.bucket is None and rng.days <= 7:
+            for d in range(rng.days):
+                dt = rng.end - timedelta(days=d)
+                s, r = stats_service.user_totals(gs, name, stats_service.day_range(dt), live)
+                if s > 0 or r > 0:
+                    label = "오늘" if dt == today else dt.strftime("%m/%d")
+                    lines.append(f"  • {label} — 공부 {fmt_dur(int(s))} / 휴식 {fmt_dur(int(r))}")
+        lines.append(
+            f"  **총 공부: {fmt_dur(int(total_study))}** / 휴식 {fmt_dur(int(total_rest))}"
+        )
+        elapsed = (min(rng.end, today) - rng.start).days + 1
+        if elapsed > 1:
+            lines.append(f"  일평균 공부: {fmt_dur(int(total_study / elapsed))}")
+        streak = stats_service.attendance_streak(gs, name, today)
+        if streak:
+            lines.append(f"  🔥 연속 출석 {streak}일")
+        if rng.bucket is None and rng.start < stats.retained_since(today):
+            lines.append(f"  (일별 기록은 최근 {STATS_DAILY_RETENTION_DAYS}일까지만 보관)")
         return "\n".join(lines)
     else:
-        today_key = datetime.now(KST).strftime("%Y-%m-%d")
-        day = stats.get(today_key, {})
-        if not day:
-            return f"📊 **오늘의 통계** ({today_key})\n  기록 없음"
-        lines = [f"📊 **오늘의 통계** ({today_key})"]
-        for uname, entry in sorted(day.items(), key=lambda x: x[1].get("study", 0), reverse=True):
-            s = entry.get("study", 0)
-            r = entry.get("rest", 0)
+        rng = stats_service.resolve_period(period, today)
+        title = "오늘의 통계" if rng.label == "오늘" else f"{rng.label} 통계"
+        header = f"📊 **{title}** ({_range_span(rng)})"
+        totals = stats_service.guild_totals(gs, rng)
+        if not totals:
+            return f"{header}\n  기록 없음"
+        lines = [header]
+        for uname, (s, r) in sorted(totals.items(), key=lambda x: x[1][0], reverse=True):
             lines.append(f"  • **{uname}** 공부 {fmt_dur(int(s))} / 휴식 {fmt_dur(int(r))}")
         return "\n".join(lines)
 
 
+def build_rank(gs: GuildState, period: str | None = None) -> str:
+    today = datetime.now(KST).date()
+    rng = stats_service.resolve_period(period, today, default="이번주")
+    lines = [f"🏆 **공부 순위** — {_range_label(rng)}"]
+    ranked = stats_service.leaderboard(gs, rng)
+    if not ranked:
+        lines.append("  기록 없음")
+    medals = ("🥇", "🥈", "🥉")
+    for i, (uname, (s, _r)) in enumerate(ranked):
+        mark = medals[i] if i < len(medals) else f"{i + 1}."
+        lines.append(f"  {mark} **{uname}** — {fmt_dur(int(s))}")
+    return "\n".join(lines)
+
+
 def build_attendance(gs: GuildState) -> str:
-    today_key = datetime.now(KST).strftime("%Y-%m-%d")
-    day = gs.stats.get(today_key, {})
+    today = datetime.now(KST).date()
+    today_key = day_key(today)
+    day = stats_service.day_totals(gs, today)
     lines = [f"📋 **출석부** ({today_key})"]
     if not day:
         lines.append("  기록 없음")
     else:
-        for uname, entry in sorted(day.items(), key=lambda x: x[1].get("study", 0), reverse=True):
-            study_sec = entry.get("study", 0)
-            check = "✅" if study_sec >= 3600 else "❌"
+        for uname, (study_sec, _r) in sorted(day.items(), key=lambda x: x[1][0], reverse=True):
+            check = "✅" if study_sec >= ATTENDANCE_MIN_STUDY_SEC else "❌"
             lines.append(f"  {check} **{uname}** — {fmt_dur(int(study_sec))}")
-    lines.append("  (기준: 공부 60분 이상)")
+    lines.append(f"  (기준: 공부 {fmt_dur(ATTENDANCE_MIN_STUDY_SEC)} 이상)")
     return "\n".join(lines)
 
 
@@ -562,14 +736,12 @@ def build_status_embed(gs: GuildState, gid: int) -> discord.Embed:
         )
 
     # 오늘 통계 / 출석
-    today_key = now_dt.strftime("%Y-%m-%d")
-    day = gs.stats.get(today_key, {})
+    today_key = day_key(now_dt.date())
+    day = stats_service.day_totals(gs, now_dt.date())
     if day:
         stat_lines: list[str] = []
-        for uname, entry in sorted(day.items(), key=lambda x: x[1].get("study", 0), reverse=True):
-            s = entry.get("study", 0)
-            r = entry.get("rest", 0)
-            check = "✅" if s >= 3600 else "❌"
+        for uname, (s, r) in sorted(day.items(), key=lambda x: x[1][0], reverse=True):
+            check = "✅" if s >= ATTENDANCE_MIN_STUDY_SEC else "❌"
             stat_lines.append(
                 f"{check} **{uname}** 공부 {fmt_dur(int(s))} / 휴식 {fmt_dur(int(r))}"
             )
@@ -580,75 +752,11 @@ def build_status_embed(gs: GuildState, gid: int) -> discord.Embed:
         )
 
     embed.set_footer(
-        text=f"마지막 갱신: {now_dt.strftime('%H:%M:%S')} KST  |  10초마다 자동 갱신"
+        text=f"마지막 갱신: {now_dt.strftime('%H:%M:%S')} KST  |  변경 시 자동 갱신"
     )
     return embed
 
 
-async def fetch_status_panel_message(
-    gid: int, gs: GuildState
-) -> discord.Message | None:
-    ch_id = gs.status_panel_channel_id
-    msg_id = gs.status_panel_message_id
-    if not ch_id or not msg_id:
-        return None
-    ch = bot.get_channel(ch_id)
-    if ch is None:
-        try:
-            ch = await bot.fetch_channel(ch_id)
-        except Exception:
-            gs.status_panel_channel_id = None
-            gs.status_panel_message_id = None
-            _save()
-            return None
-    try:
-        return await ch.fetch_message(msg_id)  # type: ignore[union-attr]
-    except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-        gs.status_panel_channel_id = None
-        gs.status_panel_message_id = None
-        _save()
-        return None
-
-
-async def update_status_panel(gid: int) -> None:
-    gs = guild_states.get(gid)
-    if gs is None:
-        return
-    panel_msg = await fetch_status_panel_message(gid, gs)
-    if panel_msg is None:
-        return
-    try:
-        embed = build_status_embed(gs, gid)
-        await panel_msg.edit(embed=embed)
-    except Exception:
-        log.exception("패널 갱신 실패 guild=%d", gid)
-
-
-async def panel_updater_loop(gid: int) -> None:
-    log.info("패널 갱신 루프 시작 guild=%d", gid)
-    try:
-        while True:
-            await asyncio.sleep(10)
-            gs = guild_states.get(gid)
-            if gs is None or not gs.status_panel_message_id:
-                break
-            await update_status_panel(gid)
-    except asyncio.CancelledError:
-        log.info("패널 갱신 루프 종료 guild=%d", gid)
-
-
-def ensure_panel_task(gid: int) -> None:
-    t = panel_tasks.get(gid)
-    if t is None or t.done():
-        panel_tasks[gid] = asyncio.create_task(panel_updater_loop(gid))
-
-
-def cancel_panel_task(gid: int) -> None:
-    t = panel_tasks.pop(gid, None)
-    if t and not t.done():
-        t.cancel()
-
-
 # ── Help builder ──────────────────────────────────────────────────────────────
 
 def build_help() -> str:
@@ -674,7 +782,7 @@ def build_help() -> str:
         "```\n"
         "• N회반복: 공부→휴식을 N번 반복 후 자동 종료\n"
         "• 오늘끝 HH:MM: 해당 시각에 자동 종료\n"
-        "• 재시작 시 진행도는 리셋됩니다.\n"
+        "• 봇이 재시작되어도 진행 중인 페이즈·사이클에서 이어갑니다.\n"
         "\n"
         "**2) 개인 타이머 종료**\n"
         "```\n"
@@ -751,9 +859,13 @@ def build_help() -> str:
         "```\n"
         "--학교종 통계\n"
         "--학교종 통계 김동희\n"
+        "--학교종 통계 김동희 30일\n"
+        "--학교종 통계 순위 이번주\n"
         "```\n"
-        "• 전체: 오늘의 공부/휴식 시간 요약\n"
-        "• 개인: 최근 7일간 기록\n"
+        "• 전체: 오늘의 공부/휴식 시간 요약 (`통계 이번주` 처럼 기간 지정 가능)\n"
+        "• 개인: 기본 최근 7일, 기간 지정 시 합계·일평균·연속 출석\n"
+        "• 순위: 공부 시간 상위 10명 (기본 이번주)\n"
+        "• 기간: 오늘 / 어제 / N일 / 이번주 / 지난주 / 이번달 / 지난달\n"
         "• 봇이 켜져 있던 동안 실제 관측 시간만 집계합니다.\n"
         "\n"
         "**13) 출석**\n"
@@ -762,13 +874,19 @@ def build_help() -> str:
         "```\n"
         "• 오늘 공부 60분 이상이면 출석 ✅\n"
         "\n"
+        "**13-1) 진단**\n"
+        "```\n"
+        "--학교종 진단\n"
+        "```\n"
+        "• 저장 지연·대기 건수 등 내부 메트릭을 출력합니다.\n"
+        "\n"
         "**14) 상태 패널** (Discord Embed, 자동 갱신)\n"
         "```\n"
         "--학교종 패널\n"
         "--학교종 패널 해제\n"
         "--학교종 패널 새로고침\n"
         "```\n"
-        "• 패널: Embed 메시지를 생성하고 10초마다 자동 갱신합니다.\n"
+        "• 패널: Embed 메시지를 생성하고 변경될 때마다 자동 갱신합니다.\n"
         "• 해제: 자동 갱신을 중지합니다.\n"
         "• 새로고침: 즉시 패널을 갱신합니다.\n"
         "\n"
@@ -795,25 +913,55 @@ def build_help() -> str:
 
 # ── Message splitter ──────────────────────────────────────────────────────────
 
-async def send_split(ch: discord.abc.Messageable, text: str, limit: int = 1900) -> None:
+def split_text(text: str, limit: int = 1900) -> list[str]:
+    """줄 단위로 limit 이하 조각으로 나눔. 코드 블록(```) 안에서 잘리면 조각마다 닫고 다시 연다."""
     if len(text) <= limit:
-        await ch.send(text)
-        return
+        return [text]
+    chunks: list[str] = []
     chunk = ""
+    fence = False                       # 지금까지의 줄이 코드 블록 안에서 끝나는지
     for line in text.split("\n"):
         add = ("\n" + line) if chunk else line
-        if len(chunk) + len(add) > limit:
-            if chunk:
-                await ch.send(chunk)
-            chunk = line
+        if chunk and len(chunk) + len(add) + (4 if fence else 0) > limit:
+            chunks.append(chunk + "\n```" if fence else chunk)
+            chunk = "```\n" + line if fence else line
         else:
             chunk += add
+        if line.startswith("```"):
+            fence = not fence
     if chunk:
-        await ch.send(chunk)
+        chunks.append(chunk)
+    return chunks
+
+
+async def send_split(
+    ch: discord.abc.Messageable,
+    text: str,
+    limit: int = 1900,
+    priority: Priority = Priority.REPLY,
+) -> None:
+    """outbound dispatcher로 전송 — 조각마다 REST 호출 하나, 순서대로."""
+    for chunk in split_text(text, limit):
+        await submit(ch.id, priority, lambda c=chunk: ch.send(c))
+
+
+def _can_diagnose(user: discord.abc.User) -> bool:
+    """봇 소유자(팀이면 팀 멤버) 또는 길드 관리자."""
+    perms = getattr(user, "guild_permissions", None)
+    if perms is not None and perms.administrator:
+        return True
+    app = bot.application
+    if app is None:
+        return False
+    if app.team is not None:
+        return any(m.id == user.id for m in app.team.members)
+    return app.owner is not None and app.owner.id == user.id
 
 
 # ── Bot ───────────────────────────────────────────────────────────────────────
 
+_m_cmd_lock_hold = metrics.histogram("command_lock_hold_ms")
+
 intents = discord.Intents.default()
 intents.message_content = True
 intents.voice_states    = True
@@ -825,15 +973,17 @@ async def on_ready() -> None:
     assert bot.user
     log.info("로그인: %s (id=%d)", bot.user, bot.user.id)
     ts = now_ts()
-    for gid_str, data in load_state().items():
-        gid = int(gid_str)
-        gs  = get_guild_state(gid)
+    records, stats = restore_state()
+    for gid, store in stats.items():
+        get_guild_state(gid).stats = store
+    for gid, data in records.items():
+        gs = get_guild_state(gid)
         gs.last_channel_id = data.get("last_channel_id")
+        gs.pause_until = data.get("pause_until")
         gs.pinned_voice_channel_id = data.get("pinned_voice_channel_id")
         if gs.pinned_voice_channel_id:
             gs.last_voice_channel_id = gs.pinned_voice_channel_id
         gs.presets = data.get("presets", {})
-        gs.stats = data.get("stats", {})
         gs.status_panel_channel_id = data.get("status_panel_channel_id")
         gs.status_panel_message_id = data.get("status_panel_message_id")
 
@@ -845,9 +995,14 @@ async def on_ready() -> None:
         for b in data.get("recurring_breaks", []):
             gs.recurring_breaks.append(BreakEntry.from_saved(b))
 
-        # 타이머 복구
+        # 타이머 복구 — 꺼져 있던 동안 자동 종료 조건에 도달한 타이머는 종료로 기록
         for name, td in data.get("timers", {}).items():
-            gs.timers[name] = Timer.from_saved(td, ts)
+            timer = Timer.from_saved(td, ts)
+            if timer is None:
+                record_timer(gs, name)
+                log.info("복구 중 자동 종료 guild=%d [%s]", gid, name)
+                continue
+            gs.timers[name] = timer
 
         if gs.timers or gs.breaks or gs.recurring_breaks:
             ensure_scheduler(gid)
@@ -856,9 +1011,27 @@ async def on_ready() -> None:
         if gs.status_panel_message_id:
             ensure_panel_task(gid)
 
+    # TTS 캐시 인덱스 로드 + 크기 0 · 쓰다 만 파일 정리, 종소리 Opus 인코딩,
+    # 복구된 타이머·쉬는시간 문장 미리 합성
+    await asyncio.to_thread(get_tts_cache)
+    await prepare_bell()
+    prewarm_tts([p for gs in guild_states.values() for p in state_phrases(gs)])
     log.info("준비 완료")
 
 
+@bot.event
+async def on_voice_state_update(
+    member: discord.Member, before: discord.VoiceState, after: discord.VoiceState,
+) -> None:
+    if bot.user is not None and member.id == bot.user.id:
+        on_voice_state(member.guild.id, after.channel)
+
+
+@bot.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel) -> None:
+    mark_dead(channel.id)
+
+
 @bot.event
 async def on_message(msg: discord.Message) -> None:
     if msg.author.bot:
@@ -888,11 +1061,16 @@ async def on_message(msg: discord.Message) -> None:
 
     actions = parse_command(raw)
     if not actions:
-        await msg.channel.send("❌ 명령어를 인식할 수 없습니다.")
+        await send_split(msg.channel, "❌ 명령어를 인식할 수 없습니다.")
         return
 
+    # 락 안에서는 상태만 바꾸고, 메시지·음성·패널은 box에 쌓아 락을 푼 뒤 내보냄
+    box = Outbox(gid)
     async with lock:
-        gs.last_channel_id = cid
+        t0 = _time.perf_counter()
+        if gs.last_channel_id != cid:
+            gs.last_channel_id = cid
+            record_meta(gs)
         replies: list[str] = []
 
         for cmd in actions:
@@ -907,21 +1085,27 @@ async def on_message(msg: discord.Message) -> None:
 
             # ── 통계 ──
             elif isinstance(cmd, StatsCommand):
-                replies.append(build_stats(gs, cmd.name))
+                replies.append(build_stats(gs, cmd.name, cmd.period))
+
+            elif isinstance(cmd, StatsRankCommand):
+                replies.append(build_rank(gs, cmd.period))
 
             # ── 출석 ──
             elif isinstance(cmd, AttendanceCommand):
                 replies.append(build_attendance(gs))
 
+            # ── 진단 ──
+            elif isinstance(cmd, DiagnosticsCommand):
+                # 프로세스 전역 메트릭(다른 길드 활동 포함) — 봇 소유자 / 서버 관리자만
+                if _can_diagnose(msg.author):
+                    replies.append("🩺 **진단**\n```\n" + (metrics.format_metrics() or "(없음)") + "\n```")
+                else:
+                    replies.append("❌ 진단은 봇 소유자 또는 서버 관리자만 볼 수 있습니다.")
+
             # ── 패널 ──
             elif isinstance(cmd, OpenPanelCommand):
-                embed = build_status_embed(gs, gid)
-                panel_msg = await msg.channel.send(embed=embed)
-                gs.status_panel_channel_id = msg.channel.id
-                gs.status_panel_message_id = panel_msg.id
-                _save()
-                ensure_panel_task(gid)
-                replies.append("✅ 상태 패널 생성 (10초마다 자동 갱신)")
+                box.defer(lambda ch=msg.channel: _open_panel(gid, ch))
+                replies.append("✅ 상태 패널 생성 (자동 갱신)")
 
             # ── 패널 해제 ──
             elif isinstance(cmd, ClosePanelCommand):
@@ -929,7 +1113,7 @@ async def on_message(msg: discord.Message) -> None:
                     cancel_panel_task(gid)
                     gs.status_panel_channel_id = None
                     gs.status_panel_message_id = None
-                    _save()
+                    record_meta(gs)
                     replies.append("✅ 상태 패널 자동 갱신 해제")
                 else:
                     replies.append("ℹ️ 활성화된 패널이 없습니다.")
@@ -937,8 +1121,8 @@ async def on_message(msg: discord.Message) -> None:
             # ── 패널 새로고침 ──
             elif isinstance(cmd, RefreshPanelCommand):
                 if gs.status_panel_message_id:
-                    await update_status_panel(gid)
-                    replies.append("✅ 패널 새로고침 완료")
+                    # 결과는 편집이 끝난 뒤 응답 (실패·패널 해제도 그대로 알림)
+                    box.defer(lambda ch=msg.channel: _refresh_panel(gid, ch))
                 else:
                     replies.append("ℹ️ 활성화된 패널이 없습니다.")
 
@@ -947,8 +1131,8 @@ async def on_message(msg: discord.Message) -> None:
                 replies.append(timer_service.shutdown_all(gs))
                 cancel_scheduler(gid)
                 _cancel_voice_worker(gid)
-                asyncio.create_task(ensure_voice_disconnected(gid))
-                asyncio.create_task(update_status_panel(gid))
+                want_voice(gid, None)
+                box.refresh_panel()
 
             # ── 쉬는시간 강제 종료 ──
             elif isinstance(cmd, BreakEndCommand):
@@ -956,8 +1140,8 @@ async def on_message(msg: discord.Message) -> None:
                 if reply:
                     replies.append(reply)
                 if should_notify:
-                    await notify_resume(gid, gs)
-                    asyncio.create_task(update_status_panel(gid))
+                    notify_resume(box, gs)
+                    box.refresh_panel()
 
             # ── 음성채널 고정 ──
             elif isinstance(cmd, VoicePinCommand):
@@ -970,7 +1154,7 @@ async def on_message(msg: discord.Message) -> None:
                     vc_ch = msg.author.voice.channel
                     gs.pinned_voice_channel_id = vc_ch.id
                     gs.last_voice_channel_id   = vc_ch.id
-                    _save()
+                    record_meta(gs)
                     replies.append(f"✅ 음성채널 **{vc_ch.name}** 고정")
                 else:
                     replies.append("❌ 음성채널에 먼저 접속해주세요.")
@@ -980,9 +1164,9 @@ async def on_message(msg: discord.Message) -> None:
                 if gs.pinned_voice_channel_id:
                     gs.pinned_voice_channel_id = None
                     gs.last_voice_channel_id   = None
-                    _save()
+                    record_meta(gs)
                     _cancel_voice_worker(gid)
-                    asyncio.create_task(ensure_voice_disconnected(gid))
+                    want_voice(gid, None)
                     replies.append("✅ 음성채널 고정 해제")
                 else:
                     replies.append("ℹ️ 고정된 음성채널이 없습니다.")
@@ -992,18 +1176,19 @@ async def on_message(msg: discord.Message) -> None:
                 reply, removed, state_empty = timer_service.stop_timer(gs, cmd.name)
                 replies.append(reply)
                 if removed:
-                    asyncio.create_task(update_status_panel(gid))
+                    box.refresh_panel()
                     if state_empty:
                         _cancel_voice_worker(gid)
-                        asyncio.create_task(ensure_voice_disconnected(gid))
+                        want_voice(gid, None)
 
             # ── 쉬는시간 등록 ──
             elif isinstance(cmd, AddBreakCommand):
                 replies.append(
                     break_service.add_break(gs, cmd.label, cmd.hhmm, cmd.duration_sec)
                 )
+                prewarm_tts(command_phrases(cmd))
                 ensure_scheduler(gid)
-                asyncio.create_task(update_status_panel(gid))
+                box.refresh_panel()
 
             # ── 쉬는시간 목록 ──
             elif isinstance(cmd, BreakListCommand):
@@ -1014,10 +1199,10 @@ async def on_message(msg: discord.Message) -> None:
                 reply, removed, state_empty = break_service.delete_break(gs, cmd.label)
                 replies.append(reply)
                 if removed:
-                    asyncio.create_task(update_status_panel(gid))
+                    box.refresh_panel()
                     if state_empty:
                         _cancel_voice_worker(gid)
-                        asyncio.create_task(ensure_voice_disconnected(gid))
+                        want_voice(gid, None)
 
             # ── 정규쉬는시간 추가 ──
             elif isinstance(cmd, RecurringBreakAddCommand):
@@ -1026,8 +1211,9 @@ async def on_message(msg: discord.Message) -> None:
                         gs, cmd.label, cmd.hhmm, cmd.duration_sec,
                     )
                 )
+                prewarm_tts(command_phrases(cmd))
                 ensure_scheduler(gid)
-                asyncio.create_task(update_status_panel(gid))
+                box.refresh_panel()
 
             # ── 정규쉬는시간 목록 ──
             elif isinstance(cmd, RecurringBreakListCommand):
@@ -1040,15 +1226,16 @@ async def on_message(msg: discord.Message) -> None:
                 )
                 replies.append(reply)
                 if removed:
-                    asyncio.create_task(update_status_panel(gid))
+                    box.refresh_panel()
                     if state_empty:
                         _cancel_voice_worker(gid)
-                        asyncio.create_task(ensure_voice_disconnected(gid))
+                        want_voice(gid, None)
 
             # ── 프리셋 저장 ──
             elif isinstance(cmd, PresetSaveCommand):
                 gs.presets[cmd.name] = cmd.content
-                _save()
+                record_preset(gs, cmd.name)
+                prewarm_tts(command_phrases(cmd))
                 replies.append(f"✅ 프리셋 **{cmd.name}** 저장: `{cmd.content}`")
 
             # ── 프리셋 실행 ──
@@ -1077,7 +1264,7 @@ async def on_message(msg: discord.Message) -> None:
             elif isinstance(cmd, PresetDeleteCommand):
                 if cmd.name in gs.presets:
                     del gs.presets[cmd.name]
-                    _save()
+                    record_preset(gs, cmd.name)
                     replies.append(f"✅ 프리셋 **{cmd.name}** 삭제")
                 else:
                     replies.append(f"❌ **{cmd.name}** 프리셋 없음")
@@ -1087,14 +1274,14 @@ async def on_message(msg: discord.Message) -> None:
                 reply, changed = timer_service.do_personal_pause(gs, cmd.name)
                 replies.append(reply)
                 if changed:
-                    asyncio.create_task(update_status_panel(gid))
+                    box.refresh_panel()
 
             # ── 개인 재개 ──
             elif isinstance(cmd, PersonalResumeCommand):
                 reply, changed = timer_service.do_personal_resume(gs, cmd.name)
                 replies.append(reply)
                 if changed:
-                    asyncio.create_task(update_status_panel(gid))
+                    box.refresh_panel()
 
             # ── 남은시간 수정 ──
             elif isinstance(cmd, SetRemainingCommand):
@@ -1103,7 +1290,7 @@ async def on_message(msg: discord.Message) -> None:
                 )
                 replies.append(reply)
                 if changed:
-                    asyncio.create_task(update_status_panel(gid))
+                    box.refresh_panel()
 
             # ── 개인 타이머 시작/재설정 ──
             elif isinstance(cmd, SetTimerCommand):
@@ -1113,8 +1300,13 @@ async def on_message(msg: discord.Message) -> None:
                         cid, cmd.auto_stop_cycles, cmd.auto_stop_hhmm,
                     )
                 )
+                prewarm_tts(command_phrases(cmd))
                 ensure_scheduler(gid)
-                asyncio.create_task(update_status_panel(gid))
+                box.refresh_panel()
+
+        # 명령으로 바뀐 데드라인(일시정지/재개/남은시간 등)을 스케줄러에 반영
+        if gs.state_exists():
+            ensure_scheduler(gid)
 
         # 상태가 있는데 음성채널 미설정이면 1회만 안내
         if (
@@ -1127,4 +1319,31 @@ async def on_message(msg: discord.Message) -> None:
                 "ℹ️ 음성채널에 접속한 뒤 명령을 입력하면 음성 안내가 활성화됩니다."
             )
 
-        await send_split(msg.channel, "\n".join(replies))
+        box.send(msg.channel, "\n".join(replies))
+        _m_cmd_lock_hold.observe((_time.perf_counter() - t0) * 1000)
+
+    await dispatch(box)
+
+
+async def _open_panel(gid: int, channel: discord.abc.Messageable) -> None:
+    """상태 패널 메시지를 보내고(락 밖) 길드 상태에 기록(락 안)."""
+    gs = get_guild_state(gid)
+    panel_msg = await submit(
+        channel.id, Priority.REPLY, lambda: channel.send(embed=build_status_embed(gs, gid)),
+    )
+    async with guild_locks[gid]:
+        gs.status_panel_channel_id = panel_msg.channel.id
+        gs.status_panel_message_id = panel_msg.id
+        record_meta(gs)
+    attach_panel(gid, panel_msg)
+    ensure_panel_task(gid)
+
+
+async def _refresh_panel(gid: int, channel: discord.abc.Messageable) -> None:
+    """강제 새로고침(락 밖) — 편집이 끝난 뒤 결과를 응답."""
+    if await refresh_panel_now(gid):
+        await send_split(channel, "✅ 패널 새로고침 완료")
+    elif get_guild_state(gid).status_panel_message_id:
+        await send_split(channel, "⚠️ 패널 새로고침 실패 — 잠시 후 자동으로 다시 갱신합니다.")
+    else:
+        await send_split(channel, "⚠️ 패널 메시지를 찾을 수 없어 패널을 해제했습니다. `패널` 로 다시 만드세요.")
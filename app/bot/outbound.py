@@ -0,0 +1,216 @@
+"""
+학교종 Discord 봇 — 우선순위 outbound dispatcher (route별 rate limit)
+
+메시지 전송과 패널 편집은 모두 ``submit`` 으로 여기를 거친다. 작업 하나 = Discord
+REST 호출 하나이며, 우선순위 클래스 순서로 내보낸다.
+
+- ``NOTICE`` — 전환 · 쉬는시간 · 자동 종료 알림 (시간이 중요)
+- ``REPLY``  — 명령 응답
+- ``PANEL``  — 상태 패널 편집 (최신 상태만 의미 있음)
+
+route(채널 ID)마다 토큰 버킷(``OUTBOUND_ROUTE_PER_SEC``, 버스트
+``OUTBOUND_ROUTE_BURST``)과 전역 버킷(``OUTBOUND_GLOBAL_PER_SEC``)을 미리 계산해
+Discord 429에 부딪히기 전에 기다린다. 한 route는 한 번에 작업 하나만 실행해
+같은 클래스 안에서는 채널별 순서가 지켜지고, 다른 route끼리는 동시에 나간다.
+패널 편집이 몰려도 알림은 앞질러 나간다.
+
+부하가 걸리면 낮은 우선순위부터 덜어낸다.
+
+- 같은 ``key`` 로 대기 중인 작업이 있으면 새 작업으로 바꿔치기 (합침)
+- 대기 작업이 ``OUTBOUND_QUEUE_MAX`` 를 넘거나 ``OUTBOUND_PANEL_MAX_WAIT_SEC`` 보다
+  오래 기다린 패널 편집은 버림 — 결과 ``None``, 호출자가 다음 갱신 때 다시 요청
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.config import (
+    OUTBOUND_GLOBAL_PER_SEC,
+    OUTBOUND_PANEL_MAX_WAIT_SEC,
+    OUTBOUND_QUEUE_MAX,
+    OUTBOUND_ROUTE_BURST,
+    OUTBOUND_ROUTE_PER_SEC,
+)
+from app.utils import metrics
+
+
+class Priority(IntEnum):
+    NOTICE = 0
+    REPLY  = 1
+    PANEL  = 2
+
+
+@dataclass
+class _Job:
+    route:    int
+    priority: Priority
+    fn:       Callable[[], Awaitable[Any]]
+    key:      Hashable | None
+    enqueued: float                                      # time.monotonic()
+    futures:  list[asyncio.Future] = field(default_factory=list)
+
+
+@dataclass
+class _Bucket:
+    rate:   float
+    burst:  float
+    tokens: float
+    at:     float = field(default_factory=time.monotonic)
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.at) * self.rate)
+        self.at = now
+
+    def wait(self) -> float:
+        """토큰 1개가 찰 때까지 남은 초 (refill 직후 호출)."""
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+
+# ── Registries ─────────────────────────────────────────────────────────────────
+_queues:  dict[Priority, deque[_Job]] = {p: deque() for p in Priority}
+_keyed:   dict[Hashable, _Job]        = {}    # key → 대기 중인 작업 (합침용)
+_routes:  dict[int, _Bucket]          = {}
+_busy:    set[int]                    = set() # 작업이 실행 중인 route
+_global   = _Bucket(OUTBOUND_GLOBAL_PER_SEC, OUTBOUND_GLOBAL_PER_SEC, OUTBOUND_GLOBAL_PER_SEC)
+_wakeup:  asyncio.Event | None        = None
+_worker:  asyncio.Task | None         = None
+_seq      = itertools.count()
+
+_m_depth  = metrics.gauge("outbound_queue_depth")
+_m_merged = metrics.counter("outbound_merged_total")
+_m_shed   = metrics.counter("outbound_shed_total")
+_m_errors = metrics.counter("outbound_errors_total")
+_m_queue_ms = {p: metrics.histogram(f"outbound_{p.name.lower()}_queue_ms") for p in Priority}
+_m_sent     = {p: metrics.counter(f"outbound_{p.name.lower()}_sent_total") for p in Priority}
+
+
+def _depth() -> int:
+    return sum(len(q) for q in _queues.values())
+
+
+# ── 요청 ───────────────────────────────────────────────────────────────────────
+
+def submit(
+    route: int,
+    priority: Priority,
+    fn: Callable[[], Awaitable[Any]],
+    key: Hashable | None = None,
+) -> asyncio.Future:
+    """REST 호출 fn을 예약하고 그 결과 Future를 돌려준다 (버려지면 결과 ``None``).
+
+    key가 같은 작업이 아직 대기 중이면 fn만 새것으로 바꾸고 두 호출자 모두 그 결과를 받는다.
+    """
+    global _wakeup, _worker
+    fut = asyncio.get_running_loop().create_future()
+    job = _keyed.get(key) if key is not None else None
+    if job is not None:
+        job.fn = fn
+        job.futures.append(fut)
+        _m_merged.inc()
+        return fut
+    job = _Job(route, priority, fn, key, time.monotonic(), [fut])
+    _queues[priority].append(job)
+    if key is not None:
+        _keyed[key] = job
+    _shed(time.monotonic())
+    _m_depth.set(_depth())
+    if _wakeup is None:
+        _wakeup = asyncio.Event()
+    if _worker is None or _worker.done():
+        _worker = asyncio.create_task(_worker_loop())
+    _wakeup.set()
+    return fut
+
+
+def _drop(job: _Job) -> None:
+    if job.key is not None and _keyed.get(job.key) is job:
+        del _keyed[job.key]
+    for fut in job.futures:
+        if not fut.done():
+            fut.set_result(None)
+    _m_shed.inc()
+
+
+def _shed(now: float) -> None:
+    """부하 덜기 — 오래 기다린 패널 편집, 그래도 넘치면 가장 오래된 패널 편집부터."""
+    panels = _queues[Priority.PANEL]
+    while panels and now - panels[0].enqueued > OUTBOUND_PANEL_MAX_WAIT_SEC:
+        _drop(panels.popleft())
+    while panels and _depth() > OUTBOUND_QUEUE_MAX:
+        _drop(panels.popleft())
+
+
+# ── Worker ─────────────────────────────────────────────────────────────────────
+
+def _pick(now: float) -> tuple[_Job | None, float | None]:
+    """지금 보낼 수 있는 가장 높은 우선순위 작업. 없으면 (None, 다음 토큰까지 초 | None)."""
+    _global.refill(now)
+    if _global.tokens < 1.0:
+        return None, _global.wait()
+    soonest: float | None = None
+    for priority in Priority:
+        q = _queues[priority]
+        for i, job in enumerate(q):
+            if job.route in _busy:
+                continue
+            bucket = _routes.get(job.route)
+            if bucket is None:
+                bucket = _routes[job.route] = _Bucket(
+                    OUTBOUND_ROUTE_PER_SEC, OUTBOUND_ROUTE_BURST, OUTBOUND_ROUTE_BURST,
+                )
+            bucket.refill(now)
+            if bucket.tokens < 1.0:
+                wait = bucket.wait()
+                soonest = wait if soonest is None else min(soonest, wait)
+                continue
+            del q[i]
+            bucket.tokens -= 1.0
+            _global.tokens -= 1.0
+            return job, None
+    return None, soonest
+
+
+async def _run(job: _Job) -> None:
+    try:
+        result = await job.fn()
+    except Exception as e:
+        _m_errors.inc()
+        for fut in job.futures:
+            if not fut.done():
+                fut.set_exception(e)
+    else:
+        _m_sent[job.priority].inc()
+        for fut in job.futures:
+            if not fut.done():
+                fut.set_result(result)
+    finally:
+        _busy.discard(job.route)
+        if _wakeup is not None:
+            _wakeup.set()
+
+
+async def _worker_loop() -> None:
+    assert _wakeup is not None
+    while True:
+        now = time.monotonic()
+        _shed(now)
+        job, wait = _pick(now)
+        if job is None:
+            _m_depth.set(_depth())
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        if job.key is not None and _keyed.get(job.key) is job:
+            del _keyed[job.key]
+        _m_queue_ms[job.priority].observe((now - job.enqueued) * 1000)
+        _busy.add(job.route)
+        asyncio.create_task(_run(job))
@@ -0,0 +1,158 @@
+"""
+학교종 Discord 봇 — tick/명령별 outbox (길드 락 밖에서 Discord I/O)
+
+스케줄러 tick과 명령 처리는 길드 락 안에서 상태만 바꾸고, 보낼 메시지 · 음성
+안내 · 패널 갱신 · 그 밖의 후속 작업은 ``Outbox`` 에 쌓는다. 락을 푼 뒤
+``dispatch`` 가 한꺼번에 내보낸다.
+
+- 음성 안내와 패널 갱신 요청은 즉시 (큐에 넣기만 함)
+- 후속 작업(패널 메시지 생성 등)은 순서대로
+- 알림(``notice``)은 채널별 버퍼에 모아 ``MESSAGE_BATCH_WINDOW_SEC`` 뒤 한 메시지로
+  — 20명이 함께 시작한 타이머가 같은 tick에 전환되면 "🔔 학교종!" 20줄이 메시지 하나
+- 명령 응답(``send``)은 바로, 그 채널에 쌓여 있던 알림을 앞에 붙여 한 메시지로
+- 채널 ID는 ``resolve_channel`` 로 (캐시 · 네거티브 캐시) 찾고, 채널끼리는 동시에 전송하고, 길면 ``send_split`` 규칙으로 나눔
+  (실제 REST 호출은 ``app.bot.outbound`` 가 우선순위 — 알림 > 응답 — 대로)
+
+느린 Discord HTTP 호출이 길드의 tick이나 다른 명령을 막지 않는다.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable
+
+import discord
+
+from app.bot.channel_resolver import resolve_channel
+from app.bot.outbound import Priority
+from app.config import MESSAGE_BATCH_WINDOW_SEC, log
+from app.utils import metrics
+
+Target = int | discord.abc.Messageable   # 채널 ID 또는 채널 객체
+
+_m_dispatch_ms = metrics.histogram("outbox_dispatch_ms")
+_m_messages    = metrics.counter("outbox_messages_total")
+_m_sends       = metrics.counter("outbox_sends_total")
+_m_merged      = metrics.counter("outbox_messages_merged_total")
+_m_errors      = metrics.counter("outbox_send_errors_total")
+
+
+@dataclass
+class Outbox:
+    gid: int
+    messages: list[tuple[Target, str]]                = field(default_factory=list)   # 명령 응답
+    notices:  list[tuple[Target, str]]                = field(default_factory=list)   # 알림
+    audio:    list[tuple[tuple[str, ...], float | None]] = field(default_factory=list)
+    deferred: list[Callable[[], Awaitable[None]]]     = field(default_factory=list)
+    panel:    bool                                    = False
+
+    def send(self, target: Target, text: str) -> None:
+        if text:
+            self.messages.append((target, text))
+
+    def notice(self, target: Target, text: str) -> None:
+        """알림 — ``MESSAGE_BATCH_WINDOW_SEC`` 안에 같은 채널로 가는 알림과 합쳐 보냄."""
+        if text:
+            self.notices.append((target, text))
+
+    def notice_many(self, targets: Iterable[Target], text: str) -> None:
+        for target in targets:
+            self.notice(target, text)
+
+    def play(self, phrase: tuple[str, ...], due: float | None = None) -> None:
+        self.audio.append((phrase, due))
+
+    def refresh_panel(self) -> None:
+        self.panel = True
+
+    def defer(self, fn: Callable[[], Awaitable[None]]) -> None:
+        """락을 푼 뒤 메시지보다 먼저 실행할 작업."""
+        self.deferred.append(fn)
+
+
+# ── 채널별 알림 합치기 ─────────────────────────────────────────────────────────
+
+_pending:  dict[int, tuple[Target, list[str]]] = {}   # 채널 ID → (대상, 아직 안 보낸 알림)
+_flushers: dict[int, asyncio.Task]             = {}
+
+
+def _channel_key(target: Target) -> int:
+    return target if isinstance(target, int) else getattr(target, "id", id(target))
+
+
+def _queue_notice(target: Target, text: str) -> None:
+    """알림을 채널 버퍼에 넣고, 창이 끝나면 한 메시지로 보낸다."""
+    key = _channel_key(target)
+    entry = _pending.get(key)
+    if entry is None:
+        entry = _pending[key] = (target, [])
+    entry[1].append(text)
+    if key not in _flushers:
+        _flushers[key] = asyncio.create_task(_flush_later(key))
+
+
+def _take_pending(key: int) -> list[str]:
+    task = _flushers.pop(key, None)
+    if task is not None:
+        task.cancel()
+    entry = _pending.pop(key, None)
+    return entry[1] if entry else []
+
+
+async def _flush_later(key: int) -> None:
+    await asyncio.sleep(MESSAGE_BATCH_WINDOW_SEC)
+    _flushers.pop(key, None)
+    entry = _pending.pop(key, None)
+    if entry is not None:
+        await _send_all(*entry, Priority.NOTICE)
+
+
+async def _send_all(target: Target, texts: list[str], priority: Priority) -> None:
+    """texts를 한 메시지로 합쳐 priority로 전송 (길면 ``send_split`` 규칙으로 나눔)."""
+    from app.bot.client import send_split
+
+    ch = await resolve_channel(target) if isinstance(target, int) else target
+    if ch is None:
+        log.warning("메시지 채널 없음: %s", target)
+        _m_errors.inc()
+        return
+    _m_messages.inc(len(texts))
+    _m_merged.inc(len(texts) - 1)
+    try:
+        await send_split(ch, "\n".join(texts), priority=priority)
+        _m_sends.inc()
+    except Exception as e:
+        log.warning("메시지 전송 실패 (%s): %s", getattr(ch, "id", target), e)
+        _m_errors.inc()
+
+
+async def dispatch(box: Outbox) -> None:
+    """락을 푼 뒤 호출 — box에 쌓인 부수효과를 내보낸다."""
+    from app.bot.client import play_event_audio
+    from app.bot.panel_updater import request_panel_update
+
+    t0 = time.perf_counter()
+    for phrase, due in box.audio:
+        play_event_audio(box.gid, phrase, due)
+    if box.panel:
+        request_panel_update(box.gid)
+    for fn in box.deferred:
+        try:
+            await fn()
+        except Exception:
+            log.exception("outbox 후속 작업 실패 guild=%d", box.gid)
+    for target, text in box.notices:
+        _queue_notice(target, text)
+    # 응답은 바로 — 그 채널에 쌓여 있던 알림을 앞에 붙여 한 메시지로
+    # (알림이 붙은 응답은 알림 우선순위로)
+    by_target: dict[int, tuple[Target, list[str], Priority]] = {}
+    for target, text in box.messages:
+        key = _channel_key(target)
+        if key not in by_target:
+            pending = _take_pending(key)
+            by_target[key] = (target, pending, Priority.NOTICE if pending else Priority.REPLY)
+        by_target[key][1].append(text)
+    if by_target:
+        await asyncio.gather(*(_send_all(*entry) for entry in by_target.values()))
+    _m_dispatch_ms.observe((time.perf_counter() - t0) * 1000)
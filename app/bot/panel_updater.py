@@ -0,0 +1,343 @@
+"""
+학교종 Discord 봇 — 상태 패널 갱신기
+
+``request_panel_update(gid)`` 는 길드 패널을 dirty로 표시만 하고 바로 돌아온다.
+실제 편집은 전역 dispatcher 하나가 다음 규칙으로 실행한다.
+
+- 길드별 최소 편집 간격 ``PANEL_MIN_EDIT_INTERVAL_SEC`` — 그 사이의 요청은 한 번으로 합침
+- 전역 편집 예산 ``PANEL_EDITS_PER_SEC`` (버스트 ``PANEL_EDIT_BURST``) 토큰 버킷
+- 대기 길드는 FIFO, 길드당 큐에 최대 1개 → 바쁜 길드가 예산을 독점하지 못함
+- 임베드는 편집 직전에 만들어 가장 최신 상태를 반영
+- 푸터(갱신 시각)를 뺀 임베드 지문이 마지막 편집과 같으면 API 호출 생략
+- 메시지는 ``PartialMessage`` 로 캐시해 편집 전에 다시 fetch하지 않음
+- 편집 호출은 ``app.bot.outbound`` 의 가장 낮은 우선순위(``PANEL``)로 — 알림·응답이 먼저
+
+주기 갱신은 카운트다운 때문에만 필요하므로 간격을 상태에 맞춰 바꾼다.
+전환 ``PANEL_FAST_WINDOW_SEC`` 이내면 ``PANEL_FAST_REFRESH_SEC``, 타이머가
+돌고 있으면 ``PANEL_REFRESH_SEC``, 흐르는 카운트다운이 없으면 다음 KST
+자정(오늘 통계 날짜 변경)까지 쉰다. 상태가 바뀌면 갱신 요청이 루프를 깨워
+간격을 다시 계산한다.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import discord
+
+from app.bot.channel_resolver import resolve_channel
+from app.bot.outbound import Priority, submit
+from app.config import (
+    KST,
+    PANEL_EDIT_BURST,
+    PANEL_EDITS_PER_SEC,
+    PANEL_FAST_REFRESH_SEC,
+    PANEL_FAST_WINDOW_SEC,
+    PANEL_MIN_EDIT_INTERVAL_SEC,
+    PANEL_REFRESH_SEC,
+    log,
+)
+from app.domain.models import GuildState
+from app.services.guild_state_service import guild_states, panel_tasks
+from app.services.persistence_service import record_meta
+from app.services.timer_service import is_running
+from app.utils import metrics
+from app.utils.time_utils import now_ts
+
+PanelHandle = discord.Message | discord.PartialMessage
+
+
+@dataclass
+class _Panel:
+    handle: PanelHandle | None = None
+    dirty: bool = False
+    in_flight: bool = False
+    last_edit: float = 0.0                       # time.monotonic()
+    timer: asyncio.TimerHandle | None = None     # 최소 간격 대기 중인 enqueue
+    fingerprint: str | None = None               # 마지막으로 보낸 임베드 지문
+    wake: asyncio.Event = field(default_factory=asyncio.Event)   # 주기 재계산 신호
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)     # 편집 직렬화 (렌더 ~ 전송)
+
+
+# ── Registries ─────────────────────────────────────────────────────────────────
+_panels:   dict[int, _Panel]          = {}
+_queue:    deque[int]                 = deque()   # 편집 대기 길드 (FIFO)
+_queued:   set[int]                   = set()
+_wakeup:   asyncio.Event | None       = None
+_dispatch: asyncio.Task | None        = None
+_tokens:   float                      = float(PANEL_EDIT_BURST)
+_tokens_at: float                     = time.monotonic()
+
+_m_requests  = metrics.counter("panel_update_requests_total")
+_m_coalesced = metrics.counter("panel_update_coalesced_total")
+_m_edits     = metrics.counter("panel_edits_total")
+_m_skipped   = metrics.counter("panel_edits_skipped_total")
+_m_errors    = metrics.counter("panel_edit_errors_total")
+_m_queue     = metrics.gauge("panel_queue_depth")
+_m_latency   = metrics.histogram("panel_edit_latency_ms")
+_m_budget    = metrics.histogram("panel_budget_wait_ms")
+
+
+# ── 요청 ───────────────────────────────────────────────────────────────────────
+
+def request_panel_update(gid: int) -> None:
+    """패널 갱신 요청. 길드에 패널이 없으면 무시. 이벤트 루프 안에서 호출."""
+    gs = guild_states.get(gid)
+    if gs is None or not gs.status_panel_message_id:
+        return
+    _m_requests.inc()
+    p = _panels.setdefault(gid, _Panel())
+    p.dirty = True
+    p.wake.set()
+    if gid in _queued or p.timer is not None or p.in_flight:
+        _m_coalesced.inc()
+        return
+    delay = p.last_edit + PANEL_MIN_EDIT_INTERVAL_SEC - time.monotonic()
+    if delay > 0:
+        p.timer = asyncio.get_running_loop().call_later(delay, _enqueue, gid)
+    else:
+        _enqueue(gid)
+
+
+async def refresh_panel_now(gid: int) -> bool:
+    """사용자가 요청한 새로고침 — 최소 간격은 건너뛰고 예산만 지킨다.
+
+    진행 중인 편집이 있으면 끝날 때까지 기다린 뒤 같은 경로(``_edit``)로 편집하므로
+    오래된 내용이 나중에 덮어쓰지 않는다. 편집이 반영됐으면 True.
+    """
+    p = _panels.setdefault(gid, _Panel())
+    if p.timer is not None:
+        p.timer.cancel()
+        p.timer = None
+    if gid in _queued:
+        _queued.discard(gid)
+        _queue.remove(gid)
+        _m_queue.set(len(_queue))
+    p.dirty = True
+    p.in_flight = True
+    await _take_token()
+    return await _edit(gid, p, force=True)
+
+
+def attach_panel(gid: int, message: PanelHandle) -> None:
+    """새로 보낸 패널 메시지를 캐시 (다음 편집 때 fetch 불필요)."""
+    p = _panels.setdefault(gid, _Panel())
+    p.handle = message
+    p.last_edit = time.monotonic()
+    p.fingerprint = fingerprint(message.embeds[0]) if message.embeds else None
+
+
+def forget_panel(gid: int) -> None:
+    """패널 해제 시 대기 중인 편집과 캐시를 버림."""
+    p = _panels.pop(gid, None)
+    if p is not None and p.timer is not None:
+        p.timer.cancel()
+    if gid in _queued:
+        _queued.discard(gid)
+        _queue.remove(gid)
+        _m_queue.set(len(_queue))
+
+
+# ── Dispatcher ─────────────────────────────────────────────────────────────────
+
+def _enqueue(gid: int) -> None:
+    global _wakeup, _dispatch
+    p = _panels.get(gid)
+    if p is None:
+        return
+    p.timer = None
+    if not p.dirty or gid in _queued:
+        return
+    _queue.append(gid)
+    _queued.add(gid)
+    _m_queue.set(len(_queue))
+    if _wakeup is None:
+        _wakeup = asyncio.Event()
+    if _dispatch is None or _dispatch.done():
+        _dispatch = asyncio.create_task(_dispatch_loop())
+    _wakeup.set()
+
+
+async def _take_token() -> None:
+    """전역 편집 예산에서 토큰 1개를 얻을 때까지 대기."""
+    global _tokens, _tokens_at
+    t0 = time.monotonic()
+    while True:
+        now = time.monotonic()
+        _tokens = min(float(PANEL_EDIT_BURST), _tokens + (now - _tokens_at) * PANEL_EDITS_PER_SEC)
+        _tokens_at = now
+        if _tokens >= 1.0:
+            _tokens -= 1.0
+            _m_budget.observe((now - t0) * 1000)
+            return
+        await asyncio.sleep((1.0 - _tokens) / PANEL_EDITS_PER_SEC)
+
+
+async def _dispatch_loop() -> None:
+    assert _wakeup is not None
+    while True:
+        if not _queue:
+            _wakeup.clear()
+            await _wakeup.wait()
+            continue
+        gid = _queue.popleft()
+        _queued.discard(gid)
+        _m_queue.set(len(_queue))
+        p = _panels.get(gid)
+        if p is None or p.in_flight or _render(gid, p) is None:
+            continue            # 바뀐 내용 없음 → 예산을 쓰지 않음
+        p.in_flight = True
+        await _take_token()
+        if _panels.get(gid) is p:
+            asyncio.create_task(_edit(gid, p))
+        else:
+            p.in_flight = False
+
+
+async def _resolve_handle(gid: int, p: _Panel) -> PanelHandle | None:
+    """캐시된 메시지 핸들. 없으면 채널만 찾아 PartialMessage 생성 (HTTP 없음, 채널 캐시 미스 제외)."""
+    gs = guild_states[gid]
+    ch_id, msg_id = gs.status_panel_channel_id, gs.status_panel_message_id
+    if p.handle is not None and p.handle.id == msg_id and p.handle.channel.id == ch_id:
+        return p.handle
+    ch = await resolve_channel(ch_id) if ch_id else None
+    if ch is None or not msg_id or not hasattr(ch, "get_partial_message"):
+        _clear_panel(gid)
+        return None
+    p.handle = ch.get_partial_message(msg_id)
+    return p.handle
+
+
+def _clear_panel(gid: int) -> None:
+    """패널 메시지가 사라졌거나 권한이 없음 — 패널 해제."""
+    gs = guild_states.get(gid)
+    if gs is not None and gs.status_panel_message_id:
+        gs.status_panel_channel_id = None
+        gs.status_panel_message_id = None
+        record_meta(gs)
+    cancel_panel_task(gid)
+
+
+def fingerprint(embed: discord.Embed) -> str:
+    """푸터(마지막 갱신 시각)를 뺀 임베드 내용의 해시."""
+    data = embed.to_dict()
+    data.pop("footer", None)
+    blob = json.dumps(data, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+def _render(gid: int, p: _Panel, force: bool = False) -> tuple[discord.Embed, str] | None:
+    """현재 상태의 임베드와 지문. 마지막 편집과 같으면 None (dirty 해제)."""
+    from app.bot.client import build_status_embed   # 순환 임포트 방지
+
+    gs = guild_states.get(gid)
+    if gs is None or not gs.status_panel_message_id:
+        forget_panel(gid)
+        return None
+    embed = build_status_embed(gs, gid)
+    fp = fingerprint(embed)
+    if fp == p.fingerprint and not force:
+        p.dirty = False
+        _m_skipped.inc()
+        return None
+    return embed, fp
+
+
+async def _edit(gid: int, p: _Panel, force: bool = False) -> bool:
+    """예산 토큰을 얻은 뒤 호출. 호출 전에 ``p.in_flight`` 를 세운다.
+
+    길드별 ``p.lock`` 으로 직렬화 — 렌더는 잠금 안에서 하므로 나중 편집이 항상 최신.
+    편집이 반영됐으면 True.
+    """
+    t0: float | None = None
+    ok = False
+    async with p.lock:
+        p.in_flight = True
+        try:
+            rendered = _render(gid, p, force)
+            if rendered is None:
+                return False
+            embed, fp = rendered
+            p.dirty = False
+            handle = await _resolve_handle(gid, p)
+            if handle is None:
+                return False
+            t0 = time.perf_counter()
+            # 가장 낮은 우선순위 — 알림·응답이 먼저. 부하로 버려지면 다음 갱신 때 다시
+            edited = await submit(
+                handle.channel.id, Priority.PANEL, lambda: handle.edit(embed=embed), key=("panel", gid),
+            )
+            if edited is None:
+                p.dirty = True
+                return False
+            p.fingerprint = fp
+            _m_edits.inc()
+            ok = True
+        except (discord.NotFound, discord.Forbidden):
+            log.info("패널 메시지 없음/권한 없음 → 패널 해제 guild=%d", gid)
+            _clear_panel(gid)
+        except Exception:
+            log.exception("패널 갱신 실패 guild=%d", gid)
+            _m_errors.inc()
+        finally:
+            if t0 is not None:
+                _m_latency.observe((time.perf_counter() - t0) * 1000)
+                p.last_edit = time.monotonic()
+            p.in_flight = False
+            if p.dirty and _panels.get(gid) is p:
+                request_panel_update(gid)
+    return ok
+
+
+# ── 주기 갱신 (카운트다운) ─────────────────────────────────────────────────────
+
+def refresh_delay(gs: GuildState, ts: float) -> float:
+    """다음 주기 갱신까지의 초 — 가장 가까운 카운트다운 마감에 맞춘 적응형 간격."""
+    deadlines = [t.phase_end_at for t in gs.timers.values() if is_running(gs, t)]
+    if gs.pause_until is not None:
+        deadlines.append(gs.pause_until)
+    if not deadlines:
+        # 흐르는 카운트다운 없음 → 오늘 통계 날짜가 바뀌는 자정까지 쉼
+        today = datetime.fromtimestamp(ts, tz=KST).date()
+        midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=KST)
+        return midnight.timestamp() - ts + 1.0
+    until = min(deadlines) - ts
+    if until <= PANEL_FAST_WINDOW_SEC:
+        return PANEL_FAST_REFRESH_SEC
+    return max(PANEL_FAST_REFRESH_SEC, min(PANEL_REFRESH_SEC, until - PANEL_FAST_WINDOW_SEC))
+
+
+async def panel_refresh_loop(gid: int) -> None:
+    log.info("패널 갱신 루프 시작 guild=%d", gid)
+    try:
+        while True:
+            gs = guild_states.get(gid)
+            if gs is None or not gs.status_panel_message_id:
+                break
+            p = _panels.setdefault(gid, _Panel())
+            p.wake.clear()
+            try:
+                # 갱신 요청(상태 변경)이 오면 깨어나 간격을 다시 계산
+                await asyncio.wait_for(p.wake.wait(), refresh_delay(gs, now_ts()))
+            except asyncio.TimeoutError:
+                request_panel_update(gid)
+    except asyncio.CancelledError:
+        log.info("패널 갱신 루프 종료 guild=%d", gid)
+
+
+def ensure_panel_task(gid: int) -> None:
+    t = panel_tasks.get(gid)
+    if t is None or t.done():
+        panel_tasks[gid] = asyncio.create_task(panel_refresh_loop(gid))
+
+
+def cancel_panel_task(gid: int) -> None:
+    t = panel_tasks.pop(gid, None)
+    if t and not t.done():
+        t.cancel()
+    forget_panel(gid)
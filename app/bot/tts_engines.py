@@ -0,0 +1,211 @@
+"""
+학교종 Discord 봇 — TTS 엔진 (교체 가능한 백엔드, 헤징 합성)
+
+``TTSEngine`` 프로토콜을 만족하는 백엔드를 ``config.TTS_BACKENDS`` 순서(앞쪽이
+우선)로 쓴다.
+
+- ``edge-tts`` — Microsoft Edge 신경망 음성 (네트워크)
+- ``gtts``     — Google TTS (네트워크, 기본 executor)
+- ``espeak``   — espeak-ng 로컬 합성 (오프라인, 설치되어 있을 때만)
+- ``stub``     — 짧은 무음 WAV (오프라인 개발·테스트용)
+
+``synthesize`` 는 요청을 헤징한다 — 우선 엔진이 ``TTS_HEDGE_SEC`` 안에 끝나지
+않으면 다음 엔진을 함께 시작하고 먼저 성공한 쪽을 쓴다. 엔진이 실패하면 기다리지
+않고 바로 다음 엔진을 시작한다. 진 쪽은 취소하고 임시 파일을 지운다.
+결과는 (엔진, 음성, 문장) 키로 TTS 캐시에 Ogg/Opus로 등록된다.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import wave
+from pathlib import Path
+from typing import Protocol
+
+from app.bot.audio import encode_opus
+from app.config import TTS_BACKENDS, TTS_ENGINE_TIMEOUT_SEC, TTS_HEDGE_SEC, log
+from app.repositories.tts_cache import get_tts_cache, tts_key
+from app.utils import metrics
+
+_m_synth   = metrics.counter("tts_synth_total")
+_m_latency = metrics.histogram("tts_synth_latency_ms")
+_m_hedges  = metrics.counter("tts_hedges_total")
+
+
+class TTSEngine(Protocol):
+    """TTS 백엔드. ``synth`` 는 sentence를 path(확장자 ``ext``)에 쓰고, 실패하면 예외."""
+
+    name:  str
+    voice: str
+    ext:   str
+
+    async def synth(self, sentence: str, path: Path) -> None: ...
+
+
+# ── 백엔드 ─────────────────────────────────────────────────────────────────────
+
+class EdgeTTS:
+    name, voice, ext = "edge-tts", "ko-KR-SunHiNeural", ".mp3"
+
+    async def synth(self, sentence: str, path: Path) -> None:
+        import edge_tts
+        await edge_tts.Communicate(sentence, voice=self.voice).save(str(path))
+
+
+class GoogleTTS:
+    name, voice, ext = "gtts", "ko", ".mp3"
+
+    async def synth(self, sentence: str, path: Path) -> None:
+        from gtts import gTTS
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None,
+            lambda: gTTS(text=sentence, lang=self.voice).save(str(path)),
+        )
+
+
+class EspeakTTS:
+    name, voice, ext = "espeak", "ko", ".wav"
+
+    async def synth(self, sentence: str, path: Path) -> None:
+        proc = await asyncio.create_subprocess_exec(
+            "espeak-ng", "-v", self.voice, "-w", str(path), sentence,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, err = await proc.communicate()
+        except asyncio.CancelledError:
+            proc.kill()
+            raise
+        if proc.returncode != 0:
+            raise RuntimeError(err.decode(errors="replace").strip() or f"exit {proc.returncode}")
+
+
+class StubTTS:
+    """네트워크·외부 프로그램 없이 0.3초 무음을 쓰는 엔진 (테스트용).
+
+    delay초 뒤에 쓰고, fail이면 예외 — 헤징 동작을 재현할 때 쓴다.
+    """
+
+    name, voice, ext = "stub", "silence", ".wav"
+
+    def __init__(self, name: str = "stub", delay: float = 0.0, fail: bool = False) -> None:
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+
+    async def synth(self, sentence: str, path: Path) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} 실패 (stub)")
+        with wave.open(str(path), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b"\0\0" * 4800)
+
+
+# ── Backend selection ──────────────────────────────────────────────────────────
+
+_BACKENDS: dict[str, type] = {
+    "edge-tts": EdgeTTS,
+    "gtts":     GoogleTTS,
+    "espeak":   EspeakTTS,
+    "stub":     StubTTS,
+}
+
+_engines: list[TTSEngine] | None = None
+
+
+def create_engine(name: str) -> TTSEngine:
+    """backend 이름으로 엔진 생성. 알 수 없는 이름이면 ValueError."""
+    cls = _BACKENDS.get(name)
+    if cls is None:
+        raise ValueError(f"알 수 없는 TTS 백엔드: {name!r}")
+    return cls()
+
+
+def engines() -> list[TTSEngine]:
+    """설정된 엔진들 (우선순위 순)."""
+    global _engines
+    if _engines is None:
+        _engines = [create_engine(n) for n in TTS_BACKENDS]
+    return _engines
+
+
+def _metric_name(engine: TTSEngine) -> str:
+    return engine.name.replace("-", "_")
+
+
+# ── 합성 ───────────────────────────────────────────────────────────────────────
+
+async def _attempt(engine: TTSEngine, sentence: str) -> Path | None:
+    """엔진 하나로 합성 → Ogg/Opus 인코딩 → 캐시 등록. 실패하면 None (취소는 전파)."""
+    cache = get_tts_cache()
+    key = tts_key(sentence, engine.voice, engine.name)
+    raw = cache.temp_path_for(key, engine.ext)
+    tmp = cache.temp_path_for(key)
+    m = _metric_name(engine)
+    t0 = time.perf_counter()
+    try:
+        await asyncio.wait_for(engine.synth(sentence, raw), TTS_ENGINE_TIMEOUT_SEC)
+        if not raw.exists() or raw.stat().st_size == 0:
+            raise RuntimeError("파일 크기 0")
+        metrics.histogram(f"tts_engine_{m}_latency_ms").observe((time.perf_counter() - t0) * 1000)
+        if not await encode_opus(raw, tmp):
+            raise RuntimeError("Opus 인코딩 실패")
+        path = cache.put(key, tmp, sentence, engine.voice, engine.name)
+        if path is None:
+            raise RuntimeError("파일 크기 0")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        log.warning("%s 실패: %s", engine.name, e or type(e).__name__)
+        metrics.histogram(f"tts_engine_{m}_error_ms").observe((time.perf_counter() - t0) * 1000)
+        return None
+    finally:
+        raw.unlink(missing_ok=True)
+        tmp.unlink(missing_ok=True)
+    metrics.counter(f"tts_engine_{m}_wins_total").inc()
+    _m_synth.inc()
+    log.info("TTS 생성(%s) → %s", engine.name, path.name)
+    return path
+
+
+async def synthesize(sentence: str) -> Path | None:
+    """헤징 합성 — 우선 엔진이 ``TTS_HEDGE_SEC`` 안에 못 끝내거나 실패하면 다음 엔진도 시작."""
+    waiting = list(engines())
+    running: set[asyncio.Task] = set()
+
+    def start_next() -> None:
+        engine = waiting.pop(0)
+        running.add(asyncio.create_task(_attempt(engine, sentence)))
+
+    t0 = time.perf_counter()
+    start_next()
+    try:
+        while running:
+            done, _ = await asyncio.wait(
+                running,
+                timeout=TTS_HEDGE_SEC if waiting else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:            # 지연 예산 초과 — 다음 엔진과 경주
+                _m_hedges.inc()
+                start_next()
+                continue
+            for task in done:
+                running.discard(task)
+                path = task.result()
+                if path is not None:
+                    return path
+            if waiting:             # 실패 — 기다리지 않고 바로 다음 엔진
+                start_next()
+        return None
+    finally:
+        for task in running:
+            task.cancel()
+        _m_latency.observe((time.perf_counter() - t0) * 1000)
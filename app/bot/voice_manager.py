@@ -0,0 +1,261 @@
+"""
+학교종 Discord 봇 — 음성 연결 관리자 (이벤트 기반 상태 머신)
+
+길드마다 원하는 음성 채널(``want_voice``)과 실제 연결 상태를 맞춘다.
+
+    IDLE ──want──▶ CONNECTING ──성공──▶ CONNECTED
+                      │  ▲                 │ 끊김(on_voice_state_update)
+                   실패│  │재시도            ▼
+                      ▼  │            BACKOFF / CONNECTING
+                    BACKOFF
+
+- 스케줄러 tick은 ``want_voice`` 로 원하는 채널만 알려준다. 이미 그 채널에 연결돼
+  있거나 연결·재시도 작업이 진행 중이면 아무것도 하지 않는다 (tick마다 task 생성 없음)
+- 봇 자신의 음성 상태 변경(``on_voice_state``)으로 끊김·강제 이동을 알아채고 다시 맞춘다
+- 실패하면 지수 백오프 + 지터(``VOICE_BACKOFF_BASE_SEC`` ~ ``VOICE_BACKOFF_MAX_SEC``)
+  후 재시도. ``VOICE_STABLE_SEC`` 이상 연결돼 있었으면 실패 횟수를 초기화한다
+- 다른 채널을 원하게 되면 백오프를 버리고 바로 연결한다
+- 안내 재생(``connect_voice``)은 진행 중인 연결을 기다리지만, 백오프 중이면 바로 None
+  (호출자가 버린 안내를 ``voice_announcements_dropped_total`` 로 센다)
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+
+import discord
+
+from app.config import (
+    VOICE_BACKOFF_BASE_SEC,
+    VOICE_BACKOFF_MAX_SEC,
+    VOICE_CONNECT_TIMEOUT_SEC,
+    VOICE_STABLE_SEC,
+    log,
+)
+from app.utils import metrics
+
+
+class LinkState(Enum):
+    IDLE       = "idle"
+    CONNECTING = "connecting"
+    CONNECTED  = "connected"
+    BACKOFF    = "backoff"
+
+
+@dataclass
+class _Link:
+    gid: int
+    want: int | None = None                      # 원하는 음성 채널 ID
+    state: LinkState = LinkState.IDLE
+    vc: discord.VoiceClient | None = None
+    failures: int = 0                            # 연속 실패(끊김 포함) 횟수
+    retry_at: float = 0.0                        # time.monotonic()
+    since: float = 0.0                           # CONNECTED 진입 시각
+    task: asyncio.Task | None = None             # 연결·백오프 작업
+    settled: asyncio.Event = field(default_factory=asyncio.Event)   # 연결 시도 끝남
+
+
+# ── Registries ─────────────────────────────────────────────────────────────────
+_links: dict[int, _Link] = {}
+
+_m_attempts     = metrics.counter("voice_connect_attempts_total")
+_m_failures     = metrics.counter("voice_connect_failures_total")
+_m_drops        = metrics.counter("voice_disconnects_total")
+_m_connected    = metrics.counter("voice_connected_seconds_total")
+_m_connections  = metrics.gauge("voice_connections")
+_m_connect_ms   = metrics.histogram("voice_connect_ms")
+
+
+def _set_state(link: _Link, state: LinkState) -> None:
+    now = time.monotonic()
+    if link.state is LinkState.CONNECTED and state is not LinkState.CONNECTED:
+        _m_connected.inc(now - link.since)
+        _m_connections.dec()
+        if now - link.since >= VOICE_STABLE_SEC:
+            link.failures = 0           # 안정적으로 연결돼 있었음 → 백오프 초기화
+        link.since = 0.0                # 이후 연결 실패는 계속 누적
+    elif state is LinkState.CONNECTED and link.state is not LinkState.CONNECTED:
+        link.since = now
+        _m_connections.inc()
+    if state is LinkState.CONNECTING:
+        link.settled.clear()
+    link.state = state
+
+
+def _on_target(link: _Link) -> bool:
+    vc = link.vc
+    return (
+        link.state is LinkState.CONNECTED
+        and vc is not None and vc.is_connected() and vc.channel.id == link.want
+    )
+
+
+def _backoff(failures: int) -> float:
+    """지수 백오프 + 지터 — [d/2, d], d = base · 2^(failures-1) (상한 max)."""
+    d = min(VOICE_BACKOFF_MAX_SEC, VOICE_BACKOFF_BASE_SEC * 2 ** (failures - 1))
+    return random.uniform(d / 2, d)
+
+
+def _fail(link: _Link) -> float:
+    """실패(끊김) 1회 기록 → 다음 재시도까지 초.
+
+    안정 연결 후의 초기화는 CONNECTED를 떠날 때(``_set_state``) 한 번만 한다.
+    """
+    now = time.monotonic()
+    link.failures += 1
+    delay = _backoff(link.failures)
+    link.retry_at = now + delay
+    return delay
+
+
+# ── 요청 ───────────────────────────────────────────────────────────────────────
+
+def want_voice(gid: int, cid: int | None) -> None:
+    """gid가 cid 음성 채널에 연결돼 있길 원함 (None이면 해제). 이벤트 루프 안에서 호출."""
+    link = _links.get(gid)
+    if link is None:
+        if cid is None:
+            return
+        link = _links[gid] = _Link(gid)
+    if cid != link.want:
+        link.want = cid
+        if link.state is LinkState.BACKOFF and link.task is not None:
+            link.task.cancel()          # 다른 채널 / 해제 — 백오프 대기를 버림
+            link.task = None
+            _set_state(link, LinkState.CONNECTED if link.vc and link.vc.is_connected() else LinkState.IDLE)
+        link.failures = 0
+        link.retry_at = 0.0
+    _reconcile(link)
+
+
+async def connect_voice(gid: int, cid: int | None) -> discord.VoiceClient | None:
+    """cid에 연결된 voice client. 연결 중이면 기다리고, 백오프 중이거나 실패하면 None."""
+    if not cid:
+        return None
+    want_voice(gid, cid)
+    link = _links[gid]
+    if link.state is LinkState.CONNECTING:
+        try:
+            await asyncio.wait_for(link.settled.wait(), VOICE_CONNECT_TIMEOUT_SEC + 5)
+        except asyncio.TimeoutError:
+            return None
+    return link.vc if _on_target(link) else None
+
+
+def voice_link_state(gid: int) -> LinkState:
+    """길드 음성 연결 상태 (진단·로그용)."""
+    link = _links.get(gid)
+    return link.state if link is not None else LinkState.IDLE
+
+
+def on_voice_state(gid: int, channel: discord.abc.Connectable | None) -> None:
+    """봇 자신의 음성 상태가 바뀜 (``on_voice_state_update``) — 끊김·이동 반영."""
+    link = _links.get(gid)
+    if link is None:
+        return
+    if channel is None:
+        if link.state is LinkState.CONNECTED:
+            _m_drops.inc()
+            link.vc = None
+            _set_state(link, LinkState.IDLE)
+            if link.want is not None:
+                delay = _fail(link)
+                log.info("음성 연결 끊김 guild=%d → %.1f초 후 재연결", gid, delay)
+            else:
+                log.info("음성 연결 해제 guild=%d", gid)
+    elif channel.id != link.want:
+        log.info("음성채널 외부 이동 감지 guild=%d ch=%d", gid, channel.id)
+    _reconcile(link)
+
+
+# ── 상태 맞추기 ────────────────────────────────────────────────────────────────
+
+def _reconcile(link: _Link) -> None:
+    if link.task is not None:
+        return                          # 진행 중인 작업이 want를 다시 확인함
+    if link.want is None:
+        if link.state is LinkState.CONNECTED:
+            link.task = asyncio.create_task(_drive(link))
+        return
+    if _on_target(link):
+        return
+    if link.state is LinkState.CONNECTED:   # 끊겼는데 이벤트를 아직 못 받음
+        link.vc = None
+        _set_state(link, LinkState.IDLE)
+    wait = link.retry_at - time.monotonic()
+    _set_state(link, LinkState.BACKOFF if wait > 0 else LinkState.CONNECTING)
+    link.task = asyncio.create_task(_drive(link))
+
+
+async def _drive(link: _Link) -> None:
+    try:
+        while link.want is not None and not _on_target(link):
+            wait = link.retry_at - time.monotonic()
+            if wait > 0:
+                _set_state(link, LinkState.BACKOFF)
+                await asyncio.sleep(wait)
+                continue
+            _set_state(link, LinkState.CONNECTING)
+            await _attempt(link)
+        if link.want is None:
+            await _disconnect(link)
+    finally:
+        if link.task is asyncio.current_task():
+            link.task = None
+        if link.want is None and link.state is LinkState.IDLE:
+            _links.pop(link.gid, None)
+
+
+async def _attempt(link: _Link) -> None:
+    """want 채널로 연결(또는 이동) 1회. 끝나면 CONNECTED 또는 BACKOFF."""
+    from app.bot.channel_resolver import resolve_channel   # 순환 임포트 방지
+    from app.bot.client import bot
+
+    cid = link.want
+    _m_attempts.inc()
+    t0 = time.perf_counter()
+    try:
+        ch = await resolve_channel(cid) if cid else None
+        if not isinstance(ch, discord.VoiceChannel):
+            raise RuntimeError("음성채널 채널 객체 없음")
+        existing = link.vc or discord.utils.get(bot.voice_clients, guild=ch.guild)
+        if existing is not None and existing.is_connected():
+            if existing.channel.id != cid:
+                await existing.move_to(ch)
+                log.info("음성채널 이동 guild=%d → ch=%d", link.gid, cid)
+            vc = existing
+        else:
+            if existing is not None:
+                await existing.disconnect(force=True)
+            vc = await ch.connect(timeout=VOICE_CONNECT_TIMEOUT_SEC, reconnect=False)
+            log.info("음성채널 연결 guild=%d ch=%d", link.gid, cid)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        _m_failures.inc()
+        delay = _fail(link)
+        log.warning("음성채널 연결 실패 guild=%d (%s) → %.1f초 후 재시도", link.gid, e or type(e).__name__, delay)
+        _set_state(link, LinkState.BACKOFF)
+    else:
+        _m_connect_ms.observe((time.perf_counter() - t0) * 1000)
+        link.vc = vc  # type: ignore[assignment]
+        link.retry_at = 0.0
+        _set_state(link, LinkState.CONNECTED)
+    finally:
+        link.settled.set()
+
+
+async def _disconnect(link: _Link) -> None:
+    vc, link.vc = link.vc, None
+    link.failures = 0
+    _set_state(link, LinkState.IDLE)
+    if vc is None:
+        return
+    try:
+        await vc.disconnect(force=True)
+        log.info("음성채널 해제 guild=%d", link.gid)
+    except Exception:
+        log.exception("음성채널 해제 실패 guild=%d", link.gid)
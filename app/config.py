@@ -16,9 +16,71 @@ else:
 
 # ── Constants ─────────────────────────────────────────────────────────────────
 KST        = ZoneInfo("Asia/Seoul")
-STATE_FILE = _BASE_DIR / "state.json"
+STATE_FILE = _BASE_DIR / "state.json"                  # 레거시 단일 파일 (마이그레이션 원본)
+STATE_DIR  = _BASE_DIR / "state"                       # 길드별 상태 파일 디렉토리
+STATS_DIR  = _BASE_DIR / "stats"                       # 길드별 통계 파일 디렉토리
 PREFIX     = "--학교종"
 TTS_CACHE  = _BASE_DIR / "tts_cache"
+OPUS_CACHE = _BASE_DIR / "opus_cache"                  # 사전 인코딩된 종소리 (Ogg/Opus)
+
+# ── Persistence ───────────────────────────────────────────────────────────────
+STATE_BACKEND     = "json"                    # "json" | "sqlite" | "memory"
+STATE_DB          = _BASE_DIR / "state.db"    # sqlite 백엔드 파일
+JOURNAL_FILE      = _BASE_DIR / "state.journal"  # append-only 변경 저널
+SAVE_COALESCE_SEC = 1.0     # 이 시간 안의 변경 레코드는 한 번의 저널 쓰기로 합침
+COMPACT_INTERVAL_SEC = 300.0  # 스냅샷 compaction 최소 주기 (초)
+COMPACT_MAX_RECORDS  = 10_000 # 저널이 이만큼 쌓이면 주기와 무관하게 compaction
+
+# ── Stats ─────────────────────────────────────────────────────────────────────
+STATS_DAILY_RETENTION_DAYS   = 62    # 일별 통계 보관 기간 (이후는 주/월 집계만)
+STATS_WEEKLY_RETENTION_WEEKS = 104   # 주별 집계 보관 기간 (월별은 영구)
+STATS_MAX_PERIOD_DAYS        = 366   # `N일` 기간의 최대 N
+ATTENDANCE_MIN_STUDY_SEC     = 3600  # 출석 인정 기준 공부 시간 (초)
+STATS_CHECKPOINT_SEC         = 300.0 # 진행 중인 구간을 통계에 중간 기록하는 주기 (비정상 종료 대비)
+
+# ── TTS Cache ─────────────────────────────────────────────────────────────────
+TTS_CACHE_MAX_BYTES   = 64 * 1024 * 1024  # TTS 캐시 총 크기 상한 (초과 시 LRU 제거)
+TTS_CACHE_MAX_ENTRIES = 2000              # TTS 캐시 클립 수 상한
+TTS_INDEX_SAVE_DELAY_SEC = 2.0            # 클립 등록 후 인덱스 저장까지 모으는 시간 (worker thread에서 저장)
+TTS_BACKENDS          = ("edge-tts", "gtts", "espeak")   # TTS 엔진 우선순위 (tts_engines 참고)
+TTS_HEDGE_SEC         = 1.5               # 우선 엔진이 이 시간 안에 못 끝내면 다음 엔진도 시작
+TTS_ENGINE_TIMEOUT_SEC = 15.0             # 엔진 하나의 합성 시간 상한
+TTS_PREWARM_CONCURRENCY = 2               # 등록 시 미리 합성하는 작업의 동시 실행 수
+OPUS_BITRATE_KBPS     = 96                # 종소리·TTS 사전 인코딩 비트레이트 (Ogg/Opus 48 kHz)
+AUDIO_FRAME_CACHE_MAX_BYTES = 32 * 1024 * 1024  # 메모리에 올려 두는 Opus 프레임 총 크기 상한 (LRU)
+AUDIO_TRIM_SILENCE    = True              # 인코딩 시 앞뒤 무음 제거
+AUDIO_LOUDNORM        = True              # 인코딩 시 음량 정규화 (종소리와 TTS 음량 맞춤)
+ANNOUNCE_GAP_MS       = 200               # 종소리와 안내 문장 사이 무음 (20 ms 단위)
+TTS_SPLICE_PHRASES    = True              # 이름/라벨과 고정 어구를 따로 합성해 이어 붙임
+PHRASE_GAP_MS         = 60                # 이어 붙인 조각 사이 무음 (20 ms 단위)
+
+# ── Voice Queue ───────────────────────────────────────────────────────────────
+VOICE_QUEUE_MAX        = 16     # 길드별 대기 안내 수 상한 (넘치면 가장 오래된 것부터 버림)
+VOICE_COALESCE_SEC     = 0.5    # 안내를 넣은 tick이 끝나길 기다리는 최대 시간 (그동안 들어온 안내는 종소리 한 번으로)
+VOICE_ANNOUNCE_TTL_SEC = 20.0   # 큐에 들어온 뒤 이 시간이 지난 안내는 재생하지 않음
+VOICE_LOOKAHEAD_SEC    = 10.0   # 예정된 안내 이 시간 전에 음성 연결 · TTS · 클립 조립을 미리
+VOICE_CONNECT_TIMEOUT_SEC = 15.0  # 음성채널 연결 1회 제한 시간
+VOICE_BACKOFF_BASE_SEC    = 2.0   # 연결 실패·끊김 후 첫 재시도 대기 (실패마다 2배, 지터 포함)
+VOICE_BACKOFF_MAX_SEC     = 300.0 # 재시도 대기 상한
+VOICE_STABLE_SEC          = 60.0  # 이만큼 연결돼 있었으면 실패 횟수 초기화
+
+# ── Messages ──────────────────────────────────────────────────────────────────
+MESSAGE_BATCH_WINDOW_SEC    = 0.5   # 이 시간 안에 같은 채널로 가는 알림은 메시지 하나로 합침
+CHANNEL_CACHE_TTL_SEC       = 300.0 # fetch_channel 로 가져온 채널 캐시 유지 시간
+CHANNEL_NEGATIVE_TTL_SEC    = 900.0 # 권한 없는 채널을 다시 조회하지 않는 시간 (삭제된 채널은 영구)
+OUTBOUND_GLOBAL_PER_SEC     = 40.0  # 모든 REST 호출 전역 예산 (Discord 전역 한도 초당 50 아래)
+OUTBOUND_ROUTE_PER_SEC      = 1.0   # 채널(route)별 예산 — Discord 채널 한도 5회/5초
+OUTBOUND_ROUTE_BURST        = 5
+OUTBOUND_QUEUE_MAX          = 200   # 대기 작업이 이보다 많으면 가장 오래된 패널 편집부터 버림
+OUTBOUND_PANEL_MAX_WAIT_SEC = 10.0  # 이보다 오래 기다린 패널 편집은 버림 (다음 갱신이 대신)
+
+# ── Status Panel ──────────────────────────────────────────────────────────────
+PANEL_REFRESH_SEC           = 30.0  # 타이머가 돌고 있을 때 카운트다운 주기 갱신 간격
+PANEL_FAST_REFRESH_SEC      = 5.0   # 전환이 가까울 때의 주기 갱신 간격
+PANEL_FAST_WINDOW_SEC       = 60.0  # 가장 가까운 전환까지 이 시간 이내면 빠른 갱신
+PANEL_MIN_EDIT_INTERVAL_SEC = 2.0   # 길드별 최소 편집 간격 (그 사이 요청은 합침)
+PANEL_EDITS_PER_SEC         = 5.0   # 모든 길드가 나눠 쓰는 전역 편집 예산
+PANEL_EDIT_BURST            = 10    # 예산 토큰 버킷 크기
 
 # ── Logging ───────────────────────────────────────────────────────────────────
 logging.basicConfig(
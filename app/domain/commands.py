@@ -12,10 +12,18 @@ class StatusCommand: pass
 @dataclass
 class StatsCommand:
     name: str | None = None
+    period: str | None = None        # "오늘" | "어제" | "N일" | "이번주" | ... (None = 기본)
+
+@dataclass
+class StatsRankCommand:
+    period: str | None = None
 
 @dataclass
 class AttendanceCommand: pass
 
+@dataclass
+class DiagnosticsCommand: pass
+
 @dataclass
 class OpenPanelCommand: pass
 
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 
+from app.domain.stats import StatsStore
 from app.utils.time_utils import next_occurrence_ts
 
 
@@ -23,17 +24,30 @@ class Timer:
     last_accounted_at: float = 0.0
 
     def to_save_dict(self) -> dict:
-        """영속 저장용 (runtime 필드 제외)."""
+        """영속 저장용 — 재시작 후 같은 페이즈에서 이어가도록 진행 상태 포함."""
         return {
-            "study_sec":  self.study_sec,
-            "rest_sec":   self.rest_sec,
-            "channel_id": self.channel_id,
+            "study_sec":                   self.study_sec,
+            "rest_sec":                    self.rest_sec,
+            "channel_id":                  self.channel_id,
+            "mode":                        self.mode,
+            "phase_end_at":                self.phase_end_at,
+            "remaining_on_pause":          self.remaining_on_pause,
+            "remaining_on_personal_pause": self.remaining_on_personal_pause,
+            "auto_stop_cycles":            self.auto_stop_cycles,
+            "cycle_count":                 self.cycle_count,
+            "auto_stop_ts":                self.auto_stop_ts,
         }
 
     @classmethod
-    def from_saved(cls, data: dict, ts: float) -> Timer:
-        """state.json에서 복원 — study 모드, now부터 리셋."""
-        return cls(
+    def from_saved(cls, data: dict, ts: float) -> Timer | None:
+        """저장 상태에서 복원.
+
+        진행 상태가 있으면 그 페이즈에서 이어가고, 꺼져 있던 동안 지난 페이즈는
+        건너뛴다 (사이클 수에 반영). 꺼져 있던 동안 자동 종료 조건(종료 시각,
+        반복 횟수)에 도달했으면 None. 진행 상태가 없는 예전 형식이면
+        study 모드로 now부터 리셋.
+        """
+        timer = cls(
             study_sec=data["study_sec"],
             rest_sec=data["rest_sec"],
             channel_id=data["channel_id"],
@@ -41,6 +55,45 @@ class Timer:
             phase_end_at=ts + data["study_sec"],
             last_accounted_at=ts,
         )
+        if "phase_end_at" not in data:
+            return timer
+        timer.mode                        = data.get("mode", "study")
+        timer.phase_end_at                = data["phase_end_at"]
+        timer.remaining_on_pause          = data.get("remaining_on_pause")
+        timer.remaining_on_personal_pause = data.get("remaining_on_personal_pause")
+        timer.auto_stop_cycles            = data.get("auto_stop_cycles")
+        timer.cycle_count                 = data.get("cycle_count", 0)
+        timer.auto_stop_ts                = data.get("auto_stop_ts")
+        if timer.remaining_on_pause is None and timer.remaining_on_personal_pause is None:
+            if timer.fast_forward(ts):
+                return None
+        return timer
+
+    def fast_forward(self, ts: float) -> bool:
+        """phase_end_at이 ts 이전이면 지난 페이즈를 건너뛰어 ts가 속한 페이즈로 맞춤.
+
+        그 사이 자동 종료 조건에 도달했으면 True.
+        """
+        period = self.study_sec + self.rest_sec
+        if period <= 0 or self.phase_end_at > ts:
+            return self.auto_stopped(ts)
+        # 한 주기(공부+휴식)씩 통째로 건너뛰고, 남은 것은 페이즈 단위로
+        skipped = int((ts - self.phase_end_at) // period)
+        self.phase_end_at += skipped * period
+        self.cycle_count  += skipped
+        while self.phase_end_at <= ts:
+            self.mode = "rest" if self.mode == "study" else "study"
+            if self.mode == "study":
+                self.cycle_count += 1
+            self.phase_end_at += getattr(self, f"{self.mode}_sec")
+        return self.auto_stopped(ts)
+
+    def auto_stopped(self, ts: float) -> bool:
+        """종료 시각이 지났거나 반복 횟수를 채웠는지."""
+        return (
+            (self.auto_stop_ts is not None and ts >= self.auto_stop_ts)
+            or (self.auto_stop_cycles is not None and self.cycle_count >= self.auto_stop_cycles)
+        )
 
 
 @dataclass
@@ -71,11 +124,12 @@ class BreakEntry:
 
 @dataclass
 class GuildState:
+    gid: int = 0                                           # runtime only
     timers: dict[str, Timer] = field(default_factory=dict)
     presets: dict[str, str] = field(default_factory=dict)
     breaks: list[BreakEntry] = field(default_factory=list)
     recurring_breaks: list[BreakEntry] = field(default_factory=list)
-    stats: dict = field(default_factory=dict)
+    stats: StatsStore = field(default_factory=StatsStore)     # 별도 저장 (stats/)
     pause_until: float | None = None
     last_channel_id: int | None = None
     last_voice_channel_id: int | None = None
@@ -83,25 +137,30 @@ class GuildState:
     voice_notice_sent: bool = False
     status_panel_channel_id: int | None = None
     status_panel_message_id: int | None = None
-    last_stats_save: float = 0.0                           # runtime only
 
     def state_exists(self) -> bool:
         """타이머 또는 쉬는시간이 1개 이상 있으면 True."""
         return bool(self.timers) or bool(self.breaks) or bool(self.recurring_breaks)
 
-    def to_save_dict(self) -> dict:
-        """state.json 저장용 dict."""
+    def meta_save_dict(self) -> dict:
+        """채널·패널·일시정지 등 단일 값 필드만."""
         return {
             "last_channel_id":          self.last_channel_id,
             "pinned_voice_channel_id":  self.pinned_voice_channel_id,
-            "presets":                  self.presets,
+            "status_panel_channel_id":  self.status_panel_channel_id,
+            "status_panel_message_id":  self.status_panel_message_id,
+            "pause_until":              self.pause_until,
+        }
+
+    def to_save_dict(self) -> dict:
+        """저장용 dict (통계 제외). 다른 스레드에서 인코딩해도 안전하도록 복사본을 만든다."""
+        return {
+            **self.meta_save_dict(),
+            "presets":                  dict(self.presets),
             "timers": {
                 name: t.to_save_dict()
                 for name, t in self.timers.items()
             },
             "breaks": [b.to_save_dict() for b in self.breaks],
             "recurring_breaks": [b.to_save_dict() for b in self.recurring_breaks],
-            "stats":                    self.stats,
-            "status_panel_channel_id":  self.status_panel_channel_id,
-            "status_panel_message_id":  self.status_panel_message_id,
         }
@@ -0,0 +1,224 @@
+"""
+학교종 Discord 봇 — 공부/휴식 통계 저장소 (일/주/월 롤업 + 보존 기간)
+
+원본 일별 버킷은 ``STATS_DAILY_RETENTION_DAYS`` 일만 보관하고, 주별
+(ISO 주, ``"2026-W10"``) · 월별 (``"2026-03"``) 집계는 누적할 때 함께
+갱신한다. 오래된 일별 버킷을 버려도 주/월 합계는 그대로 남으므로
+보존 기간이 지난 데이터는 자동으로 주/월 단위로 "말려 올라간" 셈이다.
+주별 집계는 ``STATS_WEEKLY_RETENTION_WEEKS`` 주, 월별 집계는 영구 보관.
+
+임의 기간 조회를 위해 이름별 일별 누적합(prefix sum)을 메모리에 함께 유지한다
+(저장하지 않고 로드 시 일별 버킷에서 다시 만든다). 오늘 날짜에 누적하는 흔한
+경우 갱신은 O(1), 보존 기간 안의 어떤 기간 합계도 O(1).
+
+엔트리 형식은 ``{"study": 초, "rest": 초}``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+
+from app.config import KST, STATS_DAILY_RETENTION_DAYS, STATS_WEEKLY_RETENTION_WEEKS
+
+Buckets = dict[str, dict[str, dict[str, float]]]   # {기간 키: {이름: 엔트리}}
+
+
+def day_key(d: date) -> str:
+    return d.strftime("%Y-%m-%d")
+
+
+def week_key(d: date) -> str:
+    iso = d.isocalendar()
+    return f"{iso[0]}-W{iso[1]:02d}"
+
+
+def month_key(d: date) -> str:
+    return f"{d.year}-{d.month:02d}"
+
+
+def split_by_day(start: float, end: float) -> list[tuple[date, float]]:
+    """[start, end) 구간(Unix 초)을 KST 자정 기준으로 나눈 [(날짜, 초)]."""
+    pieces: list[tuple[date, float]] = []
+    while start < end:
+        d = datetime.fromtimestamp(start, tz=KST).date()
+        midnight = datetime.combine(d + timedelta(days=1), time(), tzinfo=KST).timestamp()
+        cut = min(end, midnight)
+        pieces.append((d, cut - start))
+        start = cut
+    return pieces
+
+
+def _add(buckets: Buckets, key: str, name: str, mode: str, seconds: float) -> None:
+    entry = buckets.setdefault(key, {}).setdefault(name, {"study": 0.0, "rest": 0.0})
+    entry[mode] = entry.get(mode, 0.0) + seconds
+
+
+def _copy(buckets: Buckets) -> Buckets:
+    return {k: {n: dict(e) for n, e in names.items()} for k, names in buckets.items()}
+
+
+@dataclass
+class _Prefix:
+    """이름 하나의 일별 누적합. study[i] / rest[i] = (base + i)일까지의 누적.
+
+    보존 기간 정리로 앞부분을 잘라내면 잘린 구간의 누적은 ``before`` 에 남긴다.
+    """
+    base: int                                   # study[0]의 date ordinal
+    study: list[float] = field(default_factory=list)
+    rest:  list[float] = field(default_factory=list)
+    before: tuple[float, float] = (0.0, 0.0)
+
+    def add(self, day: int, mode: str, seconds: float) -> None:
+        if day < self.base:
+            pad = self.base - day
+            self.study[:0] = [self.before[0]] * pad
+            self.rest[:0]  = [self.before[1]] * pad
+            self.base = day
+        i = day - self.base
+        if i >= len(self.study):
+            last_s, last_r = self.at(self.base + len(self.study) - 1)
+            pad = i + 1 - len(self.study)
+            self.study.extend([last_s] * pad)
+            self.rest.extend([last_r] * pad)
+        arr = self.study if mode == "study" else self.rest
+        for j in range(i, len(arr)):            # 보통 마지막 칸 하나
+            arr[j] += seconds
+
+    def at(self, day: int) -> tuple[float, float]:
+        """day까지의 누적 (study, rest)."""
+        i = min(day - self.base, len(self.study) - 1)
+        if i < 0:
+            return self.before
+        return self.study[i], self.rest[i]
+
+    def range(self, start: int, end: int) -> tuple[float, float]:
+        """start ~ end (양끝 포함) 합계."""
+        if end < start:
+            return 0.0, 0.0
+        hi, lo = self.at(end), self.at(start - 1)
+        return hi[0] - lo[0], hi[1] - lo[1]
+
+    def drop_before(self, day: int) -> None:
+        k = min(day - self.base, len(self.study))
+        if k > 0:
+            self.before = (self.study[k - 1], self.rest[k - 1])
+            del self.study[:k]
+            del self.rest[:k]
+            self.base += k
+
+
+@dataclass
+class StatsStore:
+    daily:   Buckets = field(default_factory=dict)
+    weekly:  Buckets = field(default_factory=dict)
+    monthly: Buckets = field(default_factory=dict)
+    _prefix: dict[str, _Prefix] = field(default_factory=dict, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._rebuild_prefix()
+
+    def _rebuild_prefix(self) -> None:
+        self._prefix.clear()
+        for dk in sorted(self.daily):
+            o = date.fromisoformat(dk).toordinal()
+            for name, e in self.daily[dk].items():
+                for mode in ("study", "rest"):
+                    self._add_prefix(o, name, mode, e.get(mode, 0.0))
+
+    def _add_prefix(self, o: int, name: str, mode: str, seconds: float) -> None:
+        p = self._prefix.get(name)
+        if p is None:
+            p = self._prefix[name] = _Prefix(base=o)
+        p.add(o, mode, seconds)
+
+    # ── 누적 ──────────────────────────────────────────────────────────────────
+
+    def add(self, day: date, name: str, mode: str, seconds: float) -> None:
+        """day(KST 날짜)에 seconds 누적. mode는 "study" | "rest"."""
+        if seconds <= 0:
+            return
+        dk = day_key(day)
+        if dk not in self.daily:
+            self.prune(day)          # 날짜가 바뀔 때만 보존 기간 정리
+        _add(self.daily, dk, name, mode, seconds)
+        _add(self.weekly, week_key(day), name, mode, seconds)
+        _add(self.monthly, month_key(day), name, mode, seconds)
+        self._add_prefix(day.toordinal(), name, mode, seconds)
+
+    def prune(self, today: date) -> None:
+        """보존 기간이 지난 일별·주별 버킷 제거 (주/월 합계에는 이미 반영됨)."""
+        first    = self.retained_since(today)
+        day_cut  = day_key(first)
+        week_cut = week_key(today - timedelta(weeks=STATS_WEEKLY_RETENTION_WEEKS))
+        for k in [k for k in self.daily if k < day_cut]:
+            del self.daily[k]
+        for k in [k for k in self.weekly if k < week_cut]:
+            del self.weekly[k]
+        for name in list(self._prefix):
+            p = self._prefix[name]
+            p.drop_before(first.toordinal())
+            if not p.study:
+                del self._prefix[name]
+
+    @staticmethod
+    def retained_since(today: date) -> date:
+        """일별 기록이 남아 있는 가장 오래된 날짜."""
+        return today - timedelta(days=STATS_DAILY_RETENTION_DAYS)
+
+    # ── 조회 ──────────────────────────────────────────────────────────────────
+
+    def day_totals(self, day: date) -> dict[str, dict[str, float]]:
+        """그날 {이름: 엔트리}. 기록이 없으면 빈 dict."""
+        return self.daily.get(day_key(day), {})
+
+    def user_day(self, name: str, day: date) -> dict[str, float] | None:
+        return self.daily.get(day_key(day), {}).get(name)
+
+    def week_totals(self, day: date) -> dict[str, dict[str, float]]:
+        """day가 속한 ISO 주의 {이름: 엔트리}."""
+        return self.weekly.get(week_key(day), {})
+
+    def month_totals(self, day: date) -> dict[str, dict[str, float]]:
+        """day가 속한 달의 {이름: 엔트리}."""
+        return self.monthly.get(month_key(day), {})
+
+    def names(self) -> list[str]:
+        """보존 기간 안에 일별 기록이 있는 이름들."""
+        return list(self._prefix)
+
+    def range_totals(self, name: str, start: date, end: date) -> tuple[float, float]:
+        """start ~ end (양끝 포함) 동안 name의 (공부, 휴식) 초. 누적합으로 O(1).
+
+        보존 기간 밖의 날짜는 0으로 취급한다.
+        """
+        p = self._prefix.get(name)
+        if p is None:
+            return 0.0, 0.0
+        return p.range(start.toordinal(), end.toordinal())
+
+    # ── 저장 / 복원 ───────────────────────────────────────────────────────────
+
+    def to_save_dict(self) -> dict:
+        """저장용 dict. 다른 스레드에서 인코딩해도 안전하도록 복사본."""
+        return {
+            "daily":   _copy(self.daily),
+            "weekly":  _copy(self.weekly),
+            "monthly": _copy(self.monthly),
+        }
+
+    @classmethod
+    def from_saved(cls, data: dict, today: date) -> StatsStore:
+        """저장 dict에서 복원. 주/월 집계가 없으면 (예전 ``stats`` 형식) 일별에서 다시 만든다."""
+        store = cls(daily=data.get("daily", {}))
+        if "weekly" in data and "monthly" in data:
+            store.weekly  = data["weekly"]
+            store.monthly = data["monthly"]
+        else:
+            for dk, names in store.daily.items():
+                d = date.fromisoformat(dk)
+                for name, e in names.items():
+                    for mode in ("study", "rest"):
+                        _add(store.weekly, week_key(d), name, mode, e.get(mode, 0.0))
+                        _add(store.monthly, month_key(d), name, mode, e.get(mode, 0.0))
+        store.prune(today)
+        return store
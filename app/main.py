@@ -26,7 +26,22 @@ def main() -> None:
             raise SystemExit("토큰이 없습니다.")
 
     from app.bot.client import bot
-    bot.run(token, log_handler=None)
+    from app.repositories.state_repository import get_repository
+    from app.repositories.tts_cache import close_tts_cache
+    from app.services.guild_state_service import guild_states
+    from app.services.persistence_service import flush_sync
+    from app.services.timer_service import account_running
+    from app.utils.time_utils import now_ts
+    try:
+        bot.run(token, log_handler=None)
+    finally:
+        # 진행 중인 통계 구간을 닫은 뒤 스냅샷 저장
+        ts = now_ts()
+        for gs in guild_states.values():
+            account_running(gs, ts)
+        flush_sync()
+        get_repository().close()
+        close_tts_cache()
 
 
 if __name__ == "__main__":
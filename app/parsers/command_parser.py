@@ -4,15 +4,15 @@ from __future__ import annotations
 from app.domain.commands import (
     AddBreakCommand, AttendanceCommand, BreakDeleteCommand,
     BreakEndCommand, BreakListCommand, ClosePanelCommand,
-    HelpCommand, OpenPanelCommand, PersonalPauseCommand,
+    DiagnosticsCommand, HelpCommand, OpenPanelCommand, PersonalPauseCommand,
     PersonalResumeCommand, PresetDeleteCommand, PresetListCommand,
     PresetRunCommand, PresetSaveCommand, RecurringBreakAddCommand,
     RecurringBreakDeleteCommand, RecurringBreakListCommand,
     RefreshPanelCommand, SetRemainingCommand, SetTimerCommand,
-    ShutdownAllCommand, StatusCommand, StatsCommand, StopTimerCommand,
+    ShutdownAllCommand, StatusCommand, StatsCommand, StatsRankCommand, StopTimerCommand,
     VoicePinCommand, VoiceUnpinCommand,
 )
-from app.utils.time_utils import _RE_HHMM, _RE_REPEAT, dur_tok, time_tok
+from app.utils.time_utils import _RE_HHMM, _RE_REPEAT, dur_tok, period_tok, time_tok
 
 
 def parse_command(raw: str) -> list:
@@ -35,14 +35,22 @@ def parse_command(raw: str) -> list:
             i += 1
             continue
 
-        # 1-1) 통계 / 통계 [이름]
+        # 1-1) 통계 [기간]? / 통계 순위 [기간]? / 통계 [이름] [기간]?
         if tok == "통계":
-            if i + 1 < len(tokens):
-                commands.append(StatsCommand(name=tokens[i + 1]))
-                i += 2
-            else:
+            nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+            after = period_tok(tokens[i + 2]) if i + 2 < len(tokens) else None
+            if nxt is None:
                 commands.append(StatsCommand())
                 i += 1
+            elif period_tok(nxt):
+                commands.append(StatsCommand(period=nxt))
+                i += 2
+            elif nxt == "순위":
+                commands.append(StatsRankCommand(period=after))
+                i += 3 if after else 2
+            else:
+                commands.append(StatsCommand(name=nxt, period=after))
+                i += 3 if after else 2
             continue
 
         # 1-2) 출석
@@ -51,6 +59,12 @@ def parse_command(raw: str) -> list:
             i += 1
             continue
 
+        # 1-2a) 진단 (메트릭)
+        if tok == "진단":
+            commands.append(DiagnosticsCommand())
+            i += 1
+            continue
+
         # 1-3) 패널 / 패널 해제 / 패널 새로고침
         if tok == "패널":
             if i + 1 < len(tokens) and tokens[i + 1] == "해제":
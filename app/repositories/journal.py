@@ -0,0 +1,101 @@
+"""
+학교종 Discord 봇 — append-only 변경 저널
+
+상태 변경을 한 줄짜리 JSON 레코드로 ``JOURNAL_FILE`` 에 덧붙인다.
+레코드 공통 필드: ``s`` (전역 증가 시퀀스), ``g`` (길드 ID), ``op``.
+
+| op          | 필드                          | 의미                          |
+|-------------|-------------------------------|-------------------------------|
+| ``meta``    | ``v`` (dict)                  | 채널·패널·일시정지 필드 갱신  |
+| ``timer``   | ``n``, ``v`` (Timer dict)     | 타이머 생성/변경              |
+| ``timer_del`` | ``n``                       | 타이머 삭제                   |
+| ``timers``  | ``v`` ({이름: Timer dict})    | 타이머 전체 교체              |
+| ``breaks``  | ``v``, ``r`` (list)           | 일회성/정규 쉬는시간 전체 교체 |
+| ``preset``  | ``n``, ``v`` (str 또는 None)  | 프리셋 저장/삭제              |
+| ``stats``   | ``d``, ``n``, ``m``, ``sec``  | 통계 증분 (``StatsStore`` 로 재생) |
+
+스냅샷(``StateRepository``)의 길드 레코드와 통계 레코드에는 각각 ``journal_seq``
+가 함께 저장되며, 재생 시 그 이하 시퀀스의 레코드는 건너뛴다 (스냅샷 후
+truncate 전에 죽어도 안전).
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from app.config import JOURNAL_FILE, log
+
+
+def _empty_guild() -> dict:
+    return {
+        "presets": {}, "timers": {}, "breaks": [], "recurring_breaks": [],
+    }
+
+
+def apply_record(records: dict[int, dict], rec: dict) -> None:
+    """저널 레코드 하나를 {gid: 저장용 dict} 에 적용. ``stats`` 는 호출자가 따로 재생."""
+    gid = rec["g"]
+    data = records.get(gid)
+    if data is None:
+        data = records[gid] = _empty_guild()
+    if rec["s"] <= data.get("journal_seq", 0):
+        return
+    op = rec["op"]
+    if op == "meta":
+        data.update(rec["v"])
+    elif op == "timer":
+        data.setdefault("timers", {})[rec["n"]] = rec["v"]
+    elif op == "timer_del":
+        data.setdefault("timers", {}).pop(rec["n"], None)
+    elif op == "timers":
+        data["timers"] = rec["v"]
+    elif op == "breaks":
+        data["breaks"] = rec["v"]
+        data["recurring_breaks"] = rec["r"]
+    elif op == "preset":
+        presets = data.setdefault("presets", {})
+        if rec["v"] is None:
+            presets.pop(rec["n"], None)
+        else:
+            presets[rec["n"]] = rec["v"]
+    else:
+        log.warning("알 수 없는 저널 op: %r", op)
+
+
+class Journal:
+    def __init__(self, path: Path = JOURNAL_FILE) -> None:
+        self.path = path
+
+    def append(self, records: list[dict]) -> None:
+        """레코드들을 덧붙이고 fsync. 블로킹 — 루프에서는 worker thread로 호출."""
+        if not records:
+            return
+        text = "".join(
+            json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records
+        )
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self) -> list[dict]:
+        """모든 레코드를 순서대로 읽음. 잘린 마지막 줄 등 손상된 줄은 건너뜀."""
+        if not self.path.exists():
+            return []
+        result: list[dict] = []
+        with open(self.path, encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    result.append(json.loads(line))
+                except json.JSONDecodeError:
+                    log.warning("저널 %d번째 줄 손상, 건너뜀", lineno)
+        return result
+
+    def truncate(self) -> None:
+        """스냅샷 반영이 끝난 레코드 제거."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,294 @@
+"""
+학교종 Discord 봇 — SQLite 상태 저장소
+
+WAL 모드의 정규화 테이블(guilds / timers / breaks / presets)에 길드 상태를,
+stats_guilds / stats_daily / stats_weekly / stats_monthly 에 통계를 저장한다.
+``save_guilds`` · ``save_stats`` 한 번이 하나의 트랜잭션이므로 여러 명령의
+변경분이 함께 커밋되거나 함께 롤백된다.
+
+저장할 때는 길드의 행을 지우고 다시 넣지 않는다. 마지막으로 커밋한 행을 기억해 두고
+값이 바뀐 행만 ``INSERT … ON CONFLICT DO UPDATE`` 하고, 사라진 키의 행만 지운다.
+통계 1분이 바뀌어도 그날 · 그 주 · 그 달의 행 하나씩만 쓰인다.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+
+from app.config import STATE_DB
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS guilds (
+    gid                      INTEGER PRIMARY KEY,
+    last_channel_id          INTEGER,
+    pinned_voice_channel_id  INTEGER,
+    status_panel_channel_id  INTEGER,
+    status_panel_message_id  INTEGER,
+    pause_until              REAL,
+    journal_seq              INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS timers (
+    gid         INTEGER NOT NULL,
+    name        TEXT    NOT NULL,
+    study_sec   INTEGER NOT NULL,
+    rest_sec    INTEGER NOT NULL,
+    channel_id  INTEGER NOT NULL,
+    mode                         TEXT,
+    phase_end_at                 REAL,
+    remaining_on_pause           REAL,
+    remaining_on_personal_pause  REAL,
+    auto_stop_cycles             INTEGER,
+    cycle_count                  INTEGER NOT NULL DEFAULT 0,
+    auto_stop_ts                 REAL,
+    PRIMARY KEY (gid, name)
+);
+CREATE TABLE IF NOT EXISTS breaks (
+    gid           INTEGER NOT NULL,
+    recurring     INTEGER NOT NULL,      -- 0: 일회성, 1: 정규
+    pos           INTEGER NOT NULL,
+    label         TEXT    NOT NULL,
+    hhmm          TEXT    NOT NULL,
+    duration_sec  INTEGER NOT NULL,
+    PRIMARY KEY (gid, recurring, pos)
+);
+CREATE TABLE IF NOT EXISTS presets (
+    gid      INTEGER NOT NULL,
+    name     TEXT    NOT NULL,
+    content  TEXT    NOT NULL,
+    PRIMARY KEY (gid, name)
+);
+CREATE TABLE IF NOT EXISTS stats_daily (
+    gid    INTEGER NOT NULL,
+    day    TEXT    NOT NULL,         -- YYYY-MM-DD (KST)
+    name   TEXT    NOT NULL,
+    study  REAL    NOT NULL DEFAULT 0,
+    rest   REAL    NOT NULL DEFAULT 0,
+    PRIMARY KEY (gid, day, name)
+);
+CREATE INDEX IF NOT EXISTS stats_daily_by_name ON stats_daily (gid, name, day);
+CREATE TABLE IF NOT EXISTS stats_weekly (
+    gid    INTEGER NOT NULL,
+    week   TEXT    NOT NULL,         -- YYYY-Www (ISO 주)
+    name   TEXT    NOT NULL,
+    study  REAL    NOT NULL DEFAULT 0,
+    rest   REAL    NOT NULL DEFAULT 0,
+    PRIMARY KEY (gid, week, name)
+);
+CREATE TABLE IF NOT EXISTS stats_monthly (
+    gid    INTEGER NOT NULL,
+    month  TEXT    NOT NULL,         -- YYYY-MM
+    name   TEXT    NOT NULL,
+    study  REAL    NOT NULL DEFAULT 0,
+    rest   REAL    NOT NULL DEFAULT 0,
+    PRIMARY KEY (gid, month, name)
+);
+CREATE TABLE IF NOT EXISTS stats_guilds (
+    gid          INTEGER PRIMARY KEY,
+    journal_seq  INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# 통계 레코드 키 → (테이블, 기간 컬럼)
+_STATS_TABLES = (
+    ("daily",   "stats_daily",   "day"),
+    ("weekly",  "stats_weekly",  "week"),
+    ("monthly", "stats_monthly", "month"),
+)
+
+_TIMER_FIELDS = (
+    "mode", "phase_end_at", "remaining_on_pause", "remaining_on_personal_pause",
+    "auto_stop_cycles", "cycle_count", "auto_stop_ts",
+)
+
+
+class SqliteStateRepository:
+    def __init__(self, path: Path | str = STATE_DB) -> None:
+        self.path = path
+        # persistence_service가 worker thread에서 호출하므로 스레드 공유 + 락
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        # (테이블, gid) → {키: 값} — 마지막으로 커밋된 행 (처음 저장할 때 DB에서 읽음)
+        self._saved: dict[tuple[str, int], dict[tuple, tuple]] = {}
+
+    def _sync(
+        self,
+        cur: sqlite3.Cursor,
+        pending: dict[tuple[str, int], dict[tuple, tuple]],
+        table: str,
+        keys: tuple[str, ...],
+        values: tuple[str, ...],
+        gid: int,
+        rows: dict[tuple, tuple],
+    ) -> None:
+        """gid의 table 행을 rows와 맞춤 — 바뀐 행만 upsert, 사라진 키의 행만 삭제.
+
+        커밋에 성공하면 호출자가 pending을 ``_saved`` 에 반영한다.
+        """
+        old = self._saved.get((table, gid))
+        if old is None:
+            n = len(keys)
+            old = {
+                tuple(row[:n]): tuple(row[n:])
+                for row in cur.execute(
+                    f"SELECT {', '.join(keys + values)} FROM {table} WHERE gid = ?", (gid,)
+                )
+            }
+        cols = ("gid",) + keys + values
+        changed = [(gid, *k, *v) for k, v in rows.items() if old.get(k) != v]
+        if changed:
+            cur.executemany(
+                f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+                f"ON CONFLICT(gid, {', '.join(keys)}) DO UPDATE SET "
+                + ", ".join(f"{c}=excluded.{c}" for c in values),
+                changed,
+            )
+        gone = [(gid, *k) for k in old.keys() - rows.keys()]
+        if gone:
+            cur.executemany(
+                f"DELETE FROM {table} WHERE gid = ? AND "
+                + " AND ".join(f"{c} = ?" for c in keys),
+                gone,
+            )
+        pending[(table, gid)] = rows
+
+    def load_all(self) -> dict[int, dict]:
+        with self._lock:
+            cur = self._conn.cursor()
+            records: dict[int, dict] = {}
+            for gid, last_ch, pinned, panel_ch, panel_msg, pause_until, seq in cur.execute(
+                "SELECT gid, last_channel_id, pinned_voice_channel_id, "
+                "status_panel_channel_id, status_panel_message_id, "
+                "pause_until, journal_seq FROM guilds"
+            ):
+                records[gid] = {
+                    "last_channel_id":         last_ch,
+                    "pinned_voice_channel_id": pinned,
+                    "presets":                 {},
+                    "timers":                  {},
+                    "breaks":                  [],
+                    "recurring_breaks":        [],
+                    "status_panel_channel_id": panel_ch,
+                    "status_panel_message_id": panel_msg,
+                    "pause_until":             pause_until,
+                    "journal_seq":             seq,
+                }
+            for gid, name, study, rest, cid, *runtime in cur.execute(
+                "SELECT gid, name, study_sec, rest_sec, channel_id, "
+                + ", ".join(_TIMER_FIELDS) + " FROM timers"
+            ):
+                if gid in records:
+                    timer = {"study_sec": study, "rest_sec": rest, "channel_id": cid}
+                    if runtime[1] is not None:   # phase_end_at 없으면 예전 형식
+                        timer.update(zip(_TIMER_FIELDS, runtime))
+                    records[gid]["timers"][name] = timer
+            for gid, recurring, label, hhmm, dur in cur.execute(
+                "SELECT gid, recurring, label, hhmm, duration_sec FROM breaks "
+                "ORDER BY gid, recurring, pos"
+            ):
+                if gid in records:
+                    key = "recurring_breaks" if recurring else "breaks"
+                    records[gid][key].append(
+                        {"label": label, "hhmm": hhmm, "duration_sec": dur}
+                    )
+            for gid, name, content in cur.execute("SELECT gid, name, content FROM presets"):
+                if gid in records:
+                    records[gid]["presets"][name] = content
+            return records
+
+    def save_guilds(self, records: dict[int, dict]) -> None:
+        pending: dict[tuple[str, int], dict[tuple, tuple]] = {}
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            for gid, data in records.items():
+                cur.execute(
+                    "INSERT INTO guilds VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(gid) DO UPDATE SET "
+                    "last_channel_id=excluded.last_channel_id, "
+                    "pinned_voice_channel_id=excluded.pinned_voice_channel_id, "
+                    "status_panel_channel_id=excluded.status_panel_channel_id, "
+                    "status_panel_message_id=excluded.status_panel_message_id, "
+                    "pause_until=excluded.pause_until, "
+                    "journal_seq=excluded.journal_seq",
+                    (
+                        gid,
+                        data.get("last_channel_id"),
+                        data.get("pinned_voice_channel_id"),
+                        data.get("status_panel_channel_id"),
+                        data.get("status_panel_message_id"),
+                        data.get("pause_until"),
+                        data.get("journal_seq", 0),
+                    ),
+                )
+                self._sync(
+                    cur, pending, "timers", ("name",),
+                    ("study_sec", "rest_sec", "channel_id") + _TIMER_FIELDS, gid,
+                    {
+                        (name,): (t["study_sec"], t["rest_sec"], t["channel_id"])
+                        + tuple(t.get(f, 0 if f == "cycle_count" else None) for f in _TIMER_FIELDS)
+                        for name, t in data.get("timers", {}).items()
+                    },
+                )
+                self._sync(
+                    cur, pending, "breaks", ("recurring", "pos"),
+                    ("label", "hhmm", "duration_sec"), gid,
+                    {
+                        (recurring, pos): (b["label"], b["hhmm"], b["duration_sec"])
+                        for recurring, key in ((0, "breaks"), (1, "recurring_breaks"))
+                        for pos, b in enumerate(data.get(key, []))
+                    },
+                )
+                self._sync(
+                    cur, pending, "presets", ("name",), ("content",), gid,
+                    {(name,): (content,) for name, content in data.get("presets", {}).items()},
+                )
+        self._saved.update(pending)
+
+    def load_stats(self) -> dict[int, dict]:
+        """{gid: 통계 dict}. stats_guilds 행이 없는 길드(예전 스키마)는 일별만 돌려준다."""
+        with self._lock:
+            cur = self._conn.cursor()
+            records: dict[int, dict] = {
+                gid: {"journal_seq": seq, "daily": {}, "weekly": {}, "monthly": {}}
+                for gid, seq in cur.execute("SELECT gid, journal_seq FROM stats_guilds")
+            }
+            for key, table, col in _STATS_TABLES:
+                for gid, period, name, study, rest in cur.execute(
+                    f"SELECT gid, {col}, name, study, rest FROM {table}"
+                ):
+                    data = records.get(gid)
+                    if data is None:
+                        if key != "daily":
+                            continue
+                        data = records[gid] = {"daily": {}}
+                    data[key].setdefault(period, {})[name] = {"study": study, "rest": rest}
+            return records
+
+    def save_stats(self, records: dict[int, dict]) -> None:
+        pending: dict[tuple[str, int], dict[tuple, tuple]] = {}
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            for gid, data in records.items():
+                cur.execute(
+                    "INSERT INTO stats_guilds VALUES (?, ?) "
+                    "ON CONFLICT(gid) DO UPDATE SET journal_seq=excluded.journal_seq",
+                    (gid, data.get("journal_seq", 0)),
+                )
+                for key, table, col in _STATS_TABLES:
+                    self._sync(
+                        cur, pending, table, (col, "name"), ("study", "rest"), gid,
+                        {
+                            (period, name): (e.get("study", 0.0), e.get("rest", 0.0))
+                            for period, names in data.get(key, {}).items()
+                            for name, e in names.items()
+                        },
+                    )
+        self._saved.update(pending)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,30 +1,215 @@
 """
-학교종 Discord 봇 — JSON 영속성
+학교종 Discord 봇 — 상태 영속성 (교체 가능한 저장소 백엔드)
+
+``StateRepository`` 프로토콜을 만족하는 백엔드를 ``config.STATE_BACKEND``
+로 선택한다.
+
+- ``json``   — ``STATE_DIR/<gid>.json`` 길드별 파일 (임시 파일 + fsync + rename),
+  통계는 ``STATS_DIR/<gid>.json``
+- ``sqlite`` — ``STATE_DB`` 정규화 테이블 (WAL), ``sqlite_state_repository`` 참고
+- ``memory`` — 프로세스 메모리 (테스트용)
+
+통계(``StatsStore.to_save_dict()``)는 길드 상태와 따로 저장한다.
+레거시 단일 ``state.json`` 은 json 백엔드 첫 로드 시 길드별 파일로 옮기고,
+비어 있는 sqlite 저장소는 첫 로드 시 json 상태를 가져온다. 길드 레코드 안에
+남아 있는 예전 ``stats`` 필드는 로드 시 통계 레코드로 옮긴다.
+어떤 길드를 언제 저장할지는 ``persistence_service`` 가 결정한다.
 """
 from __future__ import annotations
 
+import copy
 import json
+from pathlib import Path
+from typing import Protocol
 
-from app.config import STATE_FILE, log
-from app.domain.models import GuildState
+from app.config import STATE_BACKEND, STATE_DIR, STATE_FILE, STATS_DIR, log
+from app.utils.file_utils import atomic_write
 
 
-def load_state() -> dict:
-    """state.json에서 raw dict 로드. 파일 없거나 에러 시 빈 dict 반환."""
-    if not STATE_FILE.exists():
-        return {}
-    try:
-        with open(STATE_FILE, encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        log.warning("state.json 로드 실패: %s", e)
+class StateRepository(Protocol):
+    """길드 상태 저장소. 레코드는 ``GuildState.to_save_dict()`` 형태,
+    통계 레코드는 ``StatsStore.to_save_dict()`` + ``journal_seq``."""
+
+    def load_all(self) -> dict[int, dict]: ...
+
+    def save_guilds(self, records: dict[int, dict]) -> None:
+        """records를 한 번에 저장. 블로킹 — 루프에서는 worker thread로 호출."""
+        ...
+
+    def load_stats(self) -> dict[int, dict]: ...
+
+    def save_stats(self, records: dict[int, dict]) -> None:
+        """통계 records 저장 (길드 단위 전체 교체). 블로킹."""
+        ...
+
+    def close(self) -> None: ...
+
+
+# ── JSON (길드별 파일) ─────────────────────────────────────────────────────────
+
+def _encode(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _load_dir(directory: Path) -> dict[int, dict]:
+    """<gid>.json 파일들 로드. 읽기 실패한 길드는 건너뜀."""
+    if not directory.exists():
         return {}
+    result: dict[int, dict] = {}
+    for path in directory.glob("*.json"):
+        try:
+            with open(path, encoding="utf-8") as f:
+                result[int(path.stem)] = json.load(f)
+        except Exception as e:
+            log.warning("%s 로드 실패: %s", path.name, e)
+    return result
+
+
+def _save_dir(directory: Path, records: dict[int, dict]) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for gid, data in records.items():
+        atomic_write(directory / f"{gid}.json", _encode(data))
+
+
+class JsonStateRepository:
+    def __init__(
+        self,
+        state_dir: Path = STATE_DIR,
+        legacy_file: Path | None = STATE_FILE,
+        stats_dir: Path = STATS_DIR,
+    ) -> None:
+        self.state_dir   = state_dir
+        self.legacy_file = legacy_file
+        self.stats_dir   = stats_dir
+
+    def _migrate_legacy(self) -> None:
+        """레거시 state.json → 길드별 파일. 성공 시 state.json.migrated로 이름 변경."""
+        assert self.legacy_file is not None
+        try:
+            with open(self.legacy_file, encoding="utf-8") as f:
+                legacy = json.load(f)
+        except Exception as e:
+            log.warning("state.json 마이그레이션 실패: %s", e)
+            return
+        self.save_guilds({int(k): v for k, v in legacy.items()})
+        self.legacy_file.replace(self.legacy_file.with_name(self.legacy_file.name + ".migrated"))
+        log.info("state.json → %s 마이그레이션 완료 (%d길드)", self.state_dir.name, len(legacy))
+
+    def load_all(self) -> dict[int, dict]:
+        """길드별 파일 로드. 읽기 실패한 길드는 건너뜀."""
+        if (
+            not self.state_dir.exists()
+            and self.legacy_file is not None
+            and self.legacy_file.exists()
+        ):
+            self._migrate_legacy()
+        return _load_dir(self.state_dir)
+
+    def save_guilds(self, records: dict[int, dict]) -> None:
+        _save_dir(self.state_dir, records)
+
+    def load_stats(self) -> dict[int, dict]:
+        return _load_dir(self.stats_dir)
+
+    def save_stats(self, records: dict[int, dict]) -> None:
+        _save_dir(self.stats_dir, records)
+
+    def close(self) -> None:
+        pass
+
+
+# ── Memory (테스트용) ──────────────────────────────────────────────────────────
+
+class MemoryStateRepository:
+    def __init__(self) -> None:
+        self.records: dict[int, dict] = {}
+        self.stats:   dict[int, dict] = {}
+
+    def load_all(self) -> dict[int, dict]:
+        return copy.deepcopy(self.records)
+
+    def save_guilds(self, records: dict[int, dict]) -> None:
+        self.records.update(copy.deepcopy(records))
+
+    def load_stats(self) -> dict[int, dict]:
+        return copy.deepcopy(self.stats)
+
+    def save_stats(self, records: dict[int, dict]) -> None:
+        self.stats.update(copy.deepcopy(records))
+
+    def close(self) -> None:
+        pass
+
+
+# ── Backend selection ──────────────────────────────────────────────────────────
+
+_repository: StateRepository | None = None
+
+
+def create_repository(backend: str = STATE_BACKEND) -> StateRepository:
+    """backend 이름으로 저장소 생성. 알 수 없는 이름이면 ValueError."""
+    if backend == "json":
+        return JsonStateRepository()
+    if backend == "sqlite":
+        from app.repositories.sqlite_state_repository import SqliteStateRepository
+        return SqliteStateRepository()
+    if backend == "memory":
+        return MemoryStateRepository()
+    raise ValueError(f"알 수 없는 STATE_BACKEND: {backend!r}")
+
+
+def get_repository() -> StateRepository:
+    """설정된 백엔드의 프로세스 전역 저장소."""
+    global _repository
+    if _repository is None:
+        _repository = create_repository()
+    return _repository
+
+
+def _split_legacy_stats(records: dict[int, dict], stats: dict[int, dict]) -> None:
+    """길드 레코드의 예전 ``stats`` 필드({날짜: {이름: 엔트리}})를 통계 레코드로 옮김.
+
+    주/월 집계가 없는 레코드가 되므로 ``StatsStore.from_saved`` 가 일별에서 다시 만든다.
+    """
+    for gid, data in records.items():
+        legacy = data.pop("stats", None)
+        if legacy and gid not in stats:
+            stats[gid] = {"daily": legacy}
+
+
+def migrate_from_json(repo: StateRepository) -> int:
+    """json 상태(길드별 파일 또는 레거시 state.json)를 repo로 복사. 복사한 길드 수 반환."""
+    src = JsonStateRepository()
+    records = src.load_all()
+    stats = src.load_stats()
+    _split_legacy_stats(records, stats)
+    if records:
+        repo.save_guilds(records)
+        log.info("json 상태 → %s 마이그레이션 완료 (%d길드)", type(repo).__name__, len(records))
+    if stats:
+        repo.save_stats(stats)
+    return len(records)
+
+
+def load_state() -> tuple[dict[int, dict], dict[int, dict]]:
+    """설정된 저장소에서 ({gid: 상태 dict}, {gid: 통계 dict}) 로드.
+
+    sqlite가 비어 있으면 json 상태를 먼저 가져온다.
+    """
+    repo = get_repository()
+    records = repo.load_all()
+    if not records and STATE_BACKEND == "sqlite" and migrate_from_json(repo):
+        records = repo.load_all()
+    stats = repo.load_stats()
+    _split_legacy_stats(records, stats)
+    return records, stats
+
+
+def write_guilds(records: dict[int, dict]) -> None:
+    """설정된 저장소에 records 저장 (블로킹)."""
+    get_repository().save_guilds(records)
 
 
-def save_state(guild_states: dict[int, GuildState]) -> None:
-    """guild_states를 state.json에 저장."""
-    data: dict = {}
-    for gid, gs in guild_states.items():
-        data[str(gid)] = gs.to_save_dict()
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def write_stats(records: dict[int, dict]) -> None:
+    """설정된 저장소에 통계 records 저장 (블로킹)."""
+    get_repository().save_stats(records)
@@ -0,0 +1,236 @@
+"""
+학교종 Discord 봇 — 내용 주소 TTS 캐시 (길드 공용, 크기 제한 LRU)
+
+TTS 클립은 ``(엔진, 음성, 문장)`` 해시(``tts_key``)를 이름으로 Ogg/Opus로 저장하므로
+같은 문장("쉬는시간 종료." 등)은 길드 수와 무관하게 한 번만 합성된다.
+
+``TTS_CACHE/index.json`` 이 키 → 파일 크기 · 적중 수 · 원문을 기록하며,
+항목 순서가 LRU 순서(앞쪽이 가장 오래 안 쓰인 것)다. 총 크기가
+``TTS_CACHE_MAX_BYTES`` 또는 항목 수가 ``TTS_CACHE_MAX_ENTRIES`` 를 넘으면
+가장 오래 안 쓰인 클립부터 지운다.
+
+인덱스는 클립을 등록할 때마다 쓰지 않는다. dirty로 표시하고
+``TTS_INDEX_SAVE_DELAY_SEC`` 동안 모은 뒤 worker thread에서 한 번 저장하므로
+미리 합성으로 클립이 몰려도 이벤트 루프가 fsync를 기다리지 않는다. 종료 시
+``close_tts_cache`` 가 남은 변경을 동기 저장한다.
+
+시작 시 ``recover`` 가 인덱스와 디렉토리를 맞춘다 — 크기 0 파일, 쓰다 만
+임시 파일(``*.part``), 인덱스에 없는 파일(예전 길드별 키 ``{gid}_*.mp3``,
+인코딩 전 ``<키>.mp3`` 포함)은 지우고,
+파일이 없거나 크기가 다른 인덱스 항목은 버린다.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from app.config import (
+    TTS_CACHE,
+    TTS_CACHE_MAX_BYTES,
+    TTS_CACHE_MAX_ENTRIES,
+    TTS_INDEX_SAVE_DELAY_SEC,
+    log,
+)
+from app.utils import metrics
+from app.utils.file_utils import atomic_write
+
+_INDEX = "index.json"
+_SUFFIX = ".ogg"         # 사전 인코딩된 Ogg/Opus (app.bot.audio)
+_PART = ".part"          # 합성·인코딩 중인 임시 파일 — 성공하면 rename
+
+_m_hits      = metrics.counter("tts_cache_hits_total")
+_m_misses    = metrics.counter("tts_cache_misses_total")
+_m_evictions = metrics.counter("tts_cache_evictions_total")
+_m_bytes     = metrics.gauge("tts_cache_bytes")
+_m_entries   = metrics.gauge("tts_cache_entries")
+
+
+def tts_key(sentence: str, voice: str, engine: str) -> str:
+    """(엔진, 음성, 문장) → 캐시 키 (hex)."""
+    blob = "\0".join((engine, voice, sentence)).encode()
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+class TtsCache:
+    def __init__(
+        self,
+        root: Path = TTS_CACHE,
+        max_bytes: int = TTS_CACHE_MAX_BYTES,
+        max_entries: int = TTS_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # 키 → {"size", "hits", "engine", "voice", "text"}. 순서 = LRU
+        self._index: OrderedDict[str, dict] = OrderedDict()
+        self._bytes = 0
+        self._dirty = False
+        self._save_task: asyncio.Task | None = None
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.recover()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / (key + _SUFFIX)
+
+    def temp_path_for(self, key: str, ext: str = _SUFFIX) -> Path:
+        """합성·인코딩 결과를 쓸 임시 경로. ``put`` 이 최종 경로로 rename."""
+        return self.root / (key + ext + _PART)
+
+    # ── 시작 시 복구 ──────────────────────────────────────────────────────────
+
+    def _load_index(self) -> OrderedDict[str, dict]:
+        try:
+            data = json.loads((self.root / _INDEX).read_text(encoding="utf-8"))
+            return OrderedDict((k, v) for k, v in data.items() if isinstance(v, dict))
+        except FileNotFoundError:
+            return OrderedDict()
+        except (OSError, ValueError, AttributeError):
+            log.warning("TTS 캐시 인덱스 손상 — 빈 캐시로 시작")
+            return OrderedDict()
+
+    def recover(self) -> None:
+        """인덱스와 디렉토리를 맞추고 용량 제한 적용."""
+        index = self._load_index()
+        files = {
+            p.name: p for p in self.root.iterdir()
+            if p.is_file() and p.name != _INDEX
+        }
+        self._index.clear()
+        self._bytes = 0
+        for key, entry in index.items():
+            p = files.pop(key + _SUFFIX, None)
+            size = p.stat().st_size if p is not None else 0
+            if size == 0 or size != entry.get("size"):
+                if p is not None:
+                    p.unlink(missing_ok=True)
+                continue
+            self._index[key] = entry
+            self._bytes += size
+        for p in files.values():        # 인덱스에 없음 = 쓰다 만 파일 / 예전 키
+            p.unlink(missing_ok=True)
+        dropped = len(index) - len(self._index) + len(files)
+        if dropped:
+            log.info("TTS 캐시 복구: %d개 파일/항목 정리", dropped)
+            self._dirty = True
+        self._evict()
+        self.save_index()
+
+    # ── 조회 / 등록 ───────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Path | None:
+        """캐시된 클립 경로 (LRU 갱신). 없거나 파일이 사라졌으면 None."""
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        path = self.path_for(key)
+        if not path.exists():
+            self._drop(key)
+            return None
+        self._index.move_to_end(key)
+        entry["hits"] = entry.get("hits", 0) + 1
+        self._dirty = True
+        _m_hits.inc()
+        return path
+
+    def put(self, key: str, tmp: Path, sentence: str, voice: str, engine: str) -> Path | None:
+        """다 쓴 임시 파일 tmp를 최종 경로로 rename해 등록하고 용량 제한 적용 (= 캐시 미스 1회).
+
+        크기 0이면 버리고 None. 재생 중인 다른 길드는 rename 전의 완성된 파일만 본다.
+        """
+        _m_misses.inc()
+        path = self.path_for(key)
+        try:
+            size = tmp.stat().st_size
+            if size == 0:
+                tmp.unlink()
+                return None
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return None
+        if key in self._index:
+            self._bytes -= self._index[key]["size"]
+        self._index[key] = {
+            "size": size, "hits": 0, "engine": engine, "voice": voice, "text": sentence,
+        }
+        self._index.move_to_end(key)
+        self._bytes += size
+        self._dirty = True
+        self._evict(keep=key)
+        self._schedule_save()
+        return path
+
+    def _drop(self, key: str) -> None:
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.get("size", 0)
+            self.path_for(key).unlink(missing_ok=True)
+            self._dirty = True
+
+    def _evict(self, keep: str | None = None) -> None:
+        """가장 오래 안 쓰인 클립부터 지워 용량 제한 안으로."""
+        while self._index and (
+            self._bytes > self.max_bytes or len(self._index) > self.max_entries
+        ):
+            key = next(iter(self._index))
+            if key == keep:
+                break
+            self._drop(key)
+            _m_evictions.inc()
+        _m_bytes.set(self._bytes)
+        _m_entries.set(len(self._index))
+
+    def _encode_index(self) -> str:
+        return json.dumps(self._index, ensure_ascii=False, separators=(",", ":"))
+
+    def _schedule_save(self) -> None:
+        """``TTS_INDEX_SAVE_DELAY_SEC`` 뒤 백그라운드 저장 예약 (이벤트 루프 밖이면 바로 저장)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save_index()
+            return
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(TTS_INDEX_SAVE_DELAY_SEC)
+            data = self._encode_index()      # 인코딩은 루프에서 — 인덱스를 스레드와 공유하지 않음
+            self._dirty = False
+            try:
+                await asyncio.to_thread(atomic_write, self.root / _INDEX, data)
+            except OSError:
+                log.exception("TTS 캐시 인덱스 저장 실패")
+                self._dirty = True
+
+    def save_index(self) -> None:
+        """동기 저장 — 시작 시 복구와 종료 시에만."""
+        if not self._dirty:
+            return
+        try:
+            atomic_write(self.root / _INDEX, self._encode_index())
+            self._dirty = False
+        except OSError:
+            log.exception("TTS 캐시 인덱스 저장 실패")
+
+
+_cache: TtsCache | None = None
+
+
+def get_tts_cache() -> TtsCache:
+    """프로세스 전역 TTS 캐시 (첫 호출 시 복구 수행)."""
+    global _cache
+    if _cache is None:
+        _cache = TtsCache()
+    return _cache
+
+
+def close_tts_cache() -> None:
+    """종료 시 적중 기록(LRU 순서) 저장."""
+    if _cache is not None:
+        _cache.save_index()
@@ -7,16 +7,11 @@ from datetime import datetime
 
 from app.config import KST
 from app.domain.models import BreakEntry, GuildState
-from app.repositories.state_repository import save_state
-from app.services.guild_state_service import guild_states
+from app.services.persistence_service import record_breaks, record_meta, record_timers
 from app.services.timer_service import timer_resume
 from app.utils.time_utils import fmt_dur, next_occurrence_ts
 
 
-def _save() -> None:
-    save_state(guild_states)
-
-
 # ── 일회성 쉬는시간 ──────────────────────────────────────────────────────────
 
 def add_break(gs: GuildState, label: str, hhmm: str, duration_sec: int) -> str:
@@ -28,7 +23,7 @@ def add_break(gs: GuildState, label: str, hhmm: str, duration_sec: int) -> str:
         next_ts=next_occurrence_ts(hhmm),
     )
     gs.breaks.append(brk)
-    _save()
+    record_breaks(gs)
     ndt = datetime.fromtimestamp(brk.next_ts, tz=KST)
     return (
         f"✅ 쉬는시간 **{label}** 등록 "
@@ -58,7 +53,7 @@ def delete_break(gs: GuildState, label: str) -> tuple[str, bool, bool]:
     gs.breaks = [b for b in gs.breaks if b.label != label]
     removed = before - len(gs.breaks)
     if removed:
-        _save()
+        record_breaks(gs)
         return (
             f"✅ 쉬는시간 **{label}** 삭제 ({removed}건)",
             True,
@@ -76,6 +71,8 @@ def break_end(gs: GuildState) -> tuple[str | None, bool]:
     gs.pause_until = None
     for t in gs.timers.values():
         timer_resume(t)
+    record_meta(gs)
+    record_timers(gs)
     return None, True
 
 
@@ -92,7 +89,7 @@ def add_recurring_break(
         next_ts=next_occurrence_ts(hhmm),
     )
     gs.recurring_breaks.append(brk)
-    _save()
+    record_breaks(gs)
     ndt = datetime.fromtimestamp(brk.next_ts, tz=KST)
     return (
         f"✅ 정규쉬는시간 **{label}** 등록 "
@@ -123,7 +120,7 @@ def delete_recurring_break(gs: GuildState, label: str) -> tuple[str, bool, bool]
     gs.recurring_breaks = [b for b in gs.recurring_breaks if b.label != label]
     removed = before - len(gs.recurring_breaks)
     if removed:
-        _save()
+        record_breaks(gs)
         return (
             f"✅ 정규쉬는시간 **{label}** 삭제 ({removed}건)",
             True,
@@ -3,12 +3,12 @@ from __future__ import annotations
 
 import asyncio
 
+from app.config import VOICE_QUEUE_MAX
 from app.domain.models import GuildState
 
 # ── Per-guild registries ───────────────────────────────────────────────────────
 guild_states:  dict[int, GuildState]    = {}
 guild_locks:   dict[int, asyncio.Lock]  = {}
-guild_tasks:   dict[int, asyncio.Task]  = {}
 voice_queues:  dict[int, asyncio.Queue] = {}
 voice_workers: dict[int, asyncio.Task]  = {}
 panel_tasks:   dict[int, asyncio.Task]  = {}
@@ -17,7 +17,7 @@ panel_tasks:   dict[int, asyncio.Task]  = {}
 def get_guild_state(gid: int) -> GuildState:
     """gid에 해당하는 GuildState를 반환. 없으면 생성."""
     if gid not in guild_states:
-        guild_states[gid] = GuildState()
+        guild_states[gid] = GuildState(gid=gid)
         guild_locks[gid]  = asyncio.Lock()
-        voice_queues[gid] = asyncio.Queue()
+        voice_queues[gid] = asyncio.Queue(VOICE_QUEUE_MAX)
     return guild_states[gid]
@@ -0,0 +1,277 @@
+"""
+학교종 Discord 봇 — 저널 기반 write-behind 영속화
+
+상태 변경은 ``record_*`` 함수로 작은 저널 레코드를 만들어 버퍼에 넣는다.
+버퍼는 ``SAVE_COALESCE_SEC`` 창마다 worker thread에서 저널 파일에 덧붙이고
+(fsync 포함), ``COMPACT_INTERVAL_SEC`` 또는 ``COMPACT_MAX_RECORDS`` 를 넘으면
+변경된 길드의 스냅샷을 저장소에 쓰고 저널을 비운다 (compaction). 통계는
+길드 상태와 따로 추적해, 통계만 바뀐 길드는 통계 스냅샷만 다시 쓴다.
+재시작 시 ``restore_state`` 가 스냅샷 + 저널 꼬리를 재생한다.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import date, datetime
+
+from app.config import COMPACT_INTERVAL_SEC, COMPACT_MAX_RECORDS, KST, SAVE_COALESCE_SEC, log
+from app.domain.models import GuildState
+from app.domain.stats import StatsStore
+from app.repositories.journal import Journal, apply_record
+from app.repositories.state_repository import load_state, write_guilds, write_stats
+from app.services.guild_state_service import guild_states
+from app.utils import metrics
+
+_journal = Journal()
+
+_buffer:        list[dict]           = []
+_dirty:         set[int]             = set()    # 마지막 compaction 이후 상태가 변경된 길드
+_dirty_stats:   set[int]             = set()    # 마지막 compaction 이후 통계가 변경된 길드
+_seq:           int                  = 0
+_journal_len:   int                  = 0        # 저널 파일의 레코드 수
+_last_compact:  float                = time.monotonic()
+_flush_task:    asyncio.Task | None  = None
+_write_lock:    asyncio.Lock | None  = None
+_in_flight:     int                  = 0
+
+_m_pending   = metrics.gauge("persist_pending_writes")
+_m_coalesced = metrics.counter("persist_coalesced_total")
+_m_writes    = metrics.counter("persist_writes_total")
+_m_errors    = metrics.counter("persist_errors_total")
+_m_latency   = metrics.histogram("persist_write_latency_ms")
+_m_records   = metrics.counter("journal_records_total")
+_m_compacts  = metrics.counter("journal_compactions_total")
+_m_compact_ms = metrics.histogram("journal_compaction_ms")
+
+
+def _update_pending() -> None:
+    _m_pending.set(len(_buffer) + _in_flight)
+
+
+# ── 레코드 생성 ────────────────────────────────────────────────────────────────
+
+def _append(gs: GuildState, op: str, **fields) -> None:
+    global _seq, _flush_task
+    _seq += 1
+    _buffer.append({"s": _seq, "g": gs.gid, "op": op, **fields})
+    (_dirty_stats if op == "stats" else _dirty).add(gs.gid)
+    _m_records.inc()
+    _update_pending()
+    if _flush_task is not None and not _flush_task.done():
+        _m_coalesced.inc()
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return      # 이벤트 루프 종료 후 — flush_sync() 스냅샷에 포함된다
+    _flush_task = loop.create_task(_flush_loop())
+
+
+def record_meta(gs: GuildState) -> None:
+    """채널·패널·일시정지 등 길드 메타 필드 변경."""
+    _append(gs, "meta", v=gs.meta_save_dict())
+
+
+def record_timer(gs: GuildState, name: str) -> None:
+    """타이머 하나의 현재 상태 (없으면 삭제)."""
+    t = gs.timers.get(name)
+    if t is None:
+        _append(gs, "timer_del", n=name)
+    else:
+        _append(gs, "timer", n=name, v=t.to_save_dict())
+
+
+def record_timers(gs: GuildState) -> None:
+    """모든 타이머를 한꺼번에 바꾼 경우 (쉬는시간 시작/종료, 전체 종료)."""
+    _append(gs, "timers", v={n: t.to_save_dict() for n, t in gs.timers.items()})
+
+
+def record_breaks(gs: GuildState) -> None:
+    _append(
+        gs, "breaks",
+        v=[b.to_save_dict() for b in gs.breaks],
+        r=[b.to_save_dict() for b in gs.recurring_breaks],
+    )
+
+
+def record_preset(gs: GuildState, name: str) -> None:
+    _append(gs, "preset", n=name, v=gs.presets.get(name))
+
+
+def record_stats(gs: GuildState, day: str, name: str, mode: str, seconds: float) -> None:
+    _append(gs, "stats", d=day, n=name, m=mode, sec=seconds)
+
+
+# ── Flush / compaction ─────────────────────────────────────────────────────────
+
+async def _flush_loop() -> None:
+    while _buffer:
+        await asyncio.sleep(SAVE_COALESCE_SEC)
+        await flush()
+
+
+Snapshot = tuple[dict[int, dict], dict[int, dict], bool, int]
+
+
+def _snapshot() -> Snapshot:
+    """(변경 길드 상태 dict, 변경 길드 통계 dict, 모든 변경 길드가 포함되었는지, 스냅샷 seq).
+
+    버퍼의 레코드 중 seq ≤ 스냅샷 seq인 것은 스냅샷에 반영되지만, 스냅샷 저장이
+    성공하기 전까지는 버리지 않는다 (``_drop_covered``).
+    """
+    records: dict[int, dict] = {}
+    stats:   dict[int, dict] = {}
+    missing = 0
+    for dirty, out, encode in (
+        (_dirty, records, GuildState.to_save_dict),
+        (_dirty_stats, stats, lambda gs: gs.stats.to_save_dict()),
+    ):
+        for gid in dirty:
+            gs = guild_states.get(gid)
+            if gs is None:
+                missing += 1
+                continue
+            data = encode(gs)
+            data["journal_seq"] = _seq
+            out[gid] = data
+        dirty.clear()
+    return records, stats, missing == 0, _seq
+
+
+def _drop_covered(seq: int) -> None:
+    """스냅샷 저장 성공 후 — 스냅샷에 반영된(seq 이하) 아직 저널에 없는 레코드를 버림."""
+    _buffer[:] = [r for r in _buffer if r["s"] > seq]
+
+
+def _compaction_due() -> bool:
+    return (
+        _journal_len >= COMPACT_MAX_RECORDS
+        or time.monotonic() - _last_compact >= COMPACT_INTERVAL_SEC
+    )
+
+
+def _write_snapshot(records: dict[int, dict], stats: dict[int, dict], complete: bool) -> None:
+    if records:
+        write_guilds(records)
+    if stats:
+        write_stats(stats)
+    if complete:
+        _journal.truncate()
+    else:
+        log.warning("메모리에 없는 길드의 저널 레코드가 있어 저널을 유지합니다")
+
+
+async def flush() -> None:
+    """버퍼를 저널에 덧붙이고, 필요하면 compaction. 실패 시 다음 창에서 재시도."""
+    global _write_lock, _in_flight, _journal_len
+    if _write_lock is None:
+        _write_lock = asyncio.Lock()
+    async with _write_lock:
+        if not _buffer:
+            return
+        batch = _buffer[:]
+        _buffer.clear()
+        _in_flight = len(batch)
+        _update_pending()
+        t0 = time.perf_counter()
+        try:
+            await asyncio.to_thread(_journal.append, batch)
+            _journal_len += len(batch)
+            _m_writes.inc()
+        except Exception:
+            log.exception("저널 기록 실패 (%d건)", len(batch))
+            _m_errors.inc()
+            _buffer[:0] = batch
+            return                  # 저널이 불안정할 때는 compaction도 다음 창으로
+        finally:
+            _m_latency.observe((time.perf_counter() - t0) * 1000)
+            _in_flight = 0
+            _update_pending()
+        if _compaction_due():
+            await _compact()
+
+
+async def _compact() -> None:
+    """변경 길드 스냅샷 저장 후 저널 비우기. flush()에서 _write_lock을 잡은 채 호출."""
+    global _journal_len, _last_compact
+    records, stats, complete, seq = _snapshot()
+    if not records and not stats:
+        _last_compact = time.monotonic()
+        return
+    t0 = time.perf_counter()
+    try:
+        await asyncio.to_thread(_write_snapshot, records, stats, complete)
+        _drop_covered(seq)
+        _journal_len = 0
+        _last_compact = time.monotonic()
+        _m_compacts.inc()
+    except Exception:
+        log.exception("스냅샷 저장 실패 (%d길드)", len(records.keys() | stats.keys()))
+        _m_errors.inc()
+        _dirty.update(records)
+        _dirty_stats.update(stats)
+    finally:
+        _m_compact_ms.observe((time.perf_counter() - t0) * 1000)
+        _update_pending()
+
+
+def flush_sync() -> None:
+    """종료 시 남은 변경분을 스냅샷으로 동기 저장 (이벤트 루프 종료 후 호출)."""
+    if not _dirty and not _dirty_stats:
+        return
+    records, stats, complete, seq = _snapshot()
+    try:
+        _write_snapshot(records, stats, complete)
+        _drop_covered(seq)
+        log.info("종료 전 상태 저장 (%d길드)", len(records.keys() | stats.keys()))
+    except Exception:
+        log.exception("종료 전 상태 저장 실패")
+    _update_pending()
+
+
+# ── Restore ────────────────────────────────────────────────────────────────────
+
+def _replay_stats(stores: dict[int, StatsStore], seqs: dict[int, int], rec: dict) -> None:
+    gid = rec["g"]
+    if rec["s"] <= seqs.get(gid, 0):
+        return
+    store = stores.get(gid)
+    if store is None:
+        store = stores[gid] = StatsStore()
+    store.add(date.fromisoformat(rec["d"]), rec["n"], rec["m"], rec["sec"])
+
+
+def restore_state() -> tuple[dict[int, dict], dict[int, StatsStore]]:
+    """스냅샷을 읽고 저널 꼬리를 재생한 ({gid: 저장용 dict}, {gid: 통계})."""
+    global _seq, _journal_len
+    records, stats = load_state()
+    today = datetime.now(KST).date()
+    seqs = {gid: data.get("journal_seq", 0) for gid, data in stats.items()}
+    stores = {gid: StatsStore.from_saved(data, today) for gid, data in stats.items()}
+    # 예전 형식(주/월 집계 없음)에서 옮겨 온 통계는 새 형식으로 다시 저장하고,
+    # ``stats`` 필드가 남아 있던 길드 레코드도 통계 없이 다시 저장
+    legacy = {gid for gid, data in stats.items() if "weekly" not in data}
+    _dirty_stats.update(legacy)
+    _dirty.update(legacy & records.keys())
+    # 재생된 길드는 다음 compaction 스냅샷에 포함되어야 저널을 비울 수 있다
+    tail = _journal.read()
+    for rec in tail:
+        try:
+            if rec.get("op") == "stats":
+                _replay_stats(stores, seqs, rec)
+                _dirty_stats.add(rec["g"])
+            else:
+                apply_record(records, rec)
+                _dirty.add(rec["g"])
+        except (KeyError, TypeError, ValueError):
+            log.warning("저널 레코드 재생 실패: %r", rec)
+    _journal_len = len(tail)
+    _seq = max(
+        [r.get("s", 0) for r in tail]
+        + [d.get("journal_seq", 0) for d in records.values()]
+        + list(seqs.values()),
+        default=0,
+    )
+    if tail:
+        log.info("저널 재생 %d건 (seq=%d)", len(tail), _seq)
+    return records, stores
@@ -1,178 +1,345 @@
-"""길드별 스케줄러 루프 — 타이머 전환, 쉬는시간 발동/종료, auto-stop, 통계 누적."""
+"""전역 데드라인 힙 스케줄러 — 타이머 전환, 쉬는시간 발동/종료, auto-stop.
+
+프로세스 전체에서 하나의 루프가 ``(deadline, gid)`` 최소 힙을 관리하며,
+가장 가까운 이벤트(페이즈 종료, 쉬는시간 시작, 일시정지 종료, 자동 종료,
+통계 체크포인트) 시각까지 정확히 잠든다. 주기적으로 깨어나는 일은 없다 — 할 일이
+없는 길드(정규 쉬는시간만 있는 길드 등)는 다음 실제 이벤트까지 잔다. 길드 상태가 바뀌면 ``ensure_scheduler``
+로 데드라인을 다시 계산해 힙에 넣는다 (이전 항목은 lazy 무효화).
+
+다음 음성 안내(``next_announcement``) ``VOICE_LOOKAHEAD_SEC`` 전에도 한 번 깨어나
+음성 연결 · TTS 합성 · 클립 조립을 미리 해 둔다 (``prepare_announcement``).
+
+tick은 길드 락 안에서 상태만 바꾸고 알림 메시지 · 음성 안내 · 패널 갱신은
+``Outbox`` 에 쌓는다. 락을 푼 뒤 ``dispatch`` 가 내보내므로 느린 Discord 호출이
+다음 tick이나 명령을 막지 않는다.
+
+통계는 tick마다 누적하지 않고 페이즈 전환 · 쉬는시간 시작 · 자동 종료 때
+``timer_service.account`` 로 구간 단위로 기록한다. tick 비용은 실제로 이벤트가
+도래한 타이머 수에만 비례한다.
+"""
 from __future__ import annotations
 
 import asyncio
-import re
+import heapq
+import time
 
-from app.config import log
-from app.repositories.state_repository import save_state
+from app.bot.outbox import Outbox, dispatch
+from app.config import STATS_CHECKPOINT_SEC, VOICE_LOOKAHEAD_SEC, log
+from app.domain.models import GuildState
 from app.services import timer_service
-from app.services.guild_state_service import (
-    guild_locks,
-    guild_states,
-    guild_tasks,
-    voice_queues,
-)
+from app.services.guild_state_service import guild_locks, guild_states
+from app.services.persistence_service import record_meta, record_timer, record_timers
+from app.utils import metrics
 from app.utils.time_utils import next_occurrence_ts, now_ts
 
+# 이 간격 안의 이벤트는 같은 tick에서 처리되어 안내 하나로 합쳐진다 (초)
+_SAME_TICK_SEC = 0.05
+# tick이 예외로 끝나면 이만큼(연속 실패마다 2배, 최대 _FAIL_BACKOFF_MAX_SEC) 뒤에 재시도 (초)
+_FAIL_BACKOFF_SEC     = 1.0
+_FAIL_BACKOFF_MAX_SEC = 60.0
 
-def _save() -> None:
-    save_state(guild_states)
+# ── Scheduler registries ───────────────────────────────────────────────────────
+_heap:      list[tuple[float, int]] = []   # (deadline, gid) — stale 항목 포함 가능
+_deadlines: dict[int, float]        = {}   # gid → 현재 유효한 deadline
+_running:   set[int]                = set()  # tick 실행 중인 gid
+_prepared:  dict[int, float]        = {}   # gid → 미리 준비를 시작한 안내 시각
+_failures:  dict[int, int]          = {}   # gid → 연속 tick 예외 횟수
+_wakeup:    asyncio.Event | None    = None
+_loop_task: asyncio.Task | None     = None
 
+_m_lock_hold = metrics.histogram("scheduler_lock_hold_ms")
+_m_tick_errors = metrics.counter("scheduler_tick_errors_total")
 
-async def guild_scheduler(gid: int) -> None:
-    """길드별 0.5초 틱 이벤트 루프.
 
-    쉬는시간 발동/종료, 타이머 페이즈 전환, auto-stop, 통계 누적,
-    음성채널 연결 유지 등을 처리한다.
-    """
+def next_deadline(gs: GuildState) -> float | None:
+    """gs에서 다음으로 처리해야 할 이벤트 시각. 없으면 None."""
+    cands = [b.next_ts for b in gs.breaks + gs.recurring_breaks if b.next_ts]
+    if gs.pause_until is not None:
+        cands.append(gs.pause_until)
+    else:
+        for t in gs.timers.values():
+            if t.remaining_on_personal_pause is not None:
+                continue
+            cands.append(t.phase_end_at)
+            if t.auto_stop_ts is not None:
+                cands.append(t.auto_stop_ts)
+    checkpoint = _next_checkpoint(gs)
+    if checkpoint is not None:
+        cands.append(checkpoint)
+    return min(cands) if cands else None
+
+
+def _next_checkpoint(gs: GuildState) -> float | None:
+    """가장 오래 열린 통계 구간이 ``STATS_CHECKPOINT_SEC`` 가 되는 시각. 열린 구간이 없으면 None."""
+    opened = [t.last_accounted_at for t in gs.timers.values() if timer_service.is_running(gs, t)]
+    return min(opened) + STATS_CHECKPOINT_SEC if opened else None
+
+
+def next_announcement(gs: GuildState) -> tuple[float, list] | None:
+    """다음 음성 안내 (시각, 그 tick에 말할 문장들). tick의 처리 순서를 그대로 따른다."""
+    from app.bot.client import RESUME_PHRASE, auto_stop_phrase, break_phrase, transition_phrase
+
+    events = [(b.next_ts, break_phrase(b.label)) for b in gs.breaks + gs.recurring_breaks if b.next_ts]
+    if gs.pause_until is not None:
+        events.append((gs.pause_until, RESUME_PHRASE))
+    else:
+        for name, t in gs.timers.items():
+            if t.remaining_on_personal_pause is not None:
+                continue
+            if t.auto_stop_ts is not None and t.auto_stop_ts <= t.phase_end_at:
+                events.append((t.auto_stop_ts, auto_stop_phrase(name)))
+                continue
+            new_mode = "rest" if t.mode == "study" else "study"
+            if (
+                new_mode == "study" and t.auto_stop_cycles is not None
+                and t.cycle_count + 1 >= t.auto_stop_cycles
+            ):
+                events.append((t.phase_end_at, auto_stop_phrase(name)))
+            else:
+                events.append((t.phase_end_at, transition_phrase(name, new_mode)))
+    if not events:
+        return None
+    at = min(ts for ts, _ in events)
+    return at, [p for ts, p in events if ts - at <= _SAME_TICK_SEC]
+
+
+def _lookahead(gid: int, gs: GuildState, ts: float) -> None:
+    """다음 안내가 ``VOICE_LOOKAHEAD_SEC`` 안이면 연결·합성·클립 조립을 미리 시작 (안내당 한 번)."""
+    from app.bot.client import prepare_announcement
+
+    nxt = next_announcement(gs)
+    if nxt is None or not gs.last_voice_channel_id:
+        return
+    at, phrases = nxt
+    if at > ts + VOICE_LOOKAHEAD_SEC or _prepared.get(gid) == at:
+        return
+    _prepared[gid] = at         # 이미 도래한 안내도 표시만 — 준비 데드라인이 과거에 머물지 않게
+    if at > ts:
+        asyncio.create_task(prepare_announcement(gid, gs, phrases))
+
+
+def _prepare_at(gid: int, gs: GuildState) -> float | None:
+    """아직 준비하지 않은 다음 안내의 미리 준비 시각."""
+    if not gs.last_voice_channel_id:
+        return None
+    nxt = next_announcement(gs)
+    if nxt is None or _prepared.get(gid) == nxt[0]:
+        return None
+    return nxt[0] - VOICE_LOOKAHEAD_SEC
+
+
+def _tick(gid: int, gs: GuildState, box: Outbox) -> None:
+    """gid의 도래한 이벤트를 처리한다. guild 락을 잡은 상태로 호출 — await 없음,
+    Discord로 나가는 것은 모두 box에."""
     # 순환 임포트 방지: client.py → scheduler_service → client.py
     from app.bot.client import (
         _cancel_voice_worker,
         _ensure_voice_worker,
-        _get_channel,
-        ensure_voice_connected,
-        ensure_voice_disconnected,
+        auto_stop_phrase,
         notify_break_event,
         notify_resume,
         notify_transition,
-        play_event_audio,
-        update_status_panel,
     )
+    from app.bot.voice_manager import want_voice
 
-    log.info("스케줄러 시작 guild=%d", gid)
-    try:
-        while True:
-            await asyncio.sleep(0.5)
-            lock = guild_locks.get(gid)
-            if lock is None:
+    ts = now_ts()
+
+    # 0) 곧 있을 안내 미리 준비 (음성 연결, TTS, 클립 조립)
+    _lookahead(gid, gs, ts)
+
+    # 1) 쉬는시간 체크 (일반 + 정규)
+    for brk in gs.breaks + gs.recurring_breaks:
+        bt = brk.next_ts
+        if bt == 0.0 or ts < bt:
+            continue
+        end_ts   = ts + brk.duration_sec
+        already  = gs.pause_until is not None
+        if not already or gs.pause_until < end_ts:
+            if not already:
+                timer_service.account_running(gs, ts)
+                for t in gs.timers.values():
+                    timer_service.timer_pause(t)
+            gs.pause_until = end_ts
+            record_meta(gs)
+            record_timers(gs)
+            notify_break_event(box, gs, brk, end_ts, already, bt)
+            box.refresh_panel()
+        brk.next_ts = next_occurrence_ts(brk.hhmm)
+
+    # 2) 일시정지 종료 체크
+    if gs.pause_until is not None and ts >= gs.pause_until:
+        due = gs.pause_until
+        gs.pause_until = None
+        for t in gs.timers.values():
+            timer_service.timer_resume(t)
+        record_meta(gs)
+        record_timers(gs)
+        notify_resume(box, gs, due)
+        box.refresh_panel()
+
+    # 3) 개인 타이머 전환 체크 (pause 중 아닐 때만)
+    if gs.pause_until is None:
+        for name, t in list(gs.timers.items()):
+            if t.remaining_on_personal_pause is not None:
                 continue
-            async with lock:
-                gs = guild_states.get(gid)
-                if gs is None:
-                    return
-                ts = now_ts()
-
-                # 1) 쉬는시간 체크 (일반 + 정규)
-                for brk in gs.breaks + gs.recurring_breaks:
-                    bt = brk.next_ts
-                    if bt == 0.0 or ts < bt:
-                        continue
-                    end_ts   = ts + brk.duration_sec
-                    already  = gs.pause_until is not None
-                    if not already or gs.pause_until < end_ts:
-                        if not already:
-                            for _n, _t in gs.timers.items():
-                                if _t.remaining_on_personal_pause is None:
-                                    if _t.last_accounted_at > 0 and _t.last_accounted_at < ts:
-                                        timer_service.accumulate_stats(gs, _n, _t.mode, ts - _t.last_accounted_at)
-                                    _t.last_accounted_at = ts
-                            for t in gs.timers.values():
-                                timer_service.timer_pause(t)
-                        gs.pause_until = end_ts
-                        await notify_break_event(gid, gs, brk, end_ts, already)
-                        asyncio.create_task(update_status_panel(gid))
-                    brk.next_ts = next_occurrence_ts(brk.hhmm)
-
-                # 2) 일시정지 종료 체크
-                if gs.pause_until is not None and ts >= gs.pause_until:
-                    gs.pause_until = None
-                    for t in gs.timers.values():
-                        timer_service.timer_resume(t)
-                        t.last_accounted_at = ts
-                    await notify_resume(gid, gs)
-                    asyncio.create_task(update_status_panel(gid))
-
-                # 3) 개인 타이머 전환 체크 (pause 중 아닐 때만)
-                if gs.pause_until is None:
-                    for name, t in list(gs.timers.items()):
-                        if t.remaining_on_personal_pause is not None:
-                            continue
-
-                        # Stats accumulation
-                        if t.last_accounted_at > 0 and t.last_accounted_at < ts:
-                            timer_service.accumulate_stats(gs, name, t.mode, ts - t.last_accounted_at)
-                        t.last_accounted_at = ts
-
-                        # Auto-stop: 시간 제한
-                        if t.auto_stop_ts is not None and ts >= t.auto_stop_ts:
-                            cid_as = t.channel_id
-                            del gs.timers[name]
-                            _save()
-                            ch = await _get_channel(cid_as)
-                            if ch:
-                                await ch.send(f"🏁 **{name}** 시간 도달 → 자동 종료")
-                            safe = re.sub(r"[^\w가-힣]", "_", name)[:20]
-                            play_event_audio(gid, f"{name} 자동 종료.", f"{gid}_as_{safe}.mp3")
-                            asyncio.create_task(update_status_panel(gid))
-                            if not gs.state_exists():
-                                _cancel_voice_worker(gid)
-                                asyncio.create_task(ensure_voice_disconnected(gid))
-                            continue
-
-                        if ts >= t.phase_end_at:
-                            new_mode = "rest" if t.mode == "study" else "study"
-
-                            # Auto-stop: 반복 횟수
-                            if new_mode == "study" and t.auto_stop_cycles is not None:
-                                t.cycle_count += 1
-                                if t.cycle_count >= t.auto_stop_cycles:
-                                    cycles = t.auto_stop_cycles
-                                    cid_as = t.channel_id
-                                    del gs.timers[name]
-                                    _save()
-                                    ch = await _get_channel(cid_as)
-                                    if ch:
-                                        await ch.send(
-                                            f"🏁 **{name}** "
-                                            f"{cycles}회 반복 완료 → 자동 종료"
-                                        )
-                                    safe = re.sub(r"[^\w가-힣]", "_", name)[:20]
-                                    play_event_audio(gid, f"{name} 자동 종료.", f"{gid}_as_{safe}.mp3")
-                                    asyncio.create_task(update_status_panel(gid))
-                                    if not gs.state_exists():
-                                        _cancel_voice_worker(gid)
-                                        asyncio.create_task(ensure_voice_disconnected(gid))
-                                    continue
-
-                            overshoot = ts - t.phase_end_at
-                            t.mode         = new_mode
-                            t.phase_end_at = ts + getattr(t, f"{new_mode}_sec") - overshoot
-                            await notify_transition(gid, t.channel_id, name, new_mode)
-                            asyncio.create_task(update_status_panel(gid))
-
-                # 3-1) Stats periodic save (~30초마다)
-                if gs.timers and ts - gs.last_stats_save >= 30:
-                    gs.last_stats_save = ts
-                    _save()
-
-                # 4) 음성채널 연결 유지
-                if gs.state_exists() and gs.last_voice_channel_id:
-                    _ensure_voice_worker(gid)
-                    q = voice_queues.get(gid)
-                    if q is not None and q.empty():
-                        asyncio.create_task(ensure_voice_connected(gid, gs))
-                elif not gs.state_exists():
+
+            # Auto-stop: 시간 제한
+            if t.auto_stop_ts is not None and ts >= t.auto_stop_ts:
+                timer_service.account(gs, name, t, min(ts, t.auto_stop_ts))
+                cid_as = t.channel_id
+                del gs.timers[name]
+                record_timer(gs, name)
+                box.play(auto_stop_phrase(name), t.auto_stop_ts)
+                box.notice(cid_as, f"🏁 **{name}** 시간 도달 → 자동 종료")
+                box.refresh_panel()
+                if not gs.state_exists():
                     _cancel_voice_worker(gid)
-                    asyncio.create_task(ensure_voice_disconnected(gid))
+                    want_voice(gid, None)
+                continue
 
-    except asyncio.CancelledError:
-        log.info("스케줄러 종료 guild=%d", gid)
+            if ts >= t.phase_end_at:
+                # 끝난 페이즈 구간 기록 — 초과분(overshoot)은 다음 페이즈 몫
+                timer_service.account(gs, name, t, t.phase_end_at)
+                new_mode = "rest" if t.mode == "study" else "study"
+
+                # Auto-stop: 반복 횟수
+                if new_mode == "study" and t.auto_stop_cycles is not None:
+                    t.cycle_count += 1
+                    if t.cycle_count >= t.auto_stop_cycles:
+                        cycles = t.auto_stop_cycles
+                        cid_as = t.channel_id
+                        del gs.timers[name]
+                        record_timer(gs, name)
+                        box.play(auto_stop_phrase(name), t.phase_end_at)
+                        box.notice(cid_as, f"🏁 **{name}** {cycles}회 반복 완료 → 자동 종료")
+                        box.refresh_panel()
+                        if not gs.state_exists():
+                            _cancel_voice_worker(gid)
+                            want_voice(gid, None)
+                        continue
+
+                due = t.phase_end_at
+                overshoot = ts - t.phase_end_at
+                t.mode         = new_mode
+                t.phase_end_at = ts + getattr(t, f"{new_mode}_sec") - overshoot
+                record_timer(gs, name)
+                notify_transition(box, t.channel_id, name, new_mode, due)
+                box.refresh_panel()
+
+    # 3-1) 통계 체크포인트 — 오래 열린 구간을 중간 기록 (비정상 종료 대비)
+    checkpoint = _next_checkpoint(gs)
+    if checkpoint is not None and ts >= checkpoint:
+        timer_service.account_running(gs, ts)
+
+    # 4) 원하는 음성채널 알림 — 연결·재연결·해제는 voice_manager가 (바뀔 때만 task 생성)
+    if gs.state_exists() and gs.last_voice_channel_id:
+        _ensure_voice_worker(gid)
+        want_voice(gid, gs.last_voice_channel_id)
+    elif not gs.state_exists():
         _cancel_voice_worker(gid)
-        await ensure_voice_disconnected(gid)
+        want_voice(gid, None)
+
+
+async def _run_tick(gid: int) -> None:
+    """락을 잡고 _tick 실행 후 다음 데드라인을 등록하고, 락 밖에서 outbox를 내보낸다."""
+    box = Outbox(gid)
+    not_before: float | None = None
+    try:
+        lock = guild_locks.get(gid)
+        if lock is None:
+            return
+        async with lock:
+            gs = guild_states.get(gid)
+            if gs is None:
+                return
+            t0 = time.perf_counter()
+            _tick(gid, gs, box)
+            _m_lock_hold.observe((time.perf_counter() - t0) * 1000)
+        _failures.pop(gid, None)
     except Exception:
-        log.exception("스케줄러 예외 guild=%d", gid)
+        # 상태가 그대로라 데드라인도 과거 — 바로 다시 돌리면 같은 예외가 반복된다
+        n = _failures[gid] = _failures.get(gid, 0) + 1
+        backoff = min(_FAIL_BACKOFF_MAX_SEC, _FAIL_BACKOFF_SEC * 2 ** (n - 1))
+        not_before = now_ts() + backoff
+        _m_tick_errors.inc()
+        log.exception("스케줄러 예외 guild=%d (%d회 연속, %.0f초 후 재시도)", gid, n, backoff)
+    finally:
+        _running.discard(gid)
+        gs = guild_states.get(gid)
+        if gs is not None and gs.state_exists():
+            _reschedule(gid, gs, not_before)
+    await dispatch(box)
+
+
+def _reschedule(gid: int, gs: GuildState, not_before: float | None = None) -> None:
+    deadline = next_deadline(gs)
+    prepare = _prepare_at(gid, gs)
+    if prepare is not None and deadline is not None:
+        deadline = min(deadline, prepare)
+    if deadline is None:
+        _deadlines.pop(gid, None)
+        return
+    if not_before is not None:
+        deadline = max(deadline, not_before)
+    if _deadlines.get(gid) == deadline:
+        return
+    _deadlines[gid] = deadline
+    heapq.heappush(_heap, (deadline, gid))
+    # stale 항목이 쌓이면 힙 재구성
+    if len(_heap) > 2 * len(_deadlines) + 64:
+        _heap[:] = [(d, g) for g, d in _deadlines.items()]
+        heapq.heapify(_heap)
+    if _wakeup is not None and _heap[0] == (deadline, gid):
+        _wakeup.set()
+
+
+async def _scheduler_loop() -> None:
+    """전역 스케줄러 루프 — 힙 top의 데드라인까지 잠든 뒤 해당 길드 tick 실행."""
+    assert _wakeup is not None
+    log.info("전역 스케줄러 시작")
+    try:
+        while True:
+            _wakeup.clear()
+            while _heap and _deadlines.get(_heap[0][1]) != _heap[0][0]:
+                heapq.heappop(_heap)
+            if not _heap:
+                await _wakeup.wait()
+                continue
+            delay = _heap[0][0] - now_ts()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(_wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, gid = heapq.heappop(_heap)
+            del _deadlines[gid]
+            if gid in _running:
+                continue  # 실행 중인 tick이 끝나면 다시 등록됨
+            _running.add(gid)
+            asyncio.create_task(_run_tick(gid))
+    except asyncio.CancelledError:
+        log.info("전역 스케줄러 종료")
 
 
 def ensure_scheduler(gid: int) -> None:
-    """길드 스케줄러 태스크가 없거나 종료되었으면 새로 생성."""
-    t = guild_tasks.get(gid)
-    if t is None or t.done():
-        guild_tasks[gid] = asyncio.create_task(guild_scheduler(gid))
+    """길드의 다음 데드라인을 (재)등록하고, 전역 루프가 없으면 시작한다.
+
+    타이머·쉬는시간·일시정지 상태가 바뀐 뒤 호출한다.
+    """
+    global _wakeup, _loop_task
+    if _wakeup is None:
+        _wakeup = asyncio.Event()
+    if _loop_task is None or _loop_task.done():
+        _loop_task = asyncio.create_task(_scheduler_loop())
+    gs = guild_states.get(gid)
+    if gs is None or gid in _running:
+        return
+    _reschedule(gid, gs)
 
 
 def cancel_scheduler(gid: int) -> None:
-    """길드 스케줄러 태스크를 취소한다."""
-    task = guild_tasks.pop(gid, None)
-    if task and not task.done():
-        task.cancel()
+    """길드를 스케줄러에서 제거한다."""
+    _deadlines.pop(gid, None)
+    _prepared.pop(gid, None)
+    _failures.pop(gid, None)
@@ -0,0 +1,158 @@
+"""
+학교종 Discord 봇 — 통계 조회 (기간 / 순위 / 연속 출석)
+
+기간 토큰(``오늘`` · ``어제`` · ``N일`` · ``이번주`` · ``지난주`` · ``이번달`` ·
+``지난달``)을 ``StatsRange`` 로 풀고, ``StatsStore`` 의 주/월 집계 또는 일별
+누적합으로 답한다. 어떤 기간이든 이름 하나당 O(1).
+
+통계는 구간이 닫힐 때(페이즈 전환 등)만 저장소에 기록되므로, 조회할 때는
+진행 중인 타이머의 열린 구간(``open_intervals``)을 더해 "지금까지" 값을 보여 준다.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from app.config import ATTENDANCE_MIN_STUDY_SEC, KST, STATS_MAX_PERIOD_DAYS
+from app.domain.models import GuildState
+from app.domain.stats import StatsStore, month_key, split_by_day, week_key
+from app.services.timer_service import is_running
+from app.utils.time_utils import now_ts
+
+Totals = tuple[float, float]     # (공부 초, 휴식 초)
+Live   = list[tuple[str, date, str, float]]   # [(이름, 날짜, 모드, 초)]
+
+
+@dataclass(frozen=True)
+class StatsRange:
+    label: str
+    start: date
+    end: date
+    bucket: str | None = None    # "weekly" | "monthly" — 미리 계산된 집계로 답할 수 있을 때
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def contains(self, d: date) -> bool:
+        return self.start <= d <= self.end
+
+
+def resolve_period(tok: str | None, today: date, default: str = "오늘") -> StatsRange:
+    """기간 토큰 → StatsRange. 토큰 검증은 파서(``period_tok``)가 한다."""
+    tok = tok or default
+    if tok == "오늘":
+        return StatsRange("오늘", today, today)
+    if tok == "어제":
+        y = today - timedelta(days=1)
+        return StatsRange("어제", y, y)
+    if tok in ("이번주", "지난주"):
+        monday = today - timedelta(days=today.weekday())
+        if tok == "지난주":
+            monday -= timedelta(weeks=1)
+        return StatsRange(tok, monday, monday + timedelta(days=6), "weekly")
+    if tok in ("이번달", "지난달"):
+        first = today.replace(day=1)
+        if tok == "지난달":
+            first = (first - timedelta(days=1)).replace(day=1)
+        nxt = (first + timedelta(days=32)).replace(day=1)
+        return StatsRange(tok, first, nxt - timedelta(days=1), "monthly")
+    # 파서를 거치지 않은 토큰도 날짜 범위를 벗어나지 않도록
+    n = max(1, min(int(tok.rstrip("일")), STATS_MAX_PERIOD_DAYS, today.toordinal()))
+    return StatsRange(f"최근 {n}일", today - timedelta(days=n - 1), today)
+
+
+def day_range(d: date) -> StatsRange:
+    return StatsRange(d.strftime("%m/%d"), d, d)
+
+
+# ── 열린 구간 ──────────────────────────────────────────────────────────────────
+
+def open_intervals(gs: GuildState, ts: float | None = None) -> Live:
+    """아직 기록되지 않은 진행 중 구간 (KST 자정 기준 분할)."""
+    ts = now_ts() if ts is None else ts
+    live: Live = []
+    for name, t in gs.timers.items():
+        if not is_running(gs, t):
+            continue
+        mode = "study" if t.mode == "study" else "rest"
+        for d, seconds in split_by_day(t.last_accounted_at, min(ts, t.phase_end_at)):
+            live.append((name, d, mode, seconds))
+    return live
+
+
+def _add_live(totals: dict[str, Totals], live: Live, rng: StatsRange) -> None:
+    for name, d, mode, seconds in live:
+        if not rng.contains(d):
+            continue
+        s, r = totals.get(name, (0.0, 0.0))
+        totals[name] = (s + seconds, r) if mode == "study" else (s, r + seconds)
+
+
+# ── 조회 ───────────────────────────────────────────────────────────────────────
+
+def _bucket(store: StatsStore, rng: StatsRange) -> dict[str, dict[str, float]]:
+    if rng.bucket == "weekly":
+        return store.weekly.get(week_key(rng.start), {})
+    return store.monthly.get(month_key(rng.start), {})
+
+
+def _stored_totals(store: StatsStore, name: str, rng: StatsRange) -> Totals:
+    if rng.bucket:
+        e = _bucket(store, rng).get(name, {})
+        return e.get("study", 0.0), e.get("rest", 0.0)
+    return store.range_totals(name, rng.start, rng.end)
+
+
+def user_totals(gs: GuildState, name: str, rng: StatsRange, live: Live | None = None) -> Totals:
+    """한 사람의 기간 합계 (진행 중 구간 포함)."""
+    live = open_intervals(gs) if live is None else live
+    totals = {name: _stored_totals(gs.stats, name, rng)}
+    _add_live(totals, [x for x in live if x[0] == name], rng)
+    return totals[name]
+
+
+def guild_totals(gs: GuildState, rng: StatsRange, live: Live | None = None) -> dict[str, Totals]:
+    """{이름: (공부, 휴식)} — 기간 안에 기록이 있는 이름만 (진행 중 구간 포함)."""
+    store = gs.stats
+    if rng.bucket:
+        totals = {
+            n: (e.get("study", 0.0), e.get("rest", 0.0))
+            for n, e in _bucket(store, rng).items()
+        }
+    else:
+        totals = {}
+        for n in store.names():
+            s, r = store.range_totals(n, rng.start, rng.end)
+            if s > 0 or r > 0:
+                totals[n] = (s, r)
+    _add_live(totals, open_intervals(gs) if live is None else live, rng)
+    return totals
+
+
+def day_totals(gs: GuildState, d: date) -> dict[str, Totals]:
+    """그날 {이름: (공부, 휴식)} — 출석부·상태 패널용."""
+    return guild_totals(gs, day_range(d))
+
+
+def leaderboard(gs: GuildState, rng: StatsRange, limit: int = 10) -> list[tuple[str, Totals]]:
+    """공부 시간 순 상위 limit명."""
+    ranked = sorted(guild_totals(gs, rng).items(), key=lambda kv: kv[1][0], reverse=True)
+    return ranked[:limit]
+
+
+def attendance_streak(gs: GuildState, name: str, today: date | None = None) -> int:
+    """오늘(아직 미달이면 어제)부터 거꾸로 센 연속 출석 일수 (공부 ``ATTENDANCE_MIN_STUDY_SEC`` 이상)."""
+    today = today or datetime.now(KST).date()
+    live = [x for x in open_intervals(gs) if x[0] == name]
+
+    def attended(d: date) -> bool:
+        return user_totals(gs, name, day_range(d), live)[0] >= ATTENDANCE_MIN_STUDY_SEC
+
+    d = today if attended(today) else today - timedelta(days=1)
+    first = StatsStore.retained_since(today)
+    streak = 0
+    while d >= first and attended(d):
+        streak += 1
+        d -= timedelta(days=1)
+    return streak
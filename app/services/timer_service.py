@@ -7,15 +7,17 @@ from datetime import datetime
 
 from app.config import KST
 from app.domain.models import GuildState, Timer
-from app.repositories.state_repository import save_state
-from app.services.guild_state_service import guild_states
+from app.domain.stats import day_key, split_by_day
+from app.services.persistence_service import (
+    record_breaks,
+    record_meta,
+    record_stats,
+    record_timer,
+    record_timers,
+)
 from app.utils.time_utils import fmt_dur, fmt_mm_ss, now_ts
 
 
-def _save() -> None:
-    save_state(guild_states)
-
-
 # ── 순수 타이머 상태 조작 ─────────────────────────────────────────────────────
 
 def timer_pause(timer: Timer) -> None:
@@ -30,6 +32,7 @@ def timer_resume(timer: Timer) -> None:
     rem = timer.remaining_on_pause or 0.0
     timer.phase_end_at       = now_ts() + rem
     timer.remaining_on_pause = None
+    timer.last_accounted_at  = now_ts()      # 쉬는시간 동안은 통계 구간에서 제외
 
 
 def timer_personal_pause(timer: Timer, gs: GuildState) -> None:
@@ -49,13 +52,38 @@ def timer_personal_resume(timer: Timer, gs: GuildState) -> None:
         timer.phase_end_at = now_ts() + rem
 
 
-def accumulate_stats(gs: GuildState, name: str, mode: str, seconds: float) -> None:
-    if seconds <= 0:
+# ── 통계 구간 기록 ────────────────────────────────────────────────────────────
+#
+# 진행 중인 타이머는 [last_accounted_at, 지금) 구간이 "열려" 있고, 페이즈 전환 ·
+# 쉬는시간 시작 · 개인 일시정지 · 종료 · 자동 종료 때 한 번에 닫아 기록한다.
+# 아직 닫히지 않은 구간은 stats_service가 조회 시 더해서 보여 준다.
+
+def is_running(gs: GuildState, t: Timer) -> bool:
+    """통계 구간이 열려 있는(시간이 흐르는) 타이머인지."""
+    return (
+        gs.pause_until is None
+        and t.remaining_on_personal_pause is None
+        and t.last_accounted_at > 0
+    )
+
+
+def account(gs: GuildState, name: str, t: Timer, until: float) -> None:
+    """t의 열린 구간 [last_accounted_at, until)을 현재 모드로 기록 (KST 자정 기준 분할)."""
+    start = t.last_accounted_at
+    if start <= 0 or until <= start:
         return
-    date_key = datetime.now(KST).strftime("%Y-%m-%d")
-    day = gs.stats.setdefault(date_key, {})
-    entry = day.setdefault(name, {"study": 0.0, "rest": 0.0})
-    entry["study" if mode == "study" else "rest"] += seconds
+    key = "study" if t.mode == "study" else "rest"
+    for day, seconds in split_by_day(start, until):
+        gs.stats.add(day, name, key, seconds)
+        record_stats(gs, day_key(day), name, key, seconds)
+    t.last_accounted_at = until
+
+
+def account_running(gs: GuildState, ts: float) -> None:
+    """진행 중인 모든 타이머의 구간을 ts까지 (현재 페이즈 끝을 넘지 않게) 기록."""
+    for name, t in gs.timers.items():
+        if is_running(gs, t):
+            account(gs, name, t, min(ts, t.phase_end_at))
 
 
 # ── 커맨드 핸들러용 서비스 함수 ───────────────────────────────────────────────
@@ -83,8 +111,12 @@ def set_timer(
     )
     if gs.pause_until is not None:
         timer_pause(entry)
+    old = gs.timers.get(name)
+    if old is not None and is_running(gs, old):
+        # 같은 이름 재설정 — 이전 타이머의 열린 구간부터 닫음
+        account(gs, name, old, min(ts_now, old.phase_end_at))
     gs.timers[name] = entry
-    _save()
+    record_timer(gs, name)
     suffix = ""
     if auto_stop_cycles:
         suffix += f" | {auto_stop_cycles}회 반복"
@@ -111,22 +143,16 @@ def stop_timer(gs: GuildState, name: str) -> tuple[str, bool, bool]:
     if name not in gs.timers:
         return f"❌ **{name}** 타이머 없음", False, False
     t = gs.timers[name]
-    if gs.pause_until is None and t.remaining_on_personal_pause is None:
-        if t.last_accounted_at > 0:
-            accumulate_stats(gs, name, t.mode, now_ts() - t.last_accounted_at)
+    if is_running(gs, t):
+        account(gs, name, t, now_ts())
     del gs.timers[name]
-    _save()
+    record_timer(gs, name)
     return f"✅ **{name}** 타이머 종료", True, not gs.state_exists()
 
 
 def shutdown_all(gs: GuildState) -> str:
     """전체 종료: 모든 타이머/쉬는시간 삭제. 항상 성공."""
-    _ts = now_ts()
-    if gs.pause_until is None:
-        for _n, _t in gs.timers.items():
-            if _t.remaining_on_personal_pause is None:
-                if _t.last_accounted_at > 0 and _t.last_accounted_at < _ts:
-                    accumulate_stats(gs, _n, _t.mode, _ts - _t.last_accounted_at)
+    account_running(gs, now_ts())
     gs.timers.clear()
     gs.breaks.clear()
     gs.recurring_breaks.clear()
@@ -134,7 +160,9 @@ def shutdown_all(gs: GuildState) -> str:
     gs.pinned_voice_channel_id  = None
     gs.last_voice_channel_id    = None
     gs.voice_notice_sent        = False
-    _save()
+    record_timers(gs)
+    record_breaks(gs)
+    record_meta(gs)
     return "✅ 전체 종료: 모든 타이머/쉬는시간 중지"
 
 
@@ -145,11 +173,10 @@ def do_personal_pause(gs: GuildState, name: str) -> tuple[str, bool]:
         return f"❌ **{name}** 타이머 없음", False
     if t.remaining_on_personal_pause is not None:
         return f"ℹ️ **{name}** 이미 일시정지 중입니다.", False
-    if gs.pause_until is None:
-        if t.last_accounted_at > 0:
-            accumulate_stats(gs, name, t.mode, now_ts() - t.last_accounted_at)
-        t.last_accounted_at = now_ts()
+    if is_running(gs, t):
+        account(gs, name, t, now_ts())
     timer_personal_pause(t, gs)
+    record_timer(gs, name)
     return (
         f"⏸️ **{name}** 일시정지 "
         f"(남은 시간 {fmt_mm_ss(t.remaining_on_personal_pause)} 저장)"
@@ -165,6 +192,7 @@ def do_personal_resume(gs: GuildState, name: str) -> tuple[str, bool]:
         return f"ℹ️ **{name}** 일시정지 상태가 아닙니다.", False
     timer_personal_resume(t, gs)
     t.last_accounted_at = now_ts()
+    record_timer(gs, name)
     if gs.pause_until is not None:
         return (
             f"▶️ **{name}** 개인 일시정지 해제 "
@@ -182,12 +210,15 @@ def do_set_remaining(gs: GuildState, name: str, new_sec: int) -> tuple[str, bool
         return f"❌ **{name}** 타이머 없음", False
     if t.remaining_on_personal_pause is not None:
         t.remaining_on_personal_pause = float(new_sec)
+        record_timer(gs, name)
         return f"✅ **{name}** 남은시간 → {fmt_dur(new_sec)} (개인 일시정지 중)", True
     elif t.remaining_on_pause is not None:
         t.remaining_on_pause = float(new_sec)
+        record_timer(gs, name)
         return f"✅ **{name}** 남은시간 → {fmt_dur(new_sec)} (전체 일시정지 중)", True
     else:
         t.phase_end_at = now_ts() + new_sec
+        record_timer(gs, name)
         edt = datetime.fromtimestamp(t.phase_end_at, tz=KST)
         return (
             f"✅ **{name}** 남은시간 → {fmt_dur(new_sec)} "
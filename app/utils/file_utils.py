@@ -0,0 +1,17 @@
+"""
+학교종 Discord 봇 — 파일 유틸리티
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def atomic_write(path: Path, text: str) -> None:
+    """임시 파일에 쓰고 fsync 후 교체 — 중간에 죽어도 이전 내용이나 새 내용만 남는다. 블로킹."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
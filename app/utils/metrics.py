@@ -0,0 +1,117 @@
+"""
+학교종 Discord 봇 — 프로세스 내 메트릭 (카운터 / 게이지 / 히스토그램)
+
+``counter(name)`` 등은 같은 이름이면 같은 객체를 돌려준다.
+``format_metrics()`` 결과는 ``--학교종 진단`` 명령으로 확인할 수 있다.
+"""
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field
+
+# 기본 히스토그램 버킷 (ms)
+DEFAULT_BUCKETS_MS: tuple[float, ...] = (
+    1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+
+@dataclass
+class Counter:
+    name: str
+    value: float = 0.0
+
+    def inc(self, n: float = 1.0) -> None:
+        self.value += n
+
+    def render(self) -> str:
+        return f"{self.name} {self.value:g}"
+
+
+@dataclass
+class Gauge:
+    name: str
+    value: float = 0.0
+
+    def set(self, v: float) -> None:
+        self.value = v
+
+    def inc(self, n: float = 1.0) -> None:
+        self.value += n
+
+    def dec(self, n: float = 1.0) -> None:
+        self.value -= n
+
+    def render(self) -> str:
+        return f"{self.name} {self.value:g}"
+
+
+@dataclass
+class Histogram:
+    name: str
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS_MS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)   # 마지막 = +Inf
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, v)] += 1
+        self.count += 1
+        self.total += v
+        if v > self.max:
+            self.max = v
+
+    def quantile(self, q: float) -> float:
+        """버킷 상한 기준 근사 분위수. 관측값이 없으면 0."""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def render(self) -> str:
+        if self.count == 0:
+            return f"{self.name} n=0"
+        avg = self.total / self.count
+        return (
+            f"{self.name} n={self.count} avg={avg:.1f} "
+            f"p50≤{self.quantile(0.5):g} p99≤{self.quantile(0.99):g} max={self.max:.1f}"
+        )
+
+
+_registry: dict[str, Counter | Gauge | Histogram] = {}
+
+
+def counter(name: str) -> Counter:
+    m = _registry.setdefault(name, Counter(name))
+    assert isinstance(m, Counter)
+    return m
+
+
+def gauge(name: str) -> Gauge:
+    m = _registry.setdefault(name, Gauge(name))
+    assert isinstance(m, Gauge)
+    return m
+
+
+def histogram(name: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS_MS) -> Histogram:
+    m = _registry.get(name)
+    if m is None:
+        m = _registry[name] = Histogram(name, buckets)
+    assert isinstance(m, Histogram)
+    return m
+
+
+def format_metrics(prefix: str = "") -> str:
+    """등록된 메트릭을 이름순으로 한 줄씩 렌더링."""
+    return "\n".join(
+        m.render() for name, m in sorted(_registry.items()) if name.startswith(prefix)
+    )
@@ -4,13 +4,16 @@
 import re
 from datetime import datetime, timedelta
 
-from app.config import KST
+from app.config import KST, STATS_MAX_PERIOD_DAYS
 
 # ── Regex patterns ────────────────────────────────────────────────────────────
 _RE_TIME   = re.compile(r"^(\d+)(초|분|시간)(공부|휴식)$")
 _RE_DUR    = re.compile(r"^(\d+)(초|분|시간)$")
 _RE_HHMM   = re.compile(r"^\d{1,2}:\d{2}$")
 _RE_REPEAT = re.compile(r"^(\d+)회반복$")
+_RE_DAYS   = re.compile(r"^(\d{1,4})일$")
+
+STATS_PERIODS = ("오늘", "어제", "이번주", "지난주", "이번달", "지난달")
 
 
 # ── Time helpers ──────────────────────────────────────────────────────────────
@@ -65,3 +68,11 @@ def dur_tok(s: str) -> int | None:
     """'20분' → 1200, '30초' → 30, '1시간' → 3600"""
     m = _RE_DUR.match(s)
     return unit_to_sec(int(m.group(1)), m.group(2)) if m else None
+
+
+def period_tok(s: str) -> str | None:
+    """통계 기간 토큰이면 그대로, 아니면 None. '30일', '이번주' 등 (N은 1 ~ ``STATS_MAX_PERIOD_DAYS``)"""
+    if s in STATS_PERIODS:
+        return s
+    m = _RE_DAYS.match(s)
+    return s if m and 0 < int(m.group(1)) <= STATS_MAX_PERIOD_DAYS else None
@@ -0,0 +1,81 @@
+"""
+state_repository 로드/저장 벤치마크 (10 / 1k / 10k 길드)
+
+    python -m benchmarks.bench_state_repository
+
+백엔드(json / sqlite)마다 임시 디렉토리에 저장소를 만들고, 전체 저장 ·
+1길드 변경 저장 · 전체 로드 시간을 측정한다 (통계 포함). 실제 상태 파일은
+건드리지 않는다.
+"""
+from __future__ import annotations
+
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.domain.models import BreakEntry, GuildState, Timer
+from app.repositories.sqlite_state_repository import SqliteStateRepository
+from app.repositories.state_repository import JsonStateRepository, StateRepository
+
+BACKENDS     = ("json", "sqlite")
+GUILD_COUNTS = (10, 1_000, 10_000)
+STATS_DAYS   = 30
+
+
+def _make_guild(gid: int) -> GuildState:
+    gs = GuildState(gid=gid, last_channel_id=gid)
+    for i in range(3):
+        gs.timers[f"user{i}"] = Timer(study_sec=1500, rest_sec=300, channel_id=gid)
+    gs.recurring_breaks.append(BreakEntry(label="점심", hhmm="12:00", duration_sec=3600))
+    gs.presets["집중"] = "user0 25분공부 5분휴식"
+    start = date(2026, 1, 1)
+    for d in range(STATS_DAYS):
+        for i in range(3):
+            gs.stats.add(start + timedelta(days=d), f"user{i}", "study", 3600.0)
+            gs.stats.add(start + timedelta(days=d), f"user{i}", "rest", 900.0)
+    return gs
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def _make_repo(backend: str, tmp: Path) -> StateRepository:
+    if backend == "sqlite":
+        return SqliteStateRepository(tmp / "state.db")
+    return JsonStateRepository(tmp / "state", legacy_file=None, stats_dir=tmp / "stats")
+
+
+def run(backend: str, n: int) -> None:
+    states = {gid: _make_guild(gid) for gid in range(1, n + 1)}
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = _make_repo(backend, Path(tmp))
+        def save_all() -> None:
+            repo.save_guilds({gid: gs.to_save_dict() for gid, gs in states.items()})
+            repo.save_stats({gid: gs.stats.to_save_dict() for gid, gs in states.items()})
+
+        def save_one() -> None:
+            repo.save_guilds({1: states[1].to_save_dict()})
+            repo.save_stats({1: states[1].stats.to_save_dict()})
+
+        def load() -> None:
+            repo.load_all()
+            repo.load_stats()
+
+        full_ms = _timed(save_all)
+        one_ms  = _timed(save_one)
+        load_ms = _timed(load)
+        repo.close()
+    print(
+        f"{backend:>6} {n:>6} guilds | save all {full_ms:9.1f} ms | "
+        f"save 1 dirty {one_ms:7.2f} ms | load {load_ms:9.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    for backend in BACKENDS:
+        for n in GUILD_COUNTS:
+            run(backend, n)
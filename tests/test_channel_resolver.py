@@ -0,0 +1,64 @@
+"""channel_resolver — 삭제(NotFound)와 권한 없음(Forbidden) 구분."""
+import asyncio
+
+import discord
+import pytest
+
+import app.bot.client as client
+from app.bot import channel_resolver as cr
+from app.domain.models import GuildState, Timer
+from app.services import persistence_service
+from app.services.guild_state_service import guild_states
+
+
+class _Resp:
+    status = 0
+    reason = "test"
+
+
+@pytest.fixture
+def guild(monkeypatch):
+    monkeypatch.setattr(cr, "_fetched", {})
+    monkeypatch.setattr(cr, "_missing", {})
+    monkeypatch.setattr(persistence_service, "_append", lambda gs, op, **fields: None)
+    monkeypatch.setattr(client.bot, "get_channel", lambda cid: None)
+    gs = GuildState(
+        gid=1, last_channel_id=50, pinned_voice_channel_id=40, last_voice_channel_id=40,
+        status_panel_channel_id=40, status_panel_message_id=7,
+    )
+    gs.timers["a"] = Timer(60, 60, channel_id=40)
+    monkeypatch.setitem(guild_states, 1, gs)
+    return gs
+
+
+def _fetch_raising(monkeypatch, exc: Exception) -> list[int]:
+    calls: list[int] = []
+
+    async def fetch(cid):
+        calls.append(cid)
+        raise exc
+
+    monkeypatch.setattr(client.bot, "fetch_channel", fetch)
+    return calls
+
+
+def test_forbidden_keeps_stored_channels(guild, monkeypatch):
+    calls = _fetch_raising(monkeypatch, discord.Forbidden(_Resp(), "no access"))
+    assert asyncio.run(cr.resolve_channel(40)) is None
+    assert asyncio.run(cr.resolve_channel(40)) is None         # TTL 동안은 다시 조회 안 함
+    assert calls == [40]
+    assert cr._missing[40] != float("inf")
+    assert guild.pinned_voice_channel_id == 40 and guild.last_voice_channel_id == 40
+    assert guild.status_panel_message_id == 7
+    assert guild.timers["a"].channel_id == 40
+
+
+def test_not_found_cleans_up_and_moves_timers(guild, monkeypatch):
+    calls = _fetch_raising(monkeypatch, discord.NotFound(_Resp(), "gone"))
+    assert asyncio.run(cr.resolve_channel(40)) is None
+    assert asyncio.run(cr.resolve_channel(40)) is None
+    assert calls == [40]
+    assert cr._missing[40] == float("inf")
+    assert guild.pinned_voice_channel_id is None and guild.last_voice_channel_id is None
+    assert guild.status_panel_message_id is None
+    assert guild.timers["a"].channel_id == 50
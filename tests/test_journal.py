@@ -0,0 +1,53 @@
+"""journal.apply_record — 스냅샷 시퀀스(journal_seq) 기준 재생."""
+from app.repositories.journal import apply_record
+
+
+def _rec(s: int, op: str, g: int = 1, **fields) -> dict:
+    return {"s": s, "g": g, "op": op, **fields}
+
+
+def test_unknown_guild_starts_empty():
+    records: dict[int, dict] = {}
+    apply_record(records, _rec(1, "timer", n="a", v={"study_sec": 60}))
+    assert records[1]["timers"] == {"a": {"study_sec": 60}}
+    assert records[1]["presets"] == {} and records[1]["breaks"] == []
+
+
+def test_records_covered_by_snapshot_are_skipped():
+    records = {1: {"journal_seq": 5, "timers": {"a": {"v": "snap"}}, "presets": {}}}
+    for s in (4, 5, 6):
+        apply_record(records, _rec(s, "timer", n="a", v={"v": s}))
+    assert records[1]["timers"]["a"] == {"v": 6}
+
+
+def test_seq_is_per_guild_snapshot():
+    records = {1: {"journal_seq": 10}, 2: {"journal_seq": 0}}
+    apply_record(records, _rec(7, "meta", g=1, v={"last_channel_id": 1}))
+    apply_record(records, _rec(7, "meta", g=2, v={"last_channel_id": 2}))
+    assert "last_channel_id" not in records[1]
+    assert records[2]["last_channel_id"] == 2
+
+
+def test_ops():
+    records: dict[int, dict] = {}
+    apply_record(records, _rec(1, "timer", n="a", v={"x": 1}))
+    apply_record(records, _rec(2, "timer", n="b", v={"x": 2}))
+    apply_record(records, _rec(3, "timer_del", n="a"))
+    assert records[1]["timers"] == {"b": {"x": 2}}
+    apply_record(records, _rec(4, "timers", v={"c": {"x": 3}}))
+    assert records[1]["timers"] == {"c": {"x": 3}}
+    apply_record(records, _rec(5, "breaks", v=[{"b": 1}], r=[{"r": 1}]))
+    assert records[1]["breaks"] == [{"b": 1}]
+    assert records[1]["recurring_breaks"] == [{"r": 1}]
+    apply_record(records, _rec(6, "preset", n="p", v="50 10"))
+    apply_record(records, _rec(7, "preset", n="q", v="25 5"))
+    apply_record(records, _rec(8, "preset", n="p", v=None))
+    assert records[1]["presets"] == {"q": "25 5"}
+    apply_record(records, _rec(9, "meta", v={"pause_until": 123.0}))
+    assert records[1]["pause_until"] == 123.0
+
+
+def test_unknown_op_is_ignored():
+    records: dict[int, dict] = {}
+    apply_record(records, _rec(1, "bogus", v=1))
+    assert records[1] == {"presets": {}, "timers": {}, "breaks": [], "recurring_breaks": []}
@@ -0,0 +1,39 @@
+"""Timer.from_saved — 재시작 시 지난 페이즈 건너뛰기와 자동 종료."""
+from app.domain.models import Timer
+
+NOW = 1_800_000_000.0
+
+
+def _saved(**fields) -> dict:
+    data = {"study_sec": 600, "rest_sec": 300, "channel_id": 1, "mode": "study", "phase_end_at": NOW + 100}
+    data.update(fields)
+    return data
+
+
+def test_resumes_current_phase():
+    t = Timer.from_saved(_saved(), NOW)
+    assert t is not None and t.mode == "study" and t.phase_end_at == NOW + 100
+
+
+def test_fast_forwards_missed_phases():
+    # 공부 끝 NOW-1000 → 휴식(300) → 공부(600) 끝 NOW-100 → 휴식 NOW+200
+    t = Timer.from_saved(_saved(phase_end_at=NOW - 1000), NOW)
+    assert t is not None
+    assert (t.mode, t.phase_end_at, t.cycle_count) == ("rest", NOW + 200, 1)
+
+
+def test_auto_stop_time_passed_while_down():
+    assert Timer.from_saved(_saved(auto_stop_ts=NOW - 1), NOW) is None
+    assert Timer.from_saved(_saved(phase_end_at=NOW - 5000, auto_stop_ts=NOW - 1), NOW) is None
+    assert Timer.from_saved(_saved(auto_stop_ts=NOW + 60), NOW) is not None
+
+
+def test_auto_stop_cycles_reached_while_down():
+    assert Timer.from_saved(_saved(phase_end_at=NOW - 1000, auto_stop_cycles=1), NOW) is None
+    t = Timer.from_saved(_saved(phase_end_at=NOW - 1000, auto_stop_cycles=2), NOW)
+    assert t is not None and t.cycle_count == 1
+
+
+def test_paused_timer_is_not_fast_forwarded():
+    t = Timer.from_saved(_saved(phase_end_at=NOW - 5000, remaining_on_pause=120.0, auto_stop_cycles=1), NOW)
+    assert t is not None and t.cycle_count == 0
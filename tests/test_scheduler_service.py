@@ -0,0 +1,33 @@
+"""scheduler_service.next_deadline — 실제 이벤트 시각까지만 잔다."""
+from app.config import STATS_CHECKPOINT_SEC
+from app.domain.models import BreakEntry, GuildState, Timer
+from app.services.scheduler_service import next_deadline
+
+NOW = 1_800_000_000.0
+
+
+def test_recurring_breaks_only_sleep_until_next_break():
+    gs = GuildState(gid=1)
+    gs.recurring_breaks.append(BreakEntry("점심", "12:00", 3600, next_ts=NOW + 6 * 3600))
+    assert next_deadline(gs) == NOW + 6 * 3600
+
+
+def test_empty_state_has_no_deadline():
+    assert next_deadline(GuildState(gid=1)) is None
+
+
+def test_running_timer_wakes_for_phase_end_or_checkpoint():
+    gs = GuildState(gid=1)
+    gs.timers["a"] = Timer(3600, 600, channel_id=1, phase_end_at=NOW + 3600, last_accounted_at=NOW)
+    assert next_deadline(gs) == NOW + STATS_CHECKPOINT_SEC
+    gs.timers["a"].phase_end_at = NOW + 60
+    assert next_deadline(gs) == NOW + 60
+
+
+def test_paused_timers_need_no_checkpoint():
+    gs = GuildState(gid=1, pause_until=NOW + 7200)
+    gs.timers["a"] = Timer(3600, 600, channel_id=1, phase_end_at=NOW + 3600, last_accounted_at=NOW)
+    assert next_deadline(gs) == NOW + 7200
+    gs.pause_until = None
+    gs.timers["a"].remaining_on_personal_pause = 100.0
+    assert next_deadline(gs) is None
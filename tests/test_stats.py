@@ -0,0 +1,157 @@
+"""StatsStore · _Prefix · split_by_day."""
+from datetime import date, datetime, timedelta
+
+from app.config import KST, STATS_DAILY_RETENTION_DAYS
+from app.domain.stats import StatsStore, _Prefix, day_key, month_key, split_by_day, week_key
+
+D = date(2026, 3, 10)      # 화요일
+
+
+def _ord(d: date) -> int:
+    return d.toordinal()
+
+
+# ── _Prefix ───────────────────────────────────────────────────────────────────
+
+def test_prefix_range_sums_inclusive_days():
+    p = _Prefix(base=_ord(D))
+    for i in range(5):
+        p.add(_ord(D) + i, "study", 10.0 * (i + 1))     # 10, 20, 30, 40, 50
+    p.add(_ord(D) + 2, "rest", 5.0)
+    assert p.range(_ord(D), _ord(D)) == (10.0, 0.0)
+    assert p.range(_ord(D) + 1, _ord(D) + 3) == (90.0, 5.0)
+    assert p.range(_ord(D), _ord(D) + 4) == (150.0, 5.0)
+    assert p.range(_ord(D) + 3, _ord(D) + 1) == (0.0, 0.0)      # 뒤집힌 구간
+
+
+def test_prefix_gap_days_and_past_end():
+    p = _Prefix(base=_ord(D))
+    p.add(_ord(D), "study", 10.0)
+    p.add(_ord(D) + 4, "study", 7.0)                     # 사이 3일은 빈 날
+    assert p.range(_ord(D) + 1, _ord(D) + 3) == (0.0, 0.0)
+    assert p.range(_ord(D) + 4, _ord(D) + 100) == (7.0, 0.0)   # 끝 이후는 마지막 누적
+    assert p.range(_ord(D) - 10, _ord(D) - 1) == (0.0, 0.0)    # 시작 이전
+
+
+def test_prefix_add_before_base_extends_front():
+    p = _Prefix(base=_ord(D))
+    p.add(_ord(D), "study", 10.0)
+    p.add(_ord(D) - 2, "study", 3.0)
+    assert p.base == _ord(D) - 2
+    assert p.range(_ord(D) - 2, _ord(D) - 2) == (3.0, 0.0)
+    assert p.range(_ord(D) - 1, _ord(D)) == (10.0, 0.0)
+    assert p.range(_ord(D) - 2, _ord(D)) == (13.0, 0.0)
+
+
+def test_prefix_drop_before_keeps_later_ranges():
+    p = _Prefix(base=_ord(D))
+    for i in range(5):
+        p.add(_ord(D) + i, "study", 10.0)
+        p.add(_ord(D) + i, "rest", 1.0)
+    p.drop_before(_ord(D) + 2)
+    assert p.base == _ord(D) + 2
+    assert p.before == (20.0, 2.0)
+    assert p.range(_ord(D) + 2, _ord(D) + 4) == (30.0, 3.0)
+    assert p.range(_ord(D) + 3, _ord(D) + 3) == (10.0, 1.0)
+    # 잘린 날짜는 0 취급 — 잘린 앞부분이 합계에 끼어들지 않음
+    assert p.range(_ord(D), _ord(D) + 4) == (30.0, 3.0)
+    # 잘린 뒤 누적도 이어짐
+    p.add(_ord(D) + 4, "study", 5.0)
+    assert p.range(_ord(D) + 2, _ord(D) + 4) == (35.0, 3.0)
+
+
+def test_prefix_drop_everything():
+    p = _Prefix(base=_ord(D))
+    p.add(_ord(D), "study", 10.0)
+    p.drop_before(_ord(D) + 10)
+    assert p.study == [] and p.rest == []
+    assert p.before == (10.0, 0.0)
+
+
+# ── StatsStore ────────────────────────────────────────────────────────────────
+
+def test_add_updates_all_rollups():
+    s = StatsStore()
+    s.add(D, "민수", "study", 600)
+    s.add(D, "민수", "rest", 120)
+    s.add(D + timedelta(days=1), "민수", "study", 60)
+    assert s.user_day("민수", D) == {"study": 600, "rest": 120}
+    assert s.week_totals(D)["민수"] == {"study": 660, "rest": 120}
+    assert s.month_totals(D)["민수"] == {"study": 660, "rest": 120}
+    assert s.range_totals("민수", D, D + timedelta(days=1)) == (660, 120)
+    assert s.range_totals("영희", D, D) == (0.0, 0.0)
+
+
+def test_add_ignores_non_positive():
+    s = StatsStore()
+    s.add(D, "민수", "study", 0)
+    s.add(D, "민수", "study", -5)
+    assert s.daily == {} and s.names() == []
+
+
+def test_prune_drops_old_days_but_keeps_rollups():
+    s = StatsStore()
+    old = D - timedelta(days=STATS_DAILY_RETENTION_DAYS + 1)
+    s.add(old, "민수", "study", 100)
+    s.add(D, "민수", "study", 10)      # 새 날짜 → prune
+    assert day_key(old) not in s.daily
+    assert s.monthly[month_key(old)]["민수"]["study"] == 100
+    assert s.range_totals("민수", old, D) == (10, 0.0)
+    assert s.range_totals("민수", StatsStore.retained_since(D), D) == (10, 0.0)
+
+
+def test_prune_removes_names_without_recent_days():
+    s = StatsStore()
+    old = D - timedelta(days=STATS_DAILY_RETENTION_DAYS + 1)
+    s.add(old, "영희", "study", 100)
+    s.prune(D)
+    assert "영희" not in s.names()
+    assert s.range_totals("영희", old, D) == (0.0, 0.0)
+
+
+def test_from_saved_legacy_rebuilds_week_and_month():
+    data = {"daily": {
+        day_key(D): {"민수": {"study": 100.0, "rest": 10.0}},
+        day_key(D + timedelta(days=1)): {"민수": {"study": 50.0}},    # rest 없음
+    }}
+    s = StatsStore.from_saved(data, D + timedelta(days=1))
+    assert s.weekly[week_key(D)]["민수"] == {"study": 150.0, "rest": 10.0}
+    assert s.monthly[month_key(D)]["민수"] == {"study": 150.0, "rest": 10.0}
+    assert s.range_totals("민수", D, D + timedelta(days=1)) == (150.0, 10.0)
+
+
+def test_from_saved_keeps_saved_rollups():
+    data = {
+        "daily":   {day_key(D): {"민수": {"study": 100.0, "rest": 0.0}}},
+        "weekly":  {week_key(D): {"민수": {"study": 999.0, "rest": 0.0}}},
+        "monthly": {month_key(D): {"민수": {"study": 9999.0, "rest": 0.0}}},
+    }
+    s = StatsStore.from_saved(data, D)
+    assert s.week_totals(D)["민수"]["study"] == 999.0
+    assert s.month_totals(D)["민수"]["study"] == 9999.0
+
+
+def test_to_save_dict_round_trip_is_a_copy():
+    s = StatsStore()
+    s.add(D, "민수", "study", 100)
+    saved = s.to_save_dict()
+    s.add(D, "민수", "study", 1)
+    assert saved["daily"][day_key(D)]["민수"]["study"] == 100
+    restored = StatsStore.from_saved(saved, D)
+    assert restored.range_totals("민수", D, D) == (100, 0.0)
+
+
+# ── split_by_day ──────────────────────────────────────────────────────────────
+
+def test_split_by_day_across_kst_midnight():
+    start = datetime(2026, 3, 10, 23, 30, tzinfo=KST).timestamp()
+    pieces = split_by_day(start, start + 3600)
+    assert pieces == [(date(2026, 3, 10), 1800.0), (date(2026, 3, 11), 1800.0)]
+
+
+def test_split_by_day_multiple_days_and_empty():
+    start = datetime(2026, 3, 10, 12, 0, tzinfo=KST).timestamp()
+    pieces = split_by_day(start, start + 2 * 86400)
+    assert [d for d, _ in pieces] == [date(2026, 3, 10), date(2026, 3, 11), date(2026, 3, 12)]
+    assert sum(sec for _, sec in pieces) == 2 * 86400
+    assert split_by_day(start, start) == []
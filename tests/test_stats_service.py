@@ -0,0 +1,51 @@
+"""resolve_period · period_tok 기간 경계."""
+from datetime import date
+
+from app.config import STATS_MAX_PERIOD_DAYS
+from app.services.stats_service import resolve_period
+from app.utils.time_utils import period_tok
+
+TODAY = date(2026, 3, 11)      # 수요일
+
+
+def test_today_and_yesterday():
+    assert resolve_period(None, TODAY).start == TODAY
+    r = resolve_period("어제", TODAY)
+    assert (r.start, r.end, r.days) == (date(2026, 3, 10), date(2026, 3, 10), 1)
+
+
+def test_weeks_are_monday_to_sunday():
+    r = resolve_period("이번주", TODAY)
+    assert (r.start, r.end, r.bucket) == (date(2026, 3, 9), date(2026, 3, 15), "weekly")
+    r = resolve_period("지난주", TODAY)
+    assert (r.start, r.end) == (date(2026, 3, 2), date(2026, 3, 8))
+
+
+def test_months_cross_year_and_leap_day():
+    r = resolve_period("지난달", date(2026, 1, 15))
+    assert (r.start, r.end, r.bucket) == (date(2025, 12, 1), date(2025, 12, 31), "monthly")
+    r = resolve_period("이번달", date(2028, 2, 3))
+    assert (r.start, r.end) == (date(2028, 2, 1), date(2028, 2, 29))
+
+
+def test_n_days_includes_today():
+    r = resolve_period("7일", TODAY)
+    assert (r.start, r.end, r.days) == (date(2026, 3, 5), TODAY, 7)
+
+
+def test_n_days_is_clamped():
+    assert resolve_period(f"{STATS_MAX_PERIOD_DAYS + 1}일", TODAY).days == STATS_MAX_PERIOD_DAYS
+    assert resolve_period("1000000일", TODAY).days == STATS_MAX_PERIOD_DAYS
+    assert resolve_period("0일", TODAY).days == 1
+    r = resolve_period("30일", date(1, 1, 3))          # date.min 밑으로 내려가지 않음
+    assert (r.start, r.days) == (date(1, 1, 1), 3)
+
+
+def test_period_tok_bounds():
+    assert period_tok("1일") == "1일"
+    assert period_tok(f"{STATS_MAX_PERIOD_DAYS}일") == f"{STATS_MAX_PERIOD_DAYS}일"
+    assert period_tok(f"{STATS_MAX_PERIOD_DAYS + 1}일") is None
+    assert period_tok("0일") is None
+    assert period_tok("1000000일") is None
+    assert period_tok("이번주") == "이번주"
+    assert period_tok("내일") is None
@@ -0,0 +1,78 @@
+"""timer_service.account — 열린 구간을 KST 자정 기준으로 나눠 기록."""
+from datetime import date, datetime
+
+import pytest
+
+from app.config import KST
+from app.domain.models import GuildState, Timer
+from app.services import timer_service
+
+
+@pytest.fixture
+def journaled(monkeypatch):
+    calls: list[tuple] = []
+    monkeypatch.setattr(
+        timer_service, "record_stats", lambda gs, dk, name, mode, sec: calls.append((dk, name, mode, sec)),
+    )
+    return calls
+
+
+def _ts(*args) -> float:
+    return datetime(*args, tzinfo=KST).timestamp()
+
+
+def test_account_splits_at_kst_midnight(journaled):
+    gs = GuildState(gid=1)
+    t = Timer(study_sec=3600, rest_sec=600, channel_id=1, last_accounted_at=_ts(2026, 3, 10, 23, 40))
+    timer_service.account(gs, "a", t, _ts(2026, 3, 11, 0, 10))
+    assert gs.stats.user_day("a", date(2026, 3, 10)) == {"study": 1200.0, "rest": 0.0}
+    assert gs.stats.user_day("a", date(2026, 3, 11)) == {"study": 600.0, "rest": 0.0}
+    assert journaled == [("2026-03-10", "a", "study", 1200.0), ("2026-03-11", "a", "study", 600.0)]
+    assert t.last_accounted_at == _ts(2026, 3, 11, 0, 10)
+
+
+def test_account_is_idempotent_and_uses_mode(journaled):
+    gs = GuildState(gid=1)
+    t = Timer(study_sec=60, rest_sec=60, channel_id=1, mode="rest", last_accounted_at=_ts(2026, 3, 10, 9, 0))
+    until = _ts(2026, 3, 10, 9, 5)
+    timer_service.account(gs, "a", t, until)
+    timer_service.account(gs, "a", t, until)          # 이미 기록한 구간
+    assert gs.stats.user_day("a", date(2026, 3, 10)) == {"study": 0.0, "rest": 300.0}
+    assert len(journaled) == 1
+
+
+def test_account_skips_unstarted_timer(journaled):
+    gs = GuildState(gid=1)
+    t = Timer(study_sec=60, rest_sec=60, channel_id=1)          # last_accounted_at = 0
+    timer_service.account(gs, "a", t, _ts(2026, 3, 10, 9, 0))
+    assert gs.stats.daily == {} and journaled == []
+
+
+def test_account_running_stops_at_phase_end(journaled):
+    gs = GuildState(gid=1)
+    start = _ts(2026, 3, 10, 23, 50)
+    gs.timers["a"] = Timer(
+        study_sec=1200, rest_sec=60, channel_id=1, phase_end_at=start + 1200, last_accounted_at=start,
+    )
+    gs.timers["b"] = Timer(
+        study_sec=1200, rest_sec=60, channel_id=1, phase_end_at=start + 1200, last_accounted_at=start,
+        remaining_on_personal_pause=100.0,
+    )
+    timer_service.account_running(gs, start + 3600)
+    assert gs.stats.range_totals("a", date(2026, 3, 10), date(2026, 3, 11)) == (1200.0, 0.0)
+    assert gs.stats.user_day("a", date(2026, 3, 11)) == {"study": 600.0, "rest": 0.0}
+    assert "b" not in gs.stats.names()
+
+
+def test_set_timer_closes_replaced_interval(journaled, monkeypatch):
+    monkeypatch.setattr(timer_service, "record_timer", lambda gs, name: None)
+    start = _ts(2026, 3, 10, 9, 0)
+    gs = GuildState(gid=1)
+    gs.timers["a"] = Timer(
+        study_sec=3000, rest_sec=600, channel_id=1, phase_end_at=start + 3000, last_accounted_at=start,
+    )
+    monkeypatch.setattr(timer_service, "now_ts", lambda: start + 1200)
+    timer_service.set_timer(gs, "a", 1500, 300, 1, None, None)
+    assert gs.stats.user_day("a", date(2026, 3, 10)) == {"study": 1200.0, "rest": 0.0}
+    assert gs.timers["a"].study_sec == 1500
+    assert gs.timers["a"].last_accounted_at == start + 1200
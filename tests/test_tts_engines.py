@@ -0,0 +1,102 @@
+"""tts_engines.synthesize — StubTTS 엔진으로 헤징 동작 확인."""
+import asyncio
+import shutil
+
+import pytest
+
+from app.bot import tts_engines
+from app.bot.tts_engines import StubTTS, synthesize
+from app.repositories.tts_cache import TtsCache, tts_key
+
+HEDGE = 0.05
+
+
+class _Recorder(StubTTS):
+    """시작·취소 여부를 기록하는 StubTTS."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.started = False
+        self.cancelled = False
+
+    async def synth(self, sentence, path):
+        self.started = True
+        try:
+            await super().synth(sentence, path)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    c = TtsCache(root=tmp_path)
+
+    async def encode(src, dst):            # ffmpeg 없이 그대로 복사
+        shutil.copyfile(src, dst)
+        return True
+
+    monkeypatch.setattr(tts_engines, "get_tts_cache", lambda: c)
+    monkeypatch.setattr(tts_engines, "encode_opus", encode)
+    monkeypatch.setattr(tts_engines, "TTS_HEDGE_SEC", HEDGE)
+    return c
+
+
+def _run(engines: list[StubTTS], monkeypatch):
+    monkeypatch.setattr(tts_engines, "_engines", engines)
+
+    async def go():
+        path = await synthesize("안녕")
+        await asyncio.sleep(0.01)          # 취소된 쪽의 정리(임시 파일 삭제)까지
+        return path
+
+    return asyncio.run(go())
+
+
+def _winner(path, engine) -> bool:
+    return path is not None and path.name.startswith(tts_key("안녕", engine.voice, engine.name))
+
+
+def test_fast_primary_does_not_hedge(cache, monkeypatch):
+    a, b = _Recorder("a"), _Recorder("b")
+    path = _run([a, b], monkeypatch)
+    assert _winner(path, a)
+    assert not b.started
+
+
+def test_slow_primary_starts_hedge_and_loser_is_cancelled(cache, monkeypatch):
+    a, b = _Recorder("a", delay=1.0), _Recorder("b")
+    path = _run([a, b], monkeypatch)
+    assert _winner(path, b)
+    assert a.cancelled
+    assert not list(cache.root.glob("*.part"))         # 진 쪽 임시 파일 없음
+
+
+def test_primary_finishing_first_wins_after_hedge(cache, monkeypatch):
+    a, b = _Recorder("a", delay=HEDGE * 2), _Recorder("b", delay=1.0)
+    path = _run([a, b], monkeypatch)
+    assert _winner(path, a)
+    assert b.started and b.cancelled
+
+
+def test_failure_starts_next_without_waiting(cache, monkeypatch):
+    a, b = _Recorder("a", fail=True), _Recorder("b")
+    loop_time: list[float] = []
+    orig = tts_engines.synthesize
+
+    async def timed():
+        t0 = asyncio.get_running_loop().time()
+        path = await orig("안녕")
+        loop_time.append(asyncio.get_running_loop().time() - t0)
+        return path
+
+    monkeypatch.setattr(tts_engines, "_engines", [a, b])
+    path = asyncio.run(timed())
+    assert _winner(path, b)
+    assert loop_time[0] < HEDGE
+
+
+def test_all_engines_fail(cache, monkeypatch):
+    engines = [_Recorder("a", fail=True), _Recorder("b", delay=HEDGE * 2, fail=True)]
+    assert _run(engines, monkeypatch) is None
+    assert all(e.started for e in engines)
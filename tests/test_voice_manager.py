@@ -0,0 +1,71 @@
+"""voice_manager — 안정 연결 후 끊김 · 연속 실패 백오프."""
+import asyncio
+
+import pytest
+
+import app.bot.channel_resolver as channel_resolver
+from app.bot import voice_manager as vm
+from app.config import VOICE_BACKOFF_BASE_SEC, VOICE_STABLE_SEC
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.t = 1000.0
+
+    def monotonic(self) -> float:
+        return self.t
+
+    perf_counter = monotonic
+
+
+class _VC:
+    def __init__(self, cid: int) -> None:
+        self.channel = type("Ch", (), {"id": cid})()
+
+    def is_connected(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(vm, "time", c)
+    monkeypatch.setattr(vm.random, "uniform", lambda lo, hi: hi)    # 지터 없이 상한
+    monkeypatch.setattr(vm, "_links", {})
+    return c
+
+
+def test_backoff_grows_after_stable_connection_drops(clock, monkeypatch):
+    async def no_channel(cid):
+        return None
+
+    monkeypatch.setattr(channel_resolver, "resolve_channel", no_channel)
+
+    async def scenario() -> list[float]:
+        link = vm._links[1] = vm._Link(1, want=10)
+        link.failures = 3                       # 예전 실패 기록
+        link.vc = _VC(10)
+        vm._set_state(link, vm.LinkState.CONNECTED)
+        clock.t += VOICE_STABLE_SEC             # 안정적으로 연결돼 있었음
+        vm.on_voice_state(1, None)              # 끊김 → 재연결 예약
+        link.task.cancel()
+        link.task = None
+        delays = [link.retry_at - clock.t]
+        for _ in range(3):                      # 재연결 시도가 계속 실패
+            clock.t = link.retry_at
+            await vm._attempt(link)
+            delays.append(link.retry_at - clock.t)
+        return delays
+
+    delays = asyncio.run(scenario())
+    assert delays[0] == VOICE_BACKOFF_BASE_SEC          # 안정 연결 → 실패 횟수 초기화
+    assert delays == sorted(delays) and len(set(delays)) == 4
+    assert delays[-1] == VOICE_BACKOFF_BASE_SEC * 8
+
+
+def test_short_connection_keeps_failure_count(clock):
+    link = vm._Link(1, want=10, failures=2)
+    vm._set_state(link, vm.LinkState.CONNECTED)
+    clock.t += VOICE_STABLE_SEC / 2
+    vm._set_state(link, vm.LinkState.IDLE)
+    assert vm._fail(link) == VOICE_BACKOFF_BASE_SEC * 4